@@ -0,0 +1,20 @@
+"""
+Benchmarks for fro parsers.
+
+Run from the root of the repository::
+
+    python -m benchmarks run --output before.json
+    # ... upgrade or modify fro ...
+    python -m benchmarks run --output after.json
+    python -m benchmarks compare before.json after.json
+
+``run`` measures every case in ``benchmarks.cases`` on inputs of increasing size, and ``compare`` flags the
+cases that got slower (or used more memory) by more than a threshold. ``objects`` measures the size and the
+attribute access time of the objects created on every chomp, and its results can be compared in the same way::
+
+    python -m benchmarks objects --output objects_before.json
+    python -m benchmarks objects --output objects_after.json
+    python -m benchmarks compare objects_before.json objects_after.json
+
+See ``python -m benchmarks --help``.
+"""
@@ -0,0 +1,55 @@
+from __future__ import print_function
+
+import argparse
+import sys
+
+from benchmarks import cases, objects, runner
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks for fro parsers")
+    subparsers = parser.add_subparsers(dest="command")
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--output", help="file to write the results to, as JSON")
+    run_parser.add_argument("--filter", default="", help="only run cases whose name contains this string")
+    run_parser.add_argument("--group", choices=["example", "chomper", "pathological"],
+                            help="only run cases of this group")
+    run_parser.add_argument("--repeat", type=int, default=5, help="number of timed parses per measurement")
+    run_parser.add_argument("--scale", type=float, default=1.0, help="factor to multiply input sizes by")
+    run_parser.add_argument("--compiled", action="store_true", help="also measure compiled parsers")
+
+    objects_parser = subparsers.add_parser(
+        "objects", help="measure the size and attribute access time of the objects created while parsing")
+    objects_parser.add_argument("--output", help="file to write the results to, as JSON")
+
+    compare_parser = subparsers.add_parser("compare", help="compare the results of two runs (of run or of objects)")
+    compare_parser.add_argument("old", help="results of the baseline run")
+    compare_parser.add_argument("new", help="results of the run to check")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="relative growth of a metric that counts as a regression")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        selected = [case for case in cases.CASES
+                    if args.filter in case.name and args.group in (None, case.group)]
+        results = runner.run(selected, repeat=args.repeat, scale=args.scale, compiled=args.compiled,
+                             log=print)
+        if args.output is not None:
+            runner.write(results, args.output)
+        return 0
+    elif args.command == "objects":
+        results = objects.run(log=print)
+        if args.output is not None:
+            runner.write(results, args.output)
+        return 0
+    elif args.command == "compare":
+        rows, regressions = runner.compare(runner.read(args.old), runner.read(args.new), args.threshold)
+        print(runner.format_comparison(rows, regressions))
+        return 1 if regressions else 0
+    parser.print_help()
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
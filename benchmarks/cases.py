@@ -0,0 +1,90 @@
+"""
+Benchmark cases. Each case is a parser together with a generator of inputs, and the sizes at which
+to measure it. The size of an input is also its number of items (e.g. nodes, entries or tokens).
+"""
+
+import os
+import sys
+
+import fro
+
+from benchmarks import inputs
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples"))
+
+import emailExample  # noqa: E402
+import texExample  # noqa: E402
+import xmlExample  # noqa: E402
+
+
+class Case(object):
+    def __init__(self, name, parser, make_input, sizes, group, scalable=True):
+        """
+        :param str name: unique name of the case
+        :param Parser parser: parser to benchmark
+        :param make_input: function from size to list of chunks
+        :param sizes: sizes at which to measure the case
+        :param str group: "example", "chomper" or "pathological"
+        :param bool scalable: if sizes may be scaled up or down for a run
+        """
+        self.name = name
+        self.parser = parser
+        self.make_input = make_input
+        self.sizes = sizes
+        self.group = group
+        self.scalable = scalable
+
+
+def _increment(n):
+    return n + 1
+
+
+def _parenthesized(parser):
+    return fro.comp([r"~\(", parser.maybe(0), r"~\)"]).get() | _increment
+
+
+def _alternation(width):
+    return fro.seq(fro.alt([r"k{};".format(i) for i in range(width)]))
+
+
+def _shared_prefixes(branches):
+    # every branch chomps the same "a"s before failing on its last regex, except for the last branch
+    return fro.seq(fro.alt([fro.comp([r"a", r"a", r"a", r"a", r"{}".format(i)]) for i in range(branches)]
+                           + [fro.comp([r"a", r"a", r"a", r"a", r"b"])]))
+
+
+def _cases():
+    scales = [1000, 10000, 100000]
+    return [
+        # the example grammars
+        Case("xml", xmlExample.xmlp, inputs.xml_document, [100, 1000, 10000], "example"),
+        Case("email", emailExample.emaildirp, inputs.email_directory, scales, "example"),
+        Case("tex", texExample.documentp, inputs.tex_document, scales, "example"),
+
+        # one case per chomper type
+        Case("regex", fro.seq(r"[a-z]+\n"), inputs.words, scales, "chomper"),
+        Case("comp", fro.seq(fro.comp([r"[a-z]+", r"~ ", r"[a-z]+", r"~\n"])), inputs.word_pairs, scales,
+             "chomper"),
+        Case("seq", fro.seq(r"ab"), lambda n: inputs.repeated("ab", n), scales, "chomper"),
+        Case("seq_sep", fro.seq(r"ab", sep=r"~,"), lambda n: inputs.repeated("ab", n, ","), scales, "chomper"),
+        Case("alt_width_2", _alternation(2), lambda n: inputs.keywords(2, n), scales, "chomper"),
+        Case("alt_width_16", _alternation(16), lambda n: inputs.keywords(16, n), scales, "chomper"),
+        Case("alt_width_256", _alternation(256), lambda n: inputs.keywords(256, n), scales, "chomper"),
+        Case("nested_depth", fro.nested(r"\(", r"\)"), inputs.parenthesized, scales, "chomper"),
+        Case("until_span", fro.comp([fro.until(r";"), r";"]), inputs.span, [10000, 100000, 1000000], "chomper"),
+        Case("chain_depth", fro.chain(_parenthesized), inputs.parenthesized, [10, 50, 100], "chomper"),
+        Case("tie_depth", fro.tie(_parenthesized), inputs.parenthesized, [10, 50, 100], "chomper"),
+
+        # grammars that backtrack a lot
+        Case("shared_prefixes", _shared_prefixes(16), lambda n: inputs.repeated("aaaab", n), scales,
+             "pathological"),
+        Case("optional_backtrack", fro.seq(fro.comp([fro.rgx(r"ab").maybe(), r"a", r"c"])),
+             lambda n: inputs.repeated("ac", n), scales, "pathological"),
+        # the regex takes exponential time, so its sizes are not scaled
+        Case("nested_quantifiers", fro.comp([fro.rgx(r"(a+)+b").maybe(), r"a*"]),
+             lambda n: inputs.repeated("a", n), [14, 16, 18], "pathological", scalable=False),
+    ]
+
+
+#: all benchmark cases, in the order in which they are run
+CASES = _cases()
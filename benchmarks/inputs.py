@@ -0,0 +1,118 @@
+"""
+Generators of benchmark inputs. Every generator is deterministic, and returns a list of chunks.
+"""
+
+import random
+
+
+def _rng():
+    return random.Random(1729)
+
+
+def _words(rng, count, alphabet="abcdefghijklmnopqrstuvwxyz"):
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(3, 9))) for _ in range(count)]
+
+
+def xml_document(size):
+    """
+    :return: an XML document with ``size`` nodes, in the subset of XML parsed by ``xmlExample.xmlp``
+    """
+    rng = _rng()
+    tags = _words(rng, 20)
+    lines = []
+
+    def node(remaining, depth):
+        tag = rng.choice(tags)
+        lines.append("{}<{}>{}\n".format("  " * depth, tag, " ".join(_words(rng, 3))))
+        remaining -= 1
+        while remaining > 0 and depth < 8 and rng.random() < 0.7:
+            child = rng.randint(1, remaining)
+            node(child, depth + 1)
+            remaining -= child
+        lines.append("{}</{}>\n".format("  " * depth, tag))
+
+    lines.append("<root>\n")
+    remaining = size
+    while remaining > 0:
+        child = min(remaining, rng.randint(1, 50))
+        node(child, 1)
+        remaining -= child
+    lines.append("</root>")
+    return lines
+
+
+def email_directory(size):
+    """
+    :return: a directory of ``size`` entries, as parsed by ``emailExample.emaildirp``
+    """
+    rng = _rng()
+    names = _words(rng, 50)
+    return ["{} {} : {}@{}.com\n".format(
+        rng.choice(names).title(), rng.choice(names).title(), rng.choice(names), rng.choice(names))
+        for _ in range(size)]
+
+
+def tex_document(size):
+    """
+    :return: a TeX document with ``size`` elements, as parsed by ``texExample.documentp``
+    """
+    rng = _rng()
+    words = _words(rng, 100, alphabet="abcdefghijklmnopqrtuvwxyz")  # texExample.textp stops at "s"
+    elements = []
+    for _ in range(size):
+        kind = rng.random()
+        if kind < 0.1:
+            elements.append("\\{}{{{}}}".format(rng.choice(words), rng.choice(words)))
+        elif kind < 0.15:
+            elements.append("\\" + rng.choice(words))
+        else:
+            elements.append(rng.choice(words))
+    return [" ".join(elements[i:i + 12]) + "\n" for i in range(0, len(elements), 12)]
+
+
+def words(size):
+    """
+    :return: ``size`` lowercase words, one per chunk
+    """
+    return [word + "\n" for word in _words(_rng(), size)]
+
+
+def word_pairs(size):
+    """
+    :return: ``size`` pairs of lowercase words, one pair per chunk
+    """
+    rng = _rng()
+    return ["{} {}\n".format(*_words(rng, 2)) for _ in range(size)]
+
+
+def repeated(token, size, sep=""):
+    """
+    :return: a single chunk of ``size`` copies of ``token`` separated by ``sep``
+    """
+    return [sep.join([token] * size)]
+
+
+def keywords(width, size):
+    """
+    :return: ``size`` keywords, drawn from ``k0;`` to ``k<width - 1>;``, in lines of 20 keywords
+    """
+    rng = _rng()
+    tokens = ["k{};".format(rng.randrange(width)) for _ in range(size)]
+    return ["".join(tokens[i:i + 20]) for i in range(0, len(tokens), 20)]
+
+
+def parenthesized(depth):
+    """
+    :return: a single chunk of ``depth`` nested pairs of parentheses
+    """
+    return ["(" * depth + ")" * depth]
+
+
+def span(size):
+    """
+    :return: ``size`` characters without a semicolon in lines of 80 characters, followed by a semicolon
+    """
+    line = "abcdefghij" * 8
+    lines = [line[:80] for _ in range(size // 80)]
+    lines.append("x" * (size % 80) + ";")
+    return lines
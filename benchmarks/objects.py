@@ -0,0 +1,92 @@
+"""
+Measuring the memory footprint and the attribute access time of the objects that are created or
+used on every chomp.
+"""
+
+import gc
+import sys
+import timeit
+
+import fro
+from fro._implementation.chompers.abstract import FroParseErrorTracker
+from fro._implementation.chompers.state import ChompState
+from fro._implementation.iters import CheckableIterator
+from fro._implementation.location import Location
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+
+def _samples():
+    """
+    :return: list of (name of sample, function creating the sample, attribute read on every chomp)
+    """
+    return [
+        ("Location", lambda: Location(0, 1, "ab"), "_column"),
+        ("ChompState", lambda: ChompState(["ab"]), "_column"),
+        ("FroParseErrorTracker", FroParseErrorTracker, "_names"),
+        ("CheckableIterator", lambda: CheckableIterator(["ab"]), "_at_end"),
+        ("RegexChomper", lambda: fro.rgx(r"ab")._chomper, "_match"),
+        ("CompositionChomper", lambda: fro.comp([r"a", r"b"])._chomper, "_chompers"),
+        ("AlternationChomper", lambda: fro.alt([r"a", fro.rgx(r"b").name("b")])._chomper, "_dispatch"),
+        ("SequenceChomper", lambda: fro.seq(r"a")._chomper, "_element"),
+    ]
+
+
+#: name of sample -> (function creating the sample, attribute read on every chomp)
+SAMPLES = dict((name, (make, attribute)) for name, make, attribute in _samples())
+
+
+def bytes_per_object(make, count=10000):
+    """
+    :return: average number of bytes allocated by ``make()``, including the object's ``__dict__``
+    """
+    if tracemalloc is None:
+        obj = make()
+        size = sys.getsizeof(obj)
+        if hasattr(obj, "__dict__"):
+            size += sys.getsizeof(obj.__dict__)
+        return size
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [make() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    size = (after - before - sys.getsizeof(objects)) / float(count)
+    del objects
+    return size
+
+
+def access_nanoseconds(name, number=1000000, repeat=5):
+    """
+    :return: best time to read the per-chomp attribute of the named sample, in nanoseconds
+    """
+    setup = "from benchmarks.objects import SAMPLES; make, _ = SAMPLES[{!r}]; obj = make()".format(name)
+    timer = timeit.Timer("obj.{}".format(SAMPLES[name][1]), setup)
+    return min(timer.repeat(repeat, number)) / number * 1e9
+
+
+def run(log=None):
+    """
+    Measures every sample.
+
+    :return: dict with the measurements and a description of the environment
+    """
+    results = []
+    for name, make, attribute in _samples():
+        result = {
+            "object": name,
+            "attribute": attribute,
+            "bytes": bytes_per_object(make),
+            "access_ns": access_nanoseconds(name),
+        }
+        results.append(result)
+        if log is not None:
+            log("{object:<24} {bytes:>10.1f} bytes   .{attribute:<12} {access_ns:>6.1f} ns".format(**result))
+    return {
+        "python": sys.version,
+        "objects": results,
+    }
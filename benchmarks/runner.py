@@ -0,0 +1,157 @@
+"""
+Measuring benchmark cases, and comparing the results of two runs.
+"""
+
+import gc
+import json
+import platform
+import sys
+import time
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+_clock = getattr(time, "perf_counter", time.time)
+
+
+def measure(case, size, repeat=5, compiled=False):
+    """
+    Parses the input of the given size ``repeat`` times (plus once more to measure memory).
+
+    :return: dict describing the measurement
+    """
+    chunks = case.make_input(size)
+    parser = case.parser.compile() if compiled else case.parser
+    characters = sum(len(chunk) for chunk in chunks)
+    parser.parse(chunks)  # warm up, and fail early on broken cases
+
+    latencies = []
+    for _ in range(repeat):
+        gc.collect()
+        start = _clock()
+        parser.parse(chunks)
+        latencies.append(_clock() - start)
+    latencies.sort()
+    best = latencies[0]
+
+    peak = None
+    if tracemalloc is not None:
+        gc.collect()
+        tracemalloc.start()
+        parser.parse(chunks)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        "case": case.name,
+        "group": case.group,
+        "variant": "compiled" if compiled else "interpreted",
+        "size": size,
+        "characters": characters,
+        "best_seconds": best,
+        "median_seconds": latencies[len(latencies) // 2],
+        "mb_per_second": characters / best / 1e6 if best > 0 else None,
+        "items_per_second": size / best if best > 0 else None,
+        "peak_memory_bytes": peak,
+    }
+
+
+def run(cases, repeat=5, scale=1.0, compiled=False, log=None):
+    """
+    Measures every case at each of its sizes (multiplied by ``scale``, if the case is scalable).
+
+    :return: dict with the measurements and a description of the environment
+    """
+    results = []
+    variants = [False, True] if compiled else [False]
+    for case in cases:
+        for size in case.sizes:
+            if case.scalable:
+                size = max(1, int(size * scale))
+            for variant in variants:
+                result = measure(case, size, repeat, variant)
+                results.append(result)
+                if log is not None:
+                    log(_format_result(result))
+    return {
+        "python": sys.version,
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def write(run_results, filename):
+    with open(filename, "w") as f:
+        json.dump(run_results, f, indent=2, sort_keys=True)
+
+
+def read(filename):
+    with open(filename) as f:
+        return json.load(f)
+
+
+def compare(old, new, threshold=0.1):
+    """
+    Compares the measurements of two runs, which are both either ``run`` or ``objects`` results. A
+    measurement regressed if its best time or its peak memory (or, for objects, its size or its attribute
+    access time) grew by more than ``threshold`` (as a fraction of the old value).
+
+    :return: list of (key, metric, old value, new value, ratio) for every measurement in both runs,
+             and list of the ones that regressed
+    """
+    rows = []
+    regressions = []
+    _compare(old.get("results", []), new.get("results", []), _key,
+             ("best_seconds", "peak_memory_bytes"), threshold, rows, regressions)
+    _compare(old.get("objects", []), new.get("objects", []), _object_key,
+             ("bytes", "access_ns"), threshold, rows, regressions)
+    return rows, regressions
+
+
+def format_comparison(rows, regressions):
+    lines = ["{:<50} {:<18} {:>14} {:>14} {:>8}".format("case", "metric", "old", "new", "ratio")]
+    flagged = set(id(row) for row in regressions)
+    for row in rows:
+        key, metric, before, after, ratio = row
+        lines.append("{:<50} {:<18} {:>14.6g} {:>14.6g} {:>8.3f}{}".format(
+            "/".join(str(k) for k in key), metric, before, after, ratio,
+            "  REGRESSION" if id(row) in flagged else ""))
+    lines.append("{} regression(s) in {} comparison(s)".format(len(regressions), len(rows)))
+    return "\n".join(lines)
+
+
+def _compare(old_results, new_results, key, metrics, threshold, rows, regressions):
+    """
+    Appends the comparisons of the ``metrics`` of the results with the same key to ``rows``, and the
+    ones that regressed to ``regressions``
+    """
+    old_results = dict((key(r), r) for r in old_results)
+    for result in new_results:
+        previous = old_results.get(key(result))
+        if previous is None:
+            continue
+        for metric in metrics:
+            before, after = previous.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            row = (key(result), metric, before, after, after / before)
+            rows.append(row)
+            if after > before * (1 + threshold):
+                regressions.append(row)
+
+
+def _key(result):
+    return result["case"], result["variant"], result["size"]
+
+
+def _object_key(result):
+    return "objects", result["object"]
+
+
+def _format_result(result):
+    return "{case:<20} {variant:<12} size={size:<8} {best_seconds:>10.6f}s {mb:>8.2f} MB/s " \
+           "{items:>12.0f} items/s peak={peak}".format(
+               mb=result["mb_per_second"] or 0, items=result["items_per_second"] or 0,
+               peak=result["peak_memory_bytes"], **result)
@@ -21,7 +21,8 @@ def close_of_tag(tag_name):
 
 def xml_node_parser(recursive_parser):
     tag = fro.BoxedValue(None)  # stores the tag name of the current XML node
-    boxed_open_tagp = open_tagp.lstrips() | tag.update_and_get
+    # stateful, since boxed_close_tagp depends on its func even if the value is not needed
+    boxed_open_tagp = (open_tagp.lstrips() | tag.update_and_get).stateful()
     textp = fro.until(r"<", reducer="".join, name="text")
     childrenp = fro.seq(recursive_parser)
     tailp = textp.name("tail")
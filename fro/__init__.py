@@ -1,4 +1,11 @@
 from fro._implementation.boxed_value import BoxedValue
+from fro._implementation.checkpoints import Checkpoint
+from fro._implementation.chompers.memo import MemoTable
+from fro._implementation.chompers.util import ThunkCache
+from fro._implementation.feeding import Feeder
+from fro._implementation.incremental import IncrementalParse
 from fro._implementation.parser import alt, chain, comp, group_rgx, nested, rgx, seq, thunk, tie, until
 from fro._implementation.parser import Parser, floatp, intp, natp, posintp
 from fro._implementation.parse_error import FroParseError
+from fro._implementation.profiling import NodeStats, Profiler
+from fro._implementation.serialization import loads, register_func
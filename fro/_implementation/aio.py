@@ -0,0 +1,81 @@
+"""
+Parsing input that arrives asynchronously, with asyncio (see ``Parser.parse_async(..)``). Since this module
+uses ``async`` syntax, it is only imported when it is used.
+"""
+
+import asyncio
+import functools
+
+from fro._implementation import feeding
+
+# get_running_loop() is new in Python 3.7; before it, get_event_loop() returned the running loop
+_running_loop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)
+
+
+async def parse_async(parser, chunks, loud, window):
+    """
+    :return: the value of ``parser.parse(..)`` on the chunks of the async iterable ``chunks``
+    """
+    value = None
+    async for value in _feed(functools.partial(feeding.parse_values, parser, loud, window), chunks):
+        pass
+    return value
+
+
+def iterparse_async(parser, chunks, loud, window):
+    """
+    :return: async iterator over the values of ``parser.iterparse(..)`` on the chunks of the async
+             iterable ``chunks``
+    """
+    return _feed(functools.partial(parser.iterparse, loud=loud, window=window), chunks)
+
+
+async def _feed(parse, chunks):
+    """
+    Feeds the chunks of the async iterable ``chunks`` to a ``Feeder`` running ``parse``, and yields its
+    values as they are produced
+    """
+    loop = _running_loop()
+    events = asyncio.Queue()
+    feeder = feeding.Feeder(parse, _Sink(loop, events))
+    failures = []  # error raised by chunks, if any
+    pump = asyncio.ensure_future(_pump(chunks, feeder, failures))
+    try:
+        while True:
+            kind, payload = await events.get()
+            if kind == feeding.VALUE:
+                yield payload
+                continue
+            elif len(failures) > 0:
+                raise failures[0]  # the parse only ended because chunks did
+            elif kind == feeding.ERROR:
+                raise payload
+            return
+    finally:
+        pump.cancel()
+        feeder._finish()  # if iteration stopped early, let the parse run to its end
+
+
+async def _pump(chunks, feeder, failures):
+    try:
+        async for chunk in chunks:
+            feeder.feed(chunk)
+    except Exception as e:
+        failures.append(e)
+    finally:
+        feeder._finish()
+
+
+class _Sink(object):
+    """
+    Sink of a ``Feeder``, which passes its events from the parsing thread to an ``asyncio.Queue``
+    """
+    def __init__(self, loop, events):
+        self._loop = loop
+        self._events = events
+
+    def __call__(self, event):
+        try:
+            self._loop.call_soon_threadsafe(self._events.put_nowait, event)
+        except RuntimeError:
+            pass  # the event loop is closed, so nobody is waiting for the event
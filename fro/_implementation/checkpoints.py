@@ -0,0 +1,229 @@
+"""
+Checkpointing and resuming long parses of files (see ``Parser.parse_file(..)``)
+"""
+
+import io
+import time
+
+from fro._implementation.chompers import sequence, state
+from fro._implementation.chompers.abstract import FAIL
+
+
+class Checkpoint(object):
+    """
+    The progress of a ``Parser.parse_file(..)`` with a top-level ``seq(..)``, taken between two of the sequence's
+    elements. Passing it as the ``resume_from`` argument of ``parse_file(..)`` continues the parse from where the
+    checkpoint was taken, without parsing the part of the file before it again. Checkpoints can be pickled.
+    """
+    def __init__(self, mode, offset, line, column, values, count):
+        self._mode = mode
+        self._offset = offset
+        self._line = line
+        self._column = column
+        self._values = values  # values of the elements so far (shared with the parse), or the fold's accumulator
+        self._count = count  # number of elements in self._values, or None if they were folded
+
+    def offset(self):
+        """
+        Returns the position in the file from which the parse resumes: the ``tell()`` of the text file before the
+        line containing the checkpoint (which is the byte offset of the line for most encodings), or the byte
+        offset of the checkpoint for memory-mapped files
+
+        :return: position in the file
+        :rtype: int
+        """
+        return self._offset
+
+    def line(self):
+        """
+        Returns the index of the chunk that the parse resumes in (0 for memory-mapped files)
+
+        :return: index of chunk
+        :rtype: int
+        """
+        return self._line
+
+    def column(self):
+        """
+        Returns the column in the chunk at which the parse resumes
+
+        :return: column in chunk
+        :rtype: int
+        """
+        return self._column
+
+    def value(self):
+        """
+        Returns the values of the sequence's elements before the checkpoint, or the accumulated value if the
+        parse folds the elements (see ``Parser.parse_file(..)``). The values are copied out of the list that the
+        parse shares with its checkpoints on each call.
+
+        :return: values of elements or accumulated value
+        """
+        if self._count is None:
+            return self._values
+        return self._values[:self._count]
+
+    def __getstate__(self):
+        return self._mode, self._offset, self._line, self._column, self.value(), self._count
+
+    def __setstate__(self, state_):
+        self._mode, self._offset, self._line, self._column, self._values, self._count = state_
+
+
+def parse_file(parser, filename, encoding, loud, memo, mode, checkpoint, interval, resume_from, fold):
+    """
+    Implements ``Parser.parse_file(..)`` for parses that take or resume from checkpoints
+    """
+    if resume_from is not None and resume_from._mode != mode:
+        raise ValueError("checkpoint was taken in mode {}, not {}".format(repr(resume_from._mode), repr(mode)))
+    table = parser._memo_table(memo)
+    root = parser._chomper if table is None else parser._memoized_chomper()._child
+    run = _Run(parser, root, loud, checkpoint, interval, resume_from, fold)
+    if mode == "mmap":
+        with parser._mapped_state(filename, table) as mapped_state:
+            if resume_from is not None:
+                mapped_state._column = resume_from._column
+            return run.parse(mapped_state, _MappedOffsets())
+    with io.open(filename, encoding=encoding) as file_to_parse:
+        line = 0
+        column = 0
+        if resume_from is not None:
+            file_to_parse.seek(resume_from._offset)
+            line = resume_from._line
+            column = resume_from._column
+        lines = _TextLines(file_to_parse, line)
+        text_state = state.ChompState(lines, column, memo=table)
+        text_state._line += line
+        return run.parse(text_state, lines)
+
+
+class _Run(object):
+    """
+    A parse of the elements of a top-level sequence, which takes a checkpoint after the first element that
+    ends at least ``interval`` seconds after the previous checkpoint
+    """
+    def __init__(self, parser, root, loud, checkpoint, interval, resume_from, fold):
+        self._parser = parser
+        self._root = root
+        self._loud = loud
+        self._checkpoint = checkpoint
+        self._interval = interval
+        self._resume_from = resume_from
+        self._fold = fold
+
+    def parse(self, chomp_state, offsets):
+        root = self._root
+        tracker = self._parser._tracker(self._loud)
+        if root.name() is not None:
+            tracker.offer_name(root.name())
+        resume_from = self._resume_from
+        if resume_from is None:
+            elements = sequence.SequenceIterable(root, chomp_state, tracker)
+            values = [] if self._fold is None else self._fold[0]
+        else:
+            elements = _resumed_elements(root, chomp_state, tracker)
+            values = resume_from.value()  # a copy, unless folded, so that the checkpoint can be resumed again
+        checkpoint = self._checkpoint
+        fold_func = None if self._fold is None else self._fold[1]
+        deadline = time.time() + self._interval
+        for value in elements:
+            if fold_func is None:
+                values.append(value)
+            else:
+                values = fold_func(values, value)
+            if checkpoint is not None and time.time() >= deadline:
+                offset = offsets.offset(chomp_state)
+                if offset is None:
+                    continue  # the offset of the current chunk is known once the following chunks are read
+                # the checkpoint shares values with the parse, which only appends to it
+                count = None if fold_func is not None else len(values)
+                checkpoint(Checkpoint(offsets.mode, offset, chomp_state._line, chomp_state._column, values, count))
+                deadline = time.time() + self._interval
+        if not chomp_state.at_end():
+            return self._parser._failed_parse(chomp_state, tracker, True, self._loud)
+        value = root._reducer(iter(values)) if fold_func is None else values
+        if root._func is not None:
+            value = root._func(value)
+        return value
+
+
+def _resumed_elements(root, chomp_state, tracker):
+    """
+    Yields the values of the elements of the sequence ``root`` after a checkpoint, which is taken right after
+    an element (and so before its separator)
+    """
+    separator = root._separator
+    if separator is None:
+        for value in sequence.SequenceIterable(root, chomp_state, tracker):
+            yield value
+        return
+    line = chomp_state._line
+    column = chomp_state._column
+    if separator.chomp(chomp_state, tracker) is FAIL:
+        if chomp_state._line == line:
+            chomp_state.reset_to(column)
+        elif not chomp_state.rollback(line, column):
+            root._failed_lookahead(chomp_state, tracker)
+        return
+    empty = True
+    for value in sequence.SequenceIterable(root, chomp_state, tracker):
+        empty = False
+        yield value
+    if empty:
+        # the separator is not followed by an element, so the sequence ended before it
+        if chomp_state._line == line:
+            chomp_state.reset_to(column)
+        elif not chomp_state.rollback(line, column):
+            root._failed_lookahead(chomp_state, tracker)
+
+
+class _TextLines(object):
+    """
+    Iterates over the lines of a text file, recording the ``tell()`` of the file before each line that is read
+    while an offset is wanted (which is rarely, since ``tell()`` is slow for text files)
+    """
+    mode = "text"
+
+    def __init__(self, file_to_read, line):
+        """
+        :param line: index of the next line of the file
+        """
+        self._file = file_to_read
+        self._line = line - 1  # index of the last line read
+        self._offsets = None  # index of line -> tell() before it, while an offset is wanted
+
+    def __iter__(self):
+        file_to_read = self._file
+        readline = file_to_read.readline
+        while True:
+            if self._offsets is not None:
+                self._offsets[self._line + 1] = file_to_read.tell()
+            line = readline()
+            if not line:
+                return
+            self._line += 1
+            yield line
+
+    def offset(self, chomp_state):
+        """
+        :return: ``tell()`` before the current line of ``chomp_state``, or None if it was not recorded
+        """
+        if self._offsets is None:
+            self._offsets = {}
+            return None
+        offset = self._offsets.get(chomp_state._line)
+        if offset is not None:
+            self._offsets = None
+        return offset
+
+
+class _MappedOffsets(object):
+    """
+    Offsets of the states of memory-mapped files, which are the columns of their single chunks
+    """
+    mode = "mmap"
+
+    @staticmethod
+    def offset(chomp_state):
+        return chomp_state._column
@@ -1,3 +1,3 @@
 from fro._implementation.chompers \
-    import abstract, alternation, chomp_error, composition, nested, regex, \
-    sequence, state, until, util
+    import abstract, alternation, chomp_error, compiler, composition, graph, memo, nested, \
+    optimizer, pipeline, recognizer, regex, scanner, sequence, state, until, util
@@ -1,7 +1,29 @@
 import copy
 
 from fro._implementation import parse_error
+from fro._implementation.chompers import pipeline
 from fro._implementation.chompers.chomp_error import ChompError
+from fro._implementation.location import Location
+
+
+FAILED_LOOKAHEAD_MESSAGE = "Failed lookahead during parse"
+
+
+class _Fail(object):
+    """
+    The type of ``FAIL``
+    """
+    __slots__ = ()
+
+    def __repr__(self):
+        return "FAIL"
+
+    def __reduce__(self):
+        return "FAIL"  # unpickles as the module's FAIL
+
+
+#: Returned by chomps that fail. Chomps that succeed return the produced value, which may be None.
+FAIL = _Fail()
 
 
 class AbstractChomper(object):
@@ -12,7 +34,11 @@ class AbstractChomper(object):
     Every subclass should be immutable (at least from the client's perspective).
     Also, every subclass should be implemented in such a way that no action
     performed on a chomper could alter a shallow copy.
+
+    Chompers are created in large numbers (e.g. by ``chain(..)``), so every subclass
+    should declare the attributes it sets in ``__slots__``.
     """
+    __slots__ = ("_significant", "_name", "_func", "_stateful", "chomp")
 
     def __init__(self, significant=True, name=None):
         """
@@ -21,11 +47,9 @@ class AbstractChomper(object):
         """
         self._significant = significant
         self._name = name
-
-        if name is None:
-            self.chomp = self._chomp
-
         self._func = None
+        self._stateful = False  # if the func must run even when values are not needed
+        self.chomp = self._chomp if name is None else self._bookkeeping_chomp
 
     def significant(self):
         return self._significant
@@ -33,56 +57,123 @@ class AbstractChomper(object):
     def name(self):
         return self._name
 
-    def clone(self, significant=None, name=None, func=None):
+    def clone(self, significant=None, name=None, func=None, stateful=None):
         """
         :return: a chomper identical to self, except with the specified values
         """
         significant = significant if significant is not None else self._significant
         name = name if name is not None else self._name
-        if func is None:
-            func_ = self._func
-        elif self._func is not None:
-            func_ = lambda *x: func(self._func(*x))
-        else:
-            func_ = func
+        func_ = self._func if func is None else pipeline.compose(self._func, func)
+        stateful = stateful if stateful is not None else self._stateful
         carbon = copy.copy(self)
         carbon._significant = significant
         carbon._name = name
-        carbon._last_parsed = None
         carbon._func = func_
-        if name is not None or func_ is not None:
-            carbon.chomp = AbstractChomper.chomp.__get__(carbon, AbstractChomper)
-        else:
-            carbon.chomp = carbon._chomp
+        carbon._stateful = stateful
+        carbon._bind_chomp()
         return carbon
 
     def unname(self):
         carbon = copy.copy(self)
         carbon._name = None
+        carbon._bind_chomp()
         return carbon
 
-    def chomp(self, state, tracker):
+    # chomp(state, tracker) is an attribute of each instance, pointing at _chomp or at
+    # _bookkeeping_chomp (see _bind_chomp())
+
+    def _bookkeeping_chomp(self, state, tracker):
         """
         Parses the head of the string s, possibly "chomping" off the beginning
         of s and producing a value.
 
         :param state: ChompState
         :param tracker: FroParseErrorTracker - tracks encountered errors
-        :return: (t, index) : value parsed, and first "unconsumed" index
+        :return: value parsed, or FAIL
         """
         # does some common bookkeeping, then delegates to specialized _chomp
         name = self._name
         if name is not None:
             tracker.offer_name(name)
-        box = self._chomp(state, tracker)
-        if box is not None:
-            if self._func is not None:
-                box.value = self._func(box.value)
+        value = self._chomp(state, tracker)
+        if value is not FAIL and self._func is not None:
+            value = self._func(value)
         if name is not None:
             tracker.revoke_name()
-        return box
+        return value
 
     # internals
+
+    def __copy__(self):
+        # a plain copy of the attributes; callers rebind chomp with _bind_chomp()
+        carbon = type(self).__new__(type(self))
+        for attribute, value in _attributes(self):
+            setattr(carbon, attribute, value)
+        return carbon
+
+    def __getstate__(self):
+        state = dict(_attributes(self))
+        state.pop("chomp", None)  # a bound method, restored by __setstate__
+        return state
+
+    def __setstate__(self, state):
+        for attribute, value in state.items():
+            setattr(self, attribute, value)
+        self._bind_chomp()
+
+    def _bind_chomp(self):
+        """
+        Points self.chomp at the cheapest implementation that handles this chomper's
+        name and func. Must be called whenever either changes on a copy. Subclasses may
+        also simplify their func here.
+        """
+        if self._name is not None or self._func is not None:
+            self.chomp = self._bookkeeping_chomp
+        else:
+            self.chomp = self._chomp
+
+    def _failure_message(self):
+        """
+        :return: message describing why this chomper failed, for chompers that report
+                 failures via ``tracker.report_failure(..)``
+        """
+        raise NotImplementedError  # must be implemented by reporting subclasses
+
+    def _reported_failures(self, name):
+        """
+        :param name: name of the chomper enclosing a failure reported by this chomper
+        :return: list of (chomper, name) pairs, one for each error that the failure stands for
+        """
+        return [(self, name)]
+
+    def _first_failures(self, name):
+        """
+        :param name: name of the chomper enclosing this chomper
+        :return: list of (chomper, name) pairs, one for each failure that this chomper reports when the next
+                 character is not one of its ``_first_chars()``, with the name of the chomper enclosing it
+        """
+        return [(self, name if self._name is None else self._name)]
+
+    def _first_chars(self):
+        """
+        :return: frozenset of the characters that every successful non-empty chomp starts with, or
+                 None if this set is unknown or if the chomper may succeed without consuming input
+        """
+        return None
+
+    def _children(self):
+        """
+        :return: list of the chompers that this chomper delegates to
+        """
+        return []
+
+    def _set_children(self, children):
+        """
+        Replaces the chompers that this chomper delegates to. ``children`` is ordered
+        like the result of ``_children()``. Only called on fresh copies of a chomper.
+        """
+        pass
+
     @staticmethod
     def _apply(tracker, state, func, *args):
         """
@@ -112,15 +203,14 @@ class AbstractChomper(object):
         calls to chomp.
         :param state: ChompState - state/location of chomping
         :param tracker: FroParseErrorTracker - tracks encountered errors
-        :return: tuple (value parsed, first "unconsumed" index)
+        :return: value parsed, or FAIL
         """
         raise NotImplementedError  # must be implemented by subclasses
 
     @staticmethod
     def _failed_lookahead(state, tracker):
-        msg = "Failed lookahead during parse"
         AbstractChomper._urgent(ChompError(
-            msg, state.location(), tracker.current_name()))
+            FAILED_LOOKAHEAD_MESSAGE, state.location(), tracker.current_name()))
 
     @staticmethod
     def _log_error(chomp_error, tracker):
@@ -145,10 +235,23 @@ class FroParseErrorTracker(object):
     """
     Tracks the errors that have been encountered during parsing, and preserves the most relevant one
     (i.e. occurred at farthest index). Also tracks names of encountered chompers.
+
+    Since almost every reported failure is discarded, failures are recorded as a packed integer
+    position plus a reference to the failing chomper. Error messages and locations are only
+    built by ``retrieve_error()``.
     """
-    def __init__(self):
-        self._chomp_errors = []
-        self._location = None
+    __slots__ = ("_max_errors", "_position", "_text", "_frame", "_sources", "_source_names", "_names")
+
+    def __init__(self, max_errors=32):
+        """
+        :param max_errors: maximum number of errors to keep for the farthest position
+        """
+        self._max_errors = max_errors
+        self._position = -1
+        self._text = None  # chunk containing the farthest position
+        self._frame = None  # frame of the state at the farthest position, if it has one
+        self._sources = []  # failed chompers (or ChompErrors) at the farthest position
+        self._source_names = []  # name of the enclosing chomper of each source
         self._names = []
 
     def offer_name(self, name):
@@ -160,21 +263,116 @@ class FroParseErrorTracker(object):
     def current_name(self):
         return None if len(self._names) == 0 else self._names[-1]
 
-    def report_error(self, chomp_error):
-        if self._location is None or chomp_error.location() > self._location:
-            self._location = chomp_error.location()
-            self._chomp_errors = [chomp_error]
-        elif chomp_error.location() < self._location:
+    def report_failure(self, chomper, state):
+        """
+        Records that ``chomper`` failed to chomp at the current position of ``state``. The
+        error message is later obtained from ``chomper._failure_message()``.
+        """
+        position = (state._line << _COLUMN_BITS) | state._column
+        if position > self._position:
+            self._position = position
+            self._text = state._curr
+            self._frame = state._frame
+            del self._sources[:]
+            del self._source_names[:]
+        elif position < self._position or len(self._sources) >= self._max_errors:
             return
-        elif chomp_error.location() == self._location:
-            self._chomp_errors.append(chomp_error)
+        self._sources.append(chomper)
+        self._source_names.append(self._names[-1] if self._names else None)
+
+    def report_error(self, chomp_error, state=None):
+        """
+        Records ``chomp_error``. If it occurred at the current position of ``state``, passing
+        ``state`` allows the error to be compared against failures reported by ``report_failure(..)``
+        for states whose locations are not lines and columns.
+        """
+        if state is not None:
+            position = (state._line << _COLUMN_BITS) | state._column
         else:
-            msg = "Incomparable locations: {0} {1}".format(
-                self._location,
-                chomp_error.location())
-            raise AssertionError(msg)
+            location = chomp_error.location()
+            position = (location.line() << _COLUMN_BITS) | location.column()
+        if position > self._position:
+            self._position = position
+            self._text = chomp_error.location().text()
+            self._frame = None if state is None else state._frame
+            del self._sources[:]
+            del self._source_names[:]
+        elif position < self._position or len(self._sources) >= self._max_errors:
+            return
+        self._sources.append(chomp_error)
+        self._source_names.append(chomp_error.name())
+
+    def _absorb(self, position, text, frame, sources, source_names):
+        """
+        Records the failures (or errors) ``sources`` that were reported to another tracker at the packed
+        ``position``, as if they had been reported to this tracker
+        """
+        if len(sources) == 0 or position < self._position:
+            return
+        elif position > self._position:
+            self._position = position
+            self._text = text
+            self._frame = frame
+            del self._sources[:]
+            del self._source_names[:]
+        room = self._max_errors - len(self._sources)
+        self._sources.extend(sources[:room])
+        self._source_names.extend(source_names[:room])
 
     def retrieve_error(self):
-        if len(self._chomp_errors) == 0:
+        if len(self._sources) == 0:
             return None
-        return parse_error.FroParseError(self._chomp_errors)
+        if self._frame is not None:
+            location = self._frame.location(self._position & _COLUMN_MASK)
+        else:
+            location = Location(self._position >> _COLUMN_BITS,
+                                self._position & _COLUMN_MASK,
+                                self._text)
+        chomp_errors = []
+        for source, name in zip(self._sources, self._source_names):
+            if isinstance(source, ChompError):
+                chomp_errors.append(source)
+                continue
+            for chomper, chomper_name in source._reported_failures(name):
+                chomp_errors.append(ChompError(chomper._failure_message(), location, chomper_name))
+        return parse_error.FroParseError(chomp_errors[:self._max_errors])
+
+
+class QuietErrorTracker(FroParseErrorTracker):
+    """
+    An error tracker that discards all reported errors, for parses whose failures are not
+    going to be reported
+    """
+    __slots__ = ()
+
+    def report_failure(self, chomper, state):
+        pass
+
+    def report_error(self, chomp_error, state=None):
+        pass
+
+    def retrieve_error(self):
+        return None
+
+
+def _attributes(obj):
+    """
+    :return: list of (name, value) of the attributes of ``obj`` that are set, whether they are
+             slots or are in its ``__dict__``
+    """
+    cls = type(obj)
+    names = _SLOTS.get(cls)
+    if names is None:
+        names = _SLOTS[cls] = [name for klass in cls.__mro__
+                               for name in klass.__dict__.get("__slots__", ())
+                               if name not in ("__dict__", "__weakref__")]
+    result = [(name, getattr(obj, name)) for name in names if hasattr(obj, name)]
+    result.extend(getattr(obj, "__dict__", {}).items())
+    return result
+
+
+_SLOTS = {}  # class -> names of the slots of the class and of its ancestors
+
+
+_COLUMN_BITS = 40
+_COLUMN_MASK = (1 << _COLUMN_BITS) - 1
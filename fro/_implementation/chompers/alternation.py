@@ -1,18 +1,140 @@
-from fro._implementation.chompers import abstract
+from fro._implementation.chompers import abstract, regex
 
 class AlternationChomper(abstract.AbstractChomper):
+    __slots__ = ("_chompers", "_firsts", "_dispatch", "_undetermined")
+
     def __init__(self, chompers, significant=True, name=None):
         abstract.AbstractChomper.__init__(self, significant, name)
-        self._chompers = list(chompers)
+        self._chompers = _fuse(chompers)
+        self._build_dispatch()
 
     def _chomp(self, state, tracker):
         col = state.column()
         line = state.line()
-        for chomper in self._chompers:
-            box = chomper.chomp(state, tracker)
-            if box is not None:
-                return box
-            elif state.line() != line:
+        chompers = self._chompers
+        dispatch = self._dispatch
+        if dispatch is not None:
+            # only try the branches that can start with the next character
+            if col < state._len_curr:
+                chompers = dispatch.get(state._curr[col], self._undetermined)
+            else:
+                chompers = self._undetermined
+        for chomper in chompers:
+            value = chomper.chomp(state, tracker)
+            if value is not abstract.FAIL:
+                return value
+            elif state.line() == line:
+                state.reset_to(col)
+            elif not state.rollback(line, col):
                 self._failed_lookahead(state, tracker)
-            state.reset_to(col)
-        return None
+        return abstract.FAIL
+
+    def _first_chars(self):
+        result = set()
+        for chars in self._firsts:
+            if chars is None:
+                return None
+            result |= chars
+        return frozenset(result)
+
+    def _first_failures(self, name):
+        name = name if self._name is None else self._name
+        return [failure for chomper in self._chompers for failure in chomper._first_failures(name)]
+
+    def _children(self):
+        return list(self._chompers)
+
+    def _set_children(self, children):
+        self._chompers = list(children)
+        self._build_dispatch()
+
+    def _build_dispatch(self):
+        """
+        Builds a table from each possible first character to the (ordered) list of branches
+        that can succeed on it. Branches whose first characters are unknown appear in every list,
+        and are the only candidates for all other characters. In each list, every run of skipped
+        branches is replaced by a ``SkippedBranches``, so that errors do not depend on the table.
+        """
+        self._firsts = [chomper._first_chars() for chomper in self._chompers]
+        self._dispatch = None
+        self._undetermined = self._candidates(None)
+        if all(chars is None for chars in self._firsts):
+            return
+        all_chars = set()
+        for chars in self._firsts:
+            if chars is not None:
+                all_chars |= chars
+        self._dispatch = dict((char, self._candidates(char)) for char in all_chars)
+
+    def _candidates(self, char):
+        """
+        :return: list of the branches that can succeed on ``char`` (or that can succeed on any
+                 character, if ``char`` is None), with a ``SkippedBranches`` for each run of the others
+        """
+        result = []
+        skipped = []
+        for chomper, chars in zip(self._chompers, self._firsts):
+            if chars is None or (char is not None and char in chars):
+                if len(skipped) > 0:
+                    result.append(SkippedBranches(skipped))
+                    skipped = []
+                result.append(chomper)
+            else:
+                skipped.append(chomper)
+        if len(skipped) > 0:
+            result.append(SkippedBranches(skipped))
+        return result
+
+
+class SkippedBranches(abstract.AbstractChomper):
+    """
+    Stands in for a run of branches of an alternation that cannot succeed on the next character. It
+    fails right away, and the branches' own failures are only built if the failure is reported.
+    """
+    __slots__ = ("_branches",)
+
+    def __init__(self, branches):
+        abstract.AbstractChomper.__init__(self, significant=False)
+        self._branches = branches
+
+    def _chomp(self, state, tracker):
+        tracker.report_failure(self, state)
+        return abstract.FAIL
+
+    def _reported_failures(self, name):
+        return [failure for chomper in self._branches for failure in chomper._first_failures(name)]
+
+
+def _fuse(chompers):
+    """
+    Replaces each run of adjacent plain regex chompers (unnamed, without a func) with a
+    single chomper that matches the alternation of their regexes. Python regex alternation
+    is ordered, so the fused chomper behaves like an ordered alternation of the run.
+
+    :return: list of chompers
+    """
+    result = []
+    run = []
+    for chomper in chompers:
+        if _fusable(chomper) and (len(run) == 0 or
+                                  type(run[0]._pattern) is type(chomper._pattern)):
+            run.append(chomper)
+            continue
+        _flush(run, result)
+        run = [chomper] if _fusable(chomper) else []
+        if len(run) == 0:
+            result.append(chomper)
+    _flush(run, result)
+    return result
+
+
+def _fusable(chomper):
+    return type(chomper) is regex.RegexChomper and chomper._name is None \
+        and chomper._func is None and regex.fusable(chomper._regex)
+
+
+def _flush(run, result):
+    if len(run) == 1:
+        result.append(run[0])
+    elif len(run) > 1:
+        result.append(regex.FusedRegexChomper([chomper._regex for chomper in run]))
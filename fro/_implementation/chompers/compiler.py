@@ -0,0 +1,348 @@
+"""
+Compiles a graph of chompers into specialized Python code.
+
+Every chomper in the graph becomes a generated function ``_n<i>(state, tracker)`` that, like
+``chomp``, returns the produced value, or ``FAIL`` if the chomp failed. The generated functions
+call each other directly, which removes the ``chomp`` -> ``_chomp`` double dispatch of every chomp,
+and only do name bookkeeping for named chompers. Chompers that produce other chompers while
+parsing (``chain``, ``thunk``) and chompers without a specialized template are called through
+their usual ``chomp`` method.
+"""
+
+import copy
+
+from fro._implementation import iters
+from fro._implementation.chompers import alternation, composition, graph, pipeline, regex, \
+    sequence, until, util
+from fro._implementation.chompers.abstract import FAIL, AbstractChomper
+
+
+class CompiledChomper(AbstractChomper):
+    """
+    A chomper that chomps by calling code generated for another chomper (its source)
+    """
+    __slots__ = ("_source", "_code", "_entry")
+
+    def __init__(self, source):
+        AbstractChomper.__init__(self, source.significant(), None)
+        self._source = source
+        self._code, self._entry = _Compiler(source).compile()
+
+    def _chomp(self, state, tracker):
+        return self._entry(state, tracker)
+
+    def _first_chars(self):
+        return self._source._first_chars()
+
+    def _failure_message(self):
+        return self._source._failure_message()
+
+    def _first_failures(self, name):
+        return self._source._first_failures(name)
+
+    def __getstate__(self):
+        state = AbstractChomper.__getstate__(self)
+        del state["_code"]
+        del state["_entry"]  # generated code is not picklable, so it is regenerated
+        return state
+
+    def __setstate__(self, state):
+        AbstractChomper.__setstate__(self, state)
+        self._code, self._entry = _Compiler(self._source).compile()
+
+
+class _Compiler(object):
+    def __init__(self, root):
+        self._root = root
+        self._ids = {}  # id of chomper -> index
+        self._namespace = {
+            "_FAIL": FAIL,
+            "_close": iters.close,
+            "_failed_lookahead": AbstractChomper._failed_lookahead,
+        }
+        self._lines = []
+        self._dispatches = []  # (index, chomper) of alternations with dispatch tables
+
+    def compile(self):
+        nodes = list(graph.walk(self._root))
+        for index, chomper in enumerate(nodes):
+            self._ids[id(chomper)] = index
+        for index, chomper in enumerate(nodes):
+            self._namespace["_c{}".format(index)] = chomper
+            self._emit_node(index, chomper)
+        code = "\n".join(self._lines) + "\n"
+        namespace = self._namespace
+        exec(compile(code, "<fro compiled parser>", "exec"), namespace)
+        for index, chomper in self._dispatches:
+            namespace["_d{}".format(index)] = dict(
+                (char, self._functions(chompers_))
+                for char, chompers_ in chomper._dispatch.items())
+            namespace["_u{}".format(index)] = self._functions(chomper._undetermined)
+        return code, namespace["_n0"]
+
+    # internals
+
+    def _functions(self, chompers_):
+        # the SkippedBranches of dispatch tables are not nodes, so they chomp uncompiled
+        return tuple(self._namespace[self._fn(c)] if id(c) in self._ids else c.chomp for c in chompers_)
+
+    def _fn(self, chomper):
+        return "_n{}".format(self._ids[id(chomper)])
+
+    def _emit(self, *lines):
+        self._lines.extend(lines)
+
+    def _emit_node(self, i, chomper):
+        if isinstance(chomper, regex.RegexChomper):
+            body = self._regex_body
+        elif isinstance(chomper, regex.GroupRegexChomper):
+            body = self._group_regex_body
+        elif type(chomper) is composition.CompositionChomper:
+            body = self._composition_body
+        elif type(chomper) is sequence.SequenceChomper:
+            body = self._sequence_body
+        elif type(chomper) is alternation.AlternationChomper:
+            body = self._alternation_body
+        elif type(chomper) is util.OptionalChomper:
+            body = self._optional_body
+        elif type(chomper) is util.StubChomper:
+            body = self._stub_body
+        elif type(chomper) is until.UntilChomper:
+            body = self._until_body
+        elif type(chomper) is util.ChainChomper:
+            # compile each level of the chain as it is generated
+            carbon = copy.copy(chomper)
+            carbon._generation_func = _CompilingGeneration(chomper._generation_func)
+            carbon._chomper = None
+            carbon._bind_chomp()
+            self._namespace["_c{}".format(i)] = carbon
+            self._emit_fallback(i)
+            return
+        else:
+            self._emit_fallback(i)
+            return
+
+        wrapped = chomper._name is not None or chomper._func is not None
+        fn = "_b{}".format(i) if wrapped else "_n{}".format(i)
+        self._emit("", "def {}(state, tracker):".format(fn))
+        body(i, chomper)
+        if wrapped:
+            self._emit_wrapper(i, chomper)
+
+    def _emit_wrapper(self, i, chomper):
+        # the bookkeeping of AbstractChomper.chomp
+        lines = ["", "def _n{}(state, tracker):".format(i)]
+        if chomper._name is not None:
+            self._namespace["_name{}".format(i)] = chomper._name
+            lines.append("    tracker._names.append(_name{})".format(i))
+        lines.append("    v = _b{}(state, tracker)".format(i))
+        if chomper._func is not None:
+            # the steps of the func are applied inline
+            lines.append("    if v is not _FAIL:")
+            for index, (kind, func) in enumerate(pipeline.steps(chomper._func)):
+                step = "_f{}_{}".format(i, index)
+                self._namespace[step] = func
+                if kind == pipeline.MAP:
+                    lines.append("        v = {}(v)".format(step))
+                elif kind == pipeline.UNPACK:
+                    lines.append("        v = {}(*v)".format(step))
+                else:
+                    lines.append("        v, = v")
+        if chomper._name is not None:
+            lines.append("    tracker._names.pop()")
+        lines.append("    return v")
+        self._emit(*lines)
+
+    def _emit_fallback(self, i):
+        self._emit(
+            "",
+            "_n{0} = _c{0}.chomp".format(i))
+
+    def _emit_advance(self, end):
+        # state.advance_to(..) only does work past state._refill_at (e.g. at the end of a chunk)
+        self._emit(
+            "    if {} >= state._refill_at:".format(end),
+            "        state.advance_to({})".format(end),
+            "    else:",
+            "        state._column = {}".format(end))
+
+    def _regex_body(self, i, chomper):
+        self._namespace["_m{}".format(i)] = chomper._match
+        self._emit(
+            "    line = state._curr",
+            "    col = state._column",
+            "    match = _m{}(line, col)".format(i),
+            "    if match is None:",
+            "        tracker.report_failure(_c{}, state)".format(i),
+            "        return _FAIL",
+            "    end = match.end()")
+        self._emit_advance("end")
+        if isinstance(chomper, regex.Recognizing):
+            self._emit("    return None")
+        else:
+            self._emit("    return line[col:end]")
+
+    def _group_regex_body(self, i, chomper):
+        self._namespace["_m{}".format(i)] = chomper._regex.match
+        self._emit(
+            "    match = _m{}(state._curr, state._column)".format(i),
+            "    if match is None:",
+            "        tracker.report_failure(_c{}, state)".format(i),
+            "        return _FAIL",
+            "    end = match.end()")
+        self._emit_advance("end")
+        self._emit("    return match.groups()")
+
+    def _composition_body(self, i, chomper):
+        values = []
+        for index, child in enumerate(chomper._chompers):
+            if index > 0 and chomper._separator is not None:
+                self._emit(
+                    "    if {}(state, tracker) is _FAIL:".format(self._fn(chomper._separator)),
+                    "        return _FAIL")
+            value = "v{}".format(index)
+            self._emit(
+                "    {} = {}(state, tracker)".format(value, self._fn(child)),
+                "    if {} is _FAIL:".format(value),
+                "        return _FAIL")
+            if child._significant:
+                values.append(value)
+        if len(chomper._chompers) == 0:
+            # matches CompositionChomper, which cannot succeed without children
+            self._emit("    raise AssertionError()")
+            return
+        if chomper._single:
+            self._emit("    return {}".format(values[0]))
+        else:
+            self._emit("    return ({})".format("".join(v + ", " for v in values)))
+
+    def _sequence_body(self, i, chomper):
+        self._namespace["_r{}".format(i)] = chomper._reducer
+        self._emit(
+            "    iterator = _g{}(state, tracker)".format(i),
+            "    value = _r{}(iterator)".format(i),
+            "    _close(iterator)",
+            "    return value",
+            "",
+            "def _g{}(state, tracker):".format(i),
+            "    rollback_line = state._line",
+            "    rollback_col = state._column",
+            "    while True:",
+            "        v = {}(state, tracker)".format(self._fn(chomper._element)),
+            "        if v is _FAIL:",
+            "            if state._line == rollback_line:",
+            "                state._column = rollback_col",
+            "            elif not state.rollback(rollback_line, rollback_col):",
+            "                _failed_lookahead(state, tracker)",
+            "            return",
+            "        yield v",
+            "        rollback_line = state._line",
+            "        rollback_col = state._column")
+        if chomper._separator is not None:
+            self._emit(
+                "        if {}(state, tracker) is _FAIL:".format(self._fn(chomper._separator)),
+                "            if state._line == rollback_line:",
+                "                state._column = rollback_col",
+                "            elif not state.rollback(rollback_line, rollback_col):",
+                "                _failed_lookahead(state, tracker)",
+                "            return")
+
+    def _alternation_body(self, i, chomper):
+        self._emit(
+            "    col = state._column",
+            "    line = state._line")
+        if chomper._dispatch is None:
+            for child in chomper._chompers:
+                self._emit(
+                    "    v = {}(state, tracker)".format(self._fn(child)),
+                    "    if v is not _FAIL:",
+                    "        return v",
+                    "    if state._line == line:",
+                    "        state._column = col",
+                    "    elif not state.rollback(line, col):",
+                    "        _failed_lookahead(state, tracker)")
+            self._emit("    return _FAIL")
+            return
+
+        # the tables map to generated functions, so they are filled in after exec
+        self._dispatches.append((i, chomper))
+        self._emit(
+            "    if col < state._len_curr:",
+            "        branches = _d{0}.get(state._curr[col], _u{0})".format(i),
+            "    else:",
+            "        branches = _u{}".format(i),
+            "    for branch in branches:",
+            "        v = branch(state, tracker)",
+            "        if v is not _FAIL:",
+            "            return v",
+            "        if state._line == line:",
+            "            state._column = col",
+            "        elif not state.rollback(line, col):",
+            "            _failed_lookahead(state, tracker)",
+            "    return _FAIL")
+
+    def _optional_body(self, i, chomper):
+        self._namespace["_default{}".format(i)] = chomper._default
+        self._emit(
+            "    col = state._column",
+            "    line = state._line",
+            "    v = {}(state, tracker)".format(self._fn(chomper._child)),
+            "    if v is not _FAIL:",
+            "        return v",
+            "    if state._line == line:",
+            "        state._column = col",
+            "    elif not state.rollback(line, col):",
+            "        _failed_lookahead(state, tracker)",
+            "    return _default{}".format(i))
+
+    def _until_body(self, i, chomper):
+        self._namespace["_s{}".format(i)] = chomper._regex.search
+        if chomper._reducer is until.discard:
+            # nothing observes the consumed chunks, so just skip over them
+            self._emit(
+                "    while state._column != state._len_curr or not state.at_end():",
+                "        curr = state._curr",
+                "        match = _s{}(curr, state._column)".format(i),
+                "        if match is not None:",
+                "            state.advance_to(match.start())",
+                "            break",
+                "        state.advance_to(len(curr))",
+                "    return None")
+            return
+        self._namespace["_r{}".format(i)] = chomper._reducer
+        self._emit(
+            "    iterator = _g{}(state)".format(i),
+            "    value = _r{}(iterator)".format(i),
+            "    _close(iterator)",
+            "    return value",
+            "",
+            "def _g{}(state):".format(i),
+            "    start_index = state._column",
+            "    while state._column != state._len_curr or not state.at_end():",
+            "        curr = state._curr",
+            "        match = _s{}(curr, state._column)".format(i),
+            "        if match is not None:",
+            "            end_index = match.start()",
+            "            state.advance_to(end_index)",
+            "            yield curr[start_index:end_index]",
+            "            return",
+            "        yield curr[start_index:]",
+            "        state.advance_to(len(curr))",
+            "        start_index = state._column")
+
+    def _stub_body(self, i, chomper):
+        if chomper._delegate is None:
+            self._emit("    raise ValueError(\"Stub chomper has no delegate\")")
+        else:
+            self._emit("    return {}(state, tracker)".format(self._fn(chomper._delegate)))
+
+
+class _CompilingGeneration(object):
+    """
+    Generation function of a compiled ``ChainChomper``, which compiles every generated level
+    """
+    def __init__(self, generation_func):
+        self._generation_func = generation_func
+
+    def __call__(self, lazier):
+        return CompiledChomper(self._generation_func(lazier))
@@ -1,26 +1,60 @@
-from fro._implementation.chompers.abstract import AbstractChomper
+from fro._implementation.chompers import pipeline
+from fro._implementation.chompers.abstract import FAIL, AbstractChomper
 
 
 class CompositionChomper(AbstractChomper):
+    __slots__ = ("_chompers", "_separator", "_single")
 
     def __init__(self, chompers, separator=None, significant=True, name=None):
         AbstractChomper.__init__(self, significant, name)
         self._chompers = list(chompers)
         self._separator = separator  # self._separator may be None
+        self._single = False  # if the value of the only significant chomper is produced as is
 
     def _chomp(self, state, tracker):
         values = []
         length = len(self._chompers)
         for i, chomper in enumerate(self._chompers):
-            box_ = chomper.chomp(state, tracker)
-            if box_ is None:
-                return None
+            value = chomper.chomp(state, tracker)
+            if value is FAIL:
+                return FAIL
             if chomper._significant:
-                values.append(box_.value)
+                values.append(value)
             if i == length - 1:
-                box_.value = tuple(values)
-                return box_
+                return values[0] if self._single else tuple(values)
             elif self._separator is not None:
-                if self._separator.chomp(state, tracker) is None:
-                    return None
+                if self._separator.chomp(state, tracker) is FAIL:
+                    return FAIL
         raise AssertionError()
+
+    def _bind_chomp(self):
+        # comp([.., x, ..]).get() produces the value of x, without building a tuple to unpack
+        steps = pipeline.steps(self._func)
+        if not self._single and len(steps) > 0 and steps[0][0] == pipeline.GET \
+                and sum(1 for chomper in self._chompers if chomper._significant) == 1:
+            self._single = True
+            self._func = pipeline.build(steps[1:])
+        AbstractChomper._bind_chomp(self)
+
+    def _first_chars(self):
+        if len(self._chompers) == 0:
+            return None
+        return self._chompers[0]._first_chars()
+
+    def _failure_message(self):
+        return self._chompers[0]._failure_message()
+
+    def _first_failures(self, name):
+        return self._chompers[0]._first_failures(name if self._name is None else self._name)
+
+    def _children(self):
+        if self._separator is None:
+            return list(self._chompers)
+        return self._chompers + [self._separator]
+
+    def _set_children(self, children):
+        if self._separator is None:
+            self._chompers = list(children)
+        else:
+            self._chompers = list(children[:-1])
+            self._separator = children[-1]
@@ -0,0 +1,123 @@
+"""
+Utilities for walking and rewriting graphs of chompers
+"""
+
+import copy
+
+from fro._implementation.chompers import util
+
+
+def transform(root, wrap):
+    """
+    Returns a copy of the chomper graph rooted at ``root``, in which every chomper
+    has been replaced by ``wrap`` applied to a copy of itself. The original graph is
+    not modified. Cycles (via ``tie``) are preserved, and chompers that are produced
+    lazily during parsing (by ``chain`` and ``thunk``) are transformed as they are
+    produced.
+
+    :param root: root of the graph to transform
+    :param wrap: function from (copied) chomper to chomper
+    :return: root of the transformed graph
+    """
+    return _Transformer(wrap).visit(root)
+
+
+def walk(root):
+    """
+    Yields every chomper reachable from ``root`` exactly once, parents before children.
+    Chompers that are produced lazily during parsing are not included.
+
+    :param root: root of the graph to walk
+    :return: iterator of chompers
+    """
+    seen = set()
+    stack = [root]
+    while len(stack) > 0:
+        chomper = stack.pop()
+        if id(chomper) in seen:
+            continue
+        seen.add(id(chomper))
+        yield chomper
+        stack.extend(reversed(chomper._children()))
+
+
+def empty_chunk(root):
+    """
+    :param root: root of a graph of chompers
+    :return: ``b""`` if the first regex found in the graph is a bytes regex, and ``""`` otherwise
+    """
+    stack = [root]
+    seen = set()
+    while len(stack) > 0:
+        chomper = stack.pop()
+        if id(chomper) in seen:
+            continue
+        seen.add(id(chomper))
+        regex = getattr(chomper, "_regex", None) or getattr(chomper, "_open_regex", None)
+        if regex is not None:
+            return regex.pattern[:0]
+        source = getattr(chomper, "_source", None)  # of a CompiledChomper, which has no children
+        if source is not None:
+            stack.append(source)
+        stack.extend(reversed(chomper._children()))
+    return ""
+
+
+class _Transformer(object):
+    def __init__(self, wrap):
+        self._wrap = wrap
+        self._done = {}  # id of original chomper -> (original, transformed)
+
+    def visit(self, chomper):
+        key = id(chomper)
+        if key in self._done:
+            return self._done[key][1]
+        carbon = copy.copy(chomper)
+        carbon._bind_chomp()
+        wrapped = self._wrap(carbon)
+        # the original is kept alive alongside its id, so the id cannot be reused
+        self._done[key] = (chomper, wrapped)
+        if isinstance(chomper, util.ChainChomper):
+            carbon._generation_func = _TransformedGeneration(
+                chomper._generation_func, self._wrap)
+            carbon._chomper = None
+        elif isinstance(chomper, util.ThunkChomper):
+            carbon._thunk = _TransformedThunk(chomper._thunk, self._wrap)
+        else:
+            carbon._set_children([self.visit(c) for c in chomper._children()])
+        return wrapped
+
+    def seed(self, chomper, transformed):
+        self._done[id(chomper)] = (chomper, transformed)
+
+
+class _TransformedGeneration(object):
+    """
+    Generation function for a transformed ``ChainChomper``. The "lazier" chomper passed
+    in was created by a transformed chomper, so it is wrapped but not copied again.
+    """
+    def __init__(self, generation_func, wrap):
+        self._generation_func = generation_func
+        self._wrap = wrap
+
+    def __call__(self, lazier):
+        transformer = _Transformer(self._wrap)
+        transformer.seed(lazier, self._wrap(lazier))
+        return transformer.visit(self._generation_func(lazier))
+
+
+class _TransformedThunk(object):
+    """
+    Thunk of a transformed ``ThunkChomper``. A thunk often produces the same chomper repeatedly
+    (see ``ThunkCache``), so the transformed copies of recently produced chompers are reused.
+    """
+    def __init__(self, thunk, wrap):
+        self._thunk = thunk
+        self._wrap = wrap
+        self._cache = util.ThunkCache()
+
+    def __call__(self):
+        return self._cache._get(self._thunk(), self._transform)
+
+    def _transform(self, chomper):
+        return transform(chomper, self._wrap)
@@ -0,0 +1,226 @@
+from fro._implementation.chompers.abstract import _COLUMN_BITS, FAIL, AbstractChomper, FroParseErrorTracker
+from fro._implementation.chompers.chomp_error import ChompError
+
+_FAILED = (None, None)
+
+
+class MemoTable(object):
+    """
+    A packrat memo table, which caches the outcome of each (sub-)parser at each position of the
+    input. Only positions in the current chunk are retained, since parsing never revisits earlier
+    chunks, so memory use is bounded by the size of a chunk (or by ``max_entries``).
+    """
+    def __init__(self, max_entries=None):
+        """
+        :param int max_entries: maximum number of cached outcomes, or ``None`` for no limit
+        """
+        self._max_entries = max_entries
+        self._entries = {}
+        self._line = None
+        self._hits = 0
+        self._misses = 0
+
+    def hits(self):
+        """
+        Return the number of chomps that were answered from the table
+
+        :return: number of cache hits
+        :rtype: int
+        """
+        return self._hits
+
+    def misses(self):
+        """
+        Return the number of chomps that had to be performed because they were not in the table
+
+        :return: number of cache misses
+        :rtype: int
+        """
+        return self._misses
+
+    # internals
+
+    def _evict(self, line):
+        self._entries.clear()
+        self._line = line
+
+    def _store(self, key, entry):
+        entries = self._entries
+        if self._max_entries is not None and len(entries) >= self._max_entries:
+            entries.clear()
+        entries[key] = entry
+
+
+class MemoChomper(AbstractChomper):
+    """
+    Wraps a chomper, consulting the ``MemoTable`` of the current parse before delegating
+    to it. Outcomes that end in a different chunk than they started in are not cached,
+    since the chunk they started in can never be revisited.
+    """
+    __slots__ = ("_child",)
+
+    def __init__(self, child):
+        AbstractChomper.__init__(self, child.significant(), None)
+        self._child = child
+
+    def _chomp(self, state, tracker):
+        table = state._memo
+        line = state._line
+        if table._line != line:
+            table._evict(line)
+        key = (self, state._column)
+        entry = table._entries.get(key)
+        if entry is not None:
+            table._hits += 1
+            value, end = entry
+            if end is None:
+                return FAIL
+            state.advance_to(end)
+            return value
+        table._misses += 1
+        value = self._child.chomp(state, tracker)
+        if state._line == line:
+            table._store(key, _FAILED if value is FAIL else (value, state._column))
+        return value
+
+    def _first_chars(self):
+        return self._child._first_chars()
+
+    def _failure_message(self):
+        return self._child._failure_message()
+
+    def _first_failures(self, name):
+        return self._child._first_failures(name)
+
+    def _children(self):
+        return [self._child]
+
+    def _set_children(self, children):
+        self._child, = children
+
+
+class SpanMemoTable(object):
+    """
+    The memo table of an incremental parse (see ``Parser.parse_incremental(..)``), which keeps the outcomes
+    of chomps across the versions of an edited input. Chunks get a new id whenever they are edited, so an
+    outcome is keyed by the id of the chunk it started in, and records the id of the chunk it ended in.
+    An outcome can be reused if the chunks in between are still the same, which is the case if they
+    all existed when the outcome was recorded (as ids are never reused, and edits only replace chunks).
+
+    Only successful chomps that start at the beginning of a chunk or span several chunks are kept, which
+    bounds the size of the table by the number of chunks (times the depth of the parser). Other chomps
+    are repeated when the chomps that contain them are repeated, which they only are when they contain
+    an edit.
+    """
+    def __init__(self, chomper):
+        """
+        :param chomper: root of the graph of ``SpanMemoChomper`` that the table is for
+        """
+        self._chomper = chomper
+        self._entries = {}  # id of chunk -> {(chomper, column) -> entry}
+        self._next_id = 0  # id of the next new chunk
+        self._epoch = 0  # value of self._next_id when the current parse started
+        self._head = None  # the most recent parse that used the table
+        self._hits = 0
+        self._misses = 0
+
+    # internals
+
+    def _new_ids(self, count):
+        ids = list(range(self._next_id, self._next_id + count))
+        self._next_id += count
+        return ids
+
+    def _forget(self, ids):
+        """
+        Drops the outcomes that start in the chunks with the given ids, which no longer exist
+        """
+        entries = self._entries
+        for chunk_id in ids:
+            entries.pop(chunk_id, None)
+
+    def _valid(self, entry, ids, line):
+        """
+        :return: if ``entry``, recorded for a chomp that started in chunk ``ids[line]``, is still valid
+        """
+        span = entry[1]
+        end = line + span
+        if end >= len(ids) or (end + 1 < len(ids)) != entry[5]:
+            return False  # the chomp may have depended on whether there was a chunk after its last
+        elif span == 0:
+            return True
+        return ids[end] == entry[2] and (span == 1 or max(ids[line + 1:end]) < entry[4])
+
+    def _store(self, chomper, ids, line, column, value, end, end_column, tracker):
+        """
+        Records the successful chomp of ``chomper`` from ``column`` of chunk ``ids[line]`` to ``end_column``
+        of chunk ``ids[end]``, during which the failures in ``tracker`` were reported
+        """
+        failures = None
+        if len(tracker._sources) > 0:
+            if any(isinstance(source, ChompError) for source in tracker._sources):
+                return  # their locations cannot be moved along with the chomp
+            failures = (tracker._position - (line << _COLUMN_BITS),
+                        tuple(tracker._sources), tuple(tracker._source_names))
+        chunk_entries = self._entries.get(ids[line])
+        if chunk_entries is None:
+            chunk_entries = self._entries[ids[line]] = {}
+        chunk_entries[(chomper, column)] = (value, end - line, ids[end], end_column, self._epoch,
+                                            end + 1 < len(ids), failures)
+
+
+class SpanMemoChomper(AbstractChomper):
+    """
+    Wraps a chomper, consulting the ``SpanMemoTable`` of the current incremental parse before delegating
+    to it. The failures that the chomper reports while chomping are kept with its outcome, and reported
+    again whenever the outcome is reused, so that parse errors do not depend on what was reused.
+    """
+    __slots__ = ("_child",)
+
+    def __init__(self, child):
+        AbstractChomper.__init__(self, child.significant(), None)
+        self._child = child
+
+    def _chomp(self, state, tracker):
+        table = state._memo
+        line = state._line
+        column = state._column
+        ids = state._ids
+        chunk_entries = table._entries.get(ids[line])
+        if chunk_entries is not None:
+            entry = chunk_entries.get((self, column))
+            if entry is not None and table._valid(entry, ids, line):
+                table._hits += 1
+                value, span, _, end_column, _, _, failures = entry
+                if failures is not None:
+                    position, sources, source_names = failures
+                    position += line << _COLUMN_BITS
+                    tracker._absorb(position, state._chunks[position >> _COLUMN_BITS], None,
+                                    sources, source_names)
+                state._jump(line + span, end_column)
+                return value
+        table._misses += 1
+        # the failures of the child are collected separately, so that they can be kept with its outcome
+        inner = FroParseErrorTracker(tracker._max_errors)
+        inner._names = tracker._names
+        value = self._child.chomp(state, inner)
+        tracker._absorb(inner._position, inner._text, inner._frame, inner._sources, inner._source_names)
+        end = state._line
+        if value is not FAIL and (column == 0 or end != line):
+            table._store(self, ids, line, column, value, end, state._column, inner)
+        return value
+
+    def _first_chars(self):
+        return self._child._first_chars()
+
+    def _failure_message(self):
+        return self._child._failure_message()
+
+    def _first_failures(self, name):
+        return self._child._first_failures(name)
+
+    def _children(self):
+        return [self._child]
+
+    def _set_children(self, children):
+        self._child, = children
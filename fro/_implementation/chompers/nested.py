@@ -2,32 +2,40 @@ import re
 
 from fro._implementation import iters, parse_error
 from fro._implementation.chompers import abstract, chomp_error, regex
-from fro._implementation.chompers.box import Box
 
 class NestedChomper(abstract.AbstractChomper):
+    __slots__ = ("_open_regex", "_close_regex", "_scanner", "_reducer")
+
     def __init__(self, open_regex_string, close_regex_string, reducer,
                  significant=True, name=None):
         abstract.AbstractChomper.__init__(self, significant, name)
         self._open_regex = re.compile(open_regex_string)
         self._close_regex = re.compile(close_regex_string)
+        self._scanner = scanner(self._open_regex, self._close_regex)  # may be None
         self._reducer = reducer
 
     def _chomp(self, state, tracker):
-        match = regex.regex_chomp(self._open_regex, state, tracker)
+        match = regex.regex_chomp(self, self._open_regex, state, tracker)
         if match is None:
-            return None
+            return abstract.FAIL
         err = self._err(
             self._open_regex.pattern,
             self._close_regex.pattern,
             state.location(),
             tracker.current_name())
         state.advance_to(match.end())
-        iterable = NestedIterable(state, self._open_regex, self._close_regex,
+        iterable = NestedIterable(state, self._open_regex, self._close_regex, self._scanner,
                                   lambda: self._raise(err))
         iterator = iter(iterable)
         value = self._apply(tracker, state, self._reducer, iterator)
         iters.close(iterator)
-        return Box(value)
+        return value
+
+    def _failure_message(self):
+        return regex._expected_message(self._open_regex.pattern)
+
+    def _first_chars(self):
+        return regex.first_chars(self._open_regex)
 
     @staticmethod
     def _err(open_str, close_str, location, name):
@@ -42,43 +50,86 @@ class NestedChomper(abstract.AbstractChomper):
 
 
 class NestedIterable(object):
-    def __init__(self, state, open_regex, close_regex, failure_callback):
+    __slots__ = ("_state", "_open_regex", "_close_regex", "_scanner", "_failure_callback")
+
+    def __init__(self, state, open_regex, close_regex, scanner_, failure_callback):
         self._state = state
         self._open_regex = open_regex
         self._close_regex = close_regex
+        self._scanner = scanner_  # may be None
         self._failure_callback = failure_callback
 
     def __iter__(self):
-        start_index = self._state.column()
+        state = self._state
+        delimiters = self._scanned_delimiters if self._scanner is not None else self._searched_delimiters
+        start_index = state._column
         nesting_level = 1
-        while nesting_level > 0:
-            current = self._state.current()
-            sentinel = self.sentinel(current)
-            open_start, open_end = self.match_indices(self._open_regex)
-            close_start, close_end = self.match_indices(self._close_regex)
-            if open_start == sentinel and close_start == sentinel:
-                yield current[start_index:]
-                self._state.advance_to(len(current))
-                start_index = 0
-                if self._state.at_end():
-                    self._failure_callback()
-            elif close_start < open_start:
+        while True:
+            current = state._curr
+            for is_open, start, end in delimiters(current, state._column):
+                if is_open:
+                    nesting_level += 1
+                    continue
                 nesting_level -= 1
                 if nesting_level == 0:
-                    yield self._state.current()[start_index:close_start]
-                self._state.advance_to(close_end)
+                    yield current[start_index:start]
+                    state.advance_to(end)
+                    return
+            yield current[start_index:]
+            state.advance_to(len(current))
+            start_index = state._column  # past the characters that a refill kept
+            if state.at_end():
+                self._failure_callback()
+
+    def _scanned_delimiters(self, current, column):
+        """
+        Yields an (is_open, start, end) triple for each delimiter in ``current`` from ``column`` on,
+        found in a single pass of the combined scanner
+        """
+        marker = self._open_regex.groups + 1  # the empty group after the open regex's own groups
+        for match in self._scanner.finditer(current, column):
+            yield match.start(marker) >= 0, match.start(), match.end()
+
+    def _searched_delimiters(self, current, column):
+        """
+        Like ``_scanned_delimiters(..)``, for regexes that cannot be combined. Each regex is only
+        searched again once the delimiters before its previous match have been consumed.
+        """
+        open_regex = self._open_regex
+        close_regex = self._close_regex
+        open_match = open_regex.search(current, column)
+        close_match = close_regex.search(current, column)
+        while open_match is not None or close_match is not None:
+            if close_match is not None and (open_match is None or close_match.start() < open_match.start()):
+                column = close_match.end()
+                yield False, close_match.start(), column
             else:
-                nesting_level += 1
-                self._state.advance_to(open_end)
+                column = open_match.end()
+                yield True, open_match.start(), column
+            # the leftmost match from a later column is the same, if it starts at or after that column
+            if open_match is not None and open_match.start() < column:
+                open_match = open_regex.search(current, column)
+            if close_match is not None and close_match.start() < column:
+                close_match = close_regex.search(current, column)
 
-    def match_indices(self, regex):
-        curr = self._state.current()
-        match = regex.search(curr, self._state.column())
-        if match is None:
-            sentinel = NestedIterable.sentinel(curr)
-            return sentinel, sentinel
-        return match.start(), match.end()
 
-    @staticmethod
-    def sentinel(row):
-        return len(row) + 1
+def scanner(open_regex, close_regex):
+    """
+    :return: compiled regex that matches the earliest delimiter (``open_regex`` or ``close_regex``,
+             preferring ``open_regex`` if both start at the same position), with the group after the
+             groups of ``open_regex`` taking part only in matches of ``open_regex``, or None if the
+             regexes cannot be combined or both start with literal text (which separate searches find
+             faster than a combined regex, without rescanning since ``NestedIterable`` keeps their
+             matches)
+    """
+    open_pattern = open_regex.pattern
+    close_pattern = close_regex.pattern
+    if type(open_pattern) is not type(close_pattern) \
+            or not regex.fusable(open_regex) or not regex.fusable(close_regex):
+        return None
+    elif len(regex.literal_prefix(open_regex)) > 0 and len(regex.literal_prefix(close_regex)) > 0:
+        return None
+    # an empty group after open_pattern (rather than a group around it) keeps the regex simple to optimize
+    if isinstance(open_pattern, bytes):
+        return re.compile(b"(?:" + open_pattern + b")()|(?:" + close_pattern + b")")
+    return re.compile("(?:{})()|(?:{})".format(open_pattern, close_pattern))
@@ -0,0 +1,186 @@
+"""
+Rewrites graphs of chompers into equivalent graphs that are cheaper to chomp with (see ``Parser.optimize()``)
+"""
+
+import copy
+
+from fro._implementation.chompers import composition, graph, regex, sequence, until, util
+
+
+def optimize(root, pure_funcs=True):
+    """
+    Returns the root of an optimized copy of the chomper graph rooted at ``root``. The copy produces the
+    same values, and reports failures at the same positions. The original graph is not modified.
+
+    :param root: root of the graph to optimize
+    :param bool pure_funcs: if funcs whose values are discarded may be dropped
+    :return: root of the optimized graph
+    """
+    return _Optimizer(pure_funcs).visit(root)
+
+
+def node_count(root):
+    """
+    :return: number of chompers reachable from ``root``
+    """
+    return sum(1 for _ in graph.walk(root))
+
+
+class _Optimizer(object):
+    def __init__(self, pure_funcs):
+        self._pure_funcs = pure_funcs
+        self._done = {}  # id of original chomper -> (original, optimized)
+        self._in_progress = set()  # ids of optimized chompers whose children are not optimized yet
+
+    def visit(self, chomper):
+        key = id(chomper)
+        if key in self._done:
+            return self._done[key][1]
+        if _inlinable_stub(chomper):
+            result = self.visit(chomper._delegate)
+        elif _collapsible_optional(chomper):
+            # the default is never produced, so the optional is its child with the optional's properties
+            result = self.visit(chomper._child).clone(
+                significant=chomper._significant, name=chomper._name, func=chomper._func)
+        else:
+            result = self._visit_copy(chomper)
+        # the original is kept alive alongside its id, so the id cannot be reused
+        self._done[key] = (chomper, result)
+        return result
+
+    def _visit_copy(self, chomper):
+        carbon = copy.copy(chomper)
+        carbon._bind_chomp()
+        # registered before the children are visited, so that cycles lead back to the copy
+        self._done[id(chomper)] = (chomper, carbon)
+        if isinstance(chomper, util.ChainChomper):
+            carbon._generation_func = _OptimizingGeneration(chomper._generation_func, self._pure_funcs)
+            carbon._chomper = None
+            return carbon
+        elif isinstance(chomper, util.ThunkChomper):
+            return carbon
+        self._in_progress.add(id(carbon))
+        carbon._set_children([self.visit(child) for child in chomper._children()])
+        self._in_progress.discard(id(carbon))
+        if type(carbon) is composition.CompositionChomper:
+            self._optimize_composition(carbon)
+        elif type(carbon) is sequence.SequenceChomper and carbon._separator is not None:
+            carbon._separator = self._discarded(carbon._separator)
+        return carbon
+
+    def _optimize_composition(self, carbon):
+        if carbon._separator is not None:
+            carbon._separator = self._discarded(carbon._separator)
+            carbon._chompers = [self._discarded(c) if not c._significant else c for c in carbon._chompers]
+            return
+        chompers = []
+        for chomper in carbon._chompers:
+            if not self._flattenable(chomper):
+                chompers.append(chomper)
+                continue
+            for child in chomper._chompers:
+                if not chomper._significant:
+                    child = self._insignificant(child)
+                if chomper._name is not None:
+                    child = _named(child, chomper._name)
+                chompers.append(child)
+        chompers = [self._discarded(c) if not c._significant else c for c in chompers]
+        carbon._chompers = _concatenate_regexes(chompers)
+
+    def _flattenable(self, chomper):
+        """
+        :return: if ``chomper`` is a composition whose children can replace it inside a composition
+                 without a separator, i.e. it has no separator or func, and produces its only
+                 significant value as is (or is insignificant)
+        """
+        return type(chomper) is composition.CompositionChomper and id(chomper) not in self._in_progress \
+            and chomper._separator is None and chomper._func is None \
+            and len(chomper._chompers) > 0 and (chomper._single or not chomper._significant)
+
+    def _insignificant(self, chomper):
+        return chomper if not chomper._significant else chomper.clone(significant=False)
+
+    def _discarded(self, chomper):
+        """
+        :return: ``chomper``, without its func if it can be dropped, for a chomper whose values are discarded
+        """
+        if not self._pure_funcs or chomper._func is None or chomper._stateful \
+                or id(chomper) in self._in_progress:
+            return chomper
+        carbon = copy.copy(chomper)
+        carbon._func = None
+        carbon._bind_chomp()
+        return carbon
+
+
+class _OptimizingGeneration(object):
+    """
+    Generation function of an optimized ``ChainChomper``, which optimizes every generated level
+    """
+    def __init__(self, generation_func, pure_funcs):
+        self._generation_func = generation_func
+        self._pure_funcs = pure_funcs
+
+    def __call__(self, lazier):
+        optimizer = _Optimizer(self._pure_funcs)
+        optimizer._done[id(lazier)] = (lazier, lazier)  # created by an optimized chomper
+        return optimizer.visit(self._generation_func(lazier))
+
+
+def _named(chomper, name):
+    """
+    :return: ``chomper``, named ``name`` if it is unnamed and may report errors, so that its errors are
+             reported under the same name as when it was inside a composition named ``name``
+    """
+    if chomper._name is not None or (isinstance(chomper, regex.RegexChomper)
+                                     and regex.always_matches(chomper._regex)):
+        return chomper
+    return chomper.clone(name=name)
+
+
+def _inlinable_stub(chomper):
+    delegate = getattr(chomper, "_delegate", None)
+    return type(chomper) is util.StubChomper and delegate is not None and chomper._name is None \
+        and chomper._func is None and chomper._significant == delegate._significant
+
+
+def _collapsible_optional(chomper):
+    if type(chomper) is not util.OptionalChomper:
+        return False
+    child = chomper._child
+    if chomper._name is not None and child._name is not None:
+        return False  # both names are offered to the tracker
+    return _always_succeeds(child)
+
+
+def _always_succeeds(chomper):
+    """
+    :return: whether ``chomper`` can never fail (although it may raise an error)
+    """
+    if type(chomper) in (sequence.SequenceChomper, util.OptionalChomper, until.UntilChomper):
+        return True
+    return isinstance(chomper, regex.RegexChomper) and regex.always_matches(chomper._regex)
+
+
+def _concatenate_regexes(chompers):
+    """
+    :return: ``chompers``, with each run of concatenable regex chompers replaced by a single chomper
+    """
+    result = []
+    run = []
+    for chomper in chompers + [None]:
+        if chomper is not None and regex.concatenable(chomper) and \
+                (len(run) == 0 or type(run[0]._pattern) is type(chomper._pattern)):
+            run.append(chomper)
+            continue
+        if len(run) == 1:
+            result.append(run[0])
+        elif len(run) > 1:
+            result.append(regex.ConcatenatedRegexChomper(run))
+        run = []
+        if chomper is not None:
+            if regex.concatenable(chomper):
+                run = [chomper]
+            else:
+                result.append(chomper)
+    return result
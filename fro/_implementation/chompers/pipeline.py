@@ -0,0 +1,81 @@
+"""
+The funcs that chompers apply to the values they produce (see ``AbstractChomper.clone(..)``).
+
+A chomper's func is either a plain callable, or a ``Pipeline`` of steps that are applied one after
+the other. Building a func out of ``|``, ``>>`` and ``.get()`` composes pipelines, so that a
+chomper applies all of its funcs in a single flat loop instead of through nested closures.
+"""
+
+# kinds of steps
+MAP = 0  # value = func(value)
+UNPACK = 1  # value = func(*value)
+GET = 2  # value, = value
+
+
+class Pipeline(object):
+    """
+    A sequence of (kind, func) steps, applied in order to a produced value. Pipelines are built by
+    the functions of this module, which never build a pipeline of a single ``MAP`` step.
+    """
+    __slots__ = ("_steps",)
+
+    def __init__(self, steps):
+        self._steps = tuple(steps)
+
+    def __call__(self, value):
+        for kind, func in self._steps:
+            if kind == MAP:
+                value = func(value)
+            elif kind == UNPACK:
+                value = func(*value)
+            else:
+                value, = value
+        return value
+
+    def __getstate__(self):
+        return self._steps
+
+    def __setstate__(self, state):
+        self._steps = state
+
+
+def steps(func):
+    """
+    :return: tuple of the (kind, func) steps of ``func``
+    """
+    if func is None:
+        return ()
+    elif isinstance(func, Pipeline):
+        return func._steps
+    return (MAP, func),
+
+
+def unpacking(func):
+    """
+    :return: func that unpacks a value into the arguments of ``func``
+    """
+    return Pipeline([(UNPACK, func)])
+
+
+#: func that retrieves the sole element of a value
+GETTING = Pipeline([(GET, None)])
+
+
+def compose(inner, outer):
+    """
+    :param inner: func (or None) applied first
+    :param outer: func (or None) applied to the result of ``inner``
+    :return: func equivalent to applying ``inner`` and then ``outer``, or None if both are None
+    """
+    return build(steps(inner) + steps(outer))
+
+
+def build(steps_):
+    """
+    :return: the simplest func that applies ``steps_``, or None if there are no steps
+    """
+    if len(steps_) == 0:
+        return None
+    elif len(steps_) == 1 and steps_[0][0] == MAP:
+        return steps_[0][1]
+    return Pipeline(steps_)
@@ -0,0 +1,84 @@
+"""
+Builds copies of graphs of chompers that only recognize their input (see ``Parser.matches(..)``)
+"""
+
+import copy
+
+from fro._implementation.chompers import compiler, composition, nested, regex, sequence, until, util
+
+
+def recognizer(root):
+    """
+    Returns the root of a copy of the chomper graph rooted at ``root`` that succeeds and fails like
+    the original, but does not produce values: regexes do not slice out the text they chomp,
+    compositions do not build tuples, and reducers and funcs are not called. Stateful chompers
+    (see ``Parser.stateful()``) and their descendants are kept as they are, so that their funcs
+    still see the values they would see when parsing. The original graph is not modified.
+
+    :param root: root of the graph to copy
+    :return: root of the recognizing graph
+    """
+    return _Recognizer().visit(root)
+
+
+class _Recognizer(object):
+    def __init__(self):
+        self._done = {}  # id of original chomper -> (original, recognizing copy)
+
+    def visit(self, chomper):
+        if chomper._stateful:
+            return chomper
+        key = id(chomper)
+        if key in self._done:
+            return self._done[key][1]
+        if type(chomper) in (regex.RegexChomper, regex.FusedRegexChomper):
+            carbon = regex.recognizing(chomper)
+            carbon._significant = False
+        elif type(chomper) is compiler.CompiledChomper:
+            carbon = compiler.CompiledChomper(self.visit(chomper._source))
+        else:
+            carbon = copy.copy(chomper)
+            carbon._significant = False
+            carbon._func = None
+            carbon._bind_chomp()
+        # the original is kept alive alongside its id, so the id cannot be reused
+        self._done[key] = (chomper, carbon)
+        if isinstance(chomper, util.ChainChomper):
+            carbon._generation_func = _RecognizingGeneration(chomper._generation_func)
+            carbon._chomper = None
+        elif isinstance(chomper, util.ThunkChomper):
+            carbon._thunk = _RecognizingThunk(chomper._thunk)
+        elif type(chomper) is not compiler.CompiledChomper:
+            carbon._set_children([self.visit(child) for child in chomper._children()])
+        if type(chomper) is composition.CompositionChomper:
+            carbon._single = False
+        elif type(chomper) in (sequence.SequenceChomper, nested.NestedChomper, until.UntilChomper):
+            carbon._reducer = until.discard  # the consumed input is still drained by the chomper
+        return carbon
+
+
+class _RecognizingGeneration(object):
+    """
+    Generation function of a recognizing ``ChainChomper``, which builds a recognizing copy of every
+    generated level
+    """
+    def __init__(self, generation_func):
+        self._generation_func = generation_func
+
+    def __call__(self, lazier):
+        recognizer_ = _Recognizer()
+        recognizer_._done[id(lazier)] = (lazier, lazier)  # created by a recognizing chomper
+        return recognizer_.visit(self._generation_func(lazier))
+
+
+class _RecognizingThunk(object):
+    """
+    Thunk of a recognizing ``ThunkChomper``, which reuses the recognizing copies of recently produced
+    chompers (see ``ThunkCache``)
+    """
+    def __init__(self, thunk):
+        self._thunk = thunk
+        self._cache = util.ThunkCache()
+
+    def __call__(self):
+        return self._cache._get(self._thunk(), recognizer)
@@ -1,21 +1,33 @@
+import copy
 import re
 
-from fro._implementation.chompers.abstract import AbstractChomper
-from fro._implementation.chompers.chomp_error import ChompError
-from fro._implementation.chompers.box import Box
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+from fro._implementation.chompers.abstract import FAIL, AbstractChomper
+
 
 class GroupRegexChomper(AbstractChomper):
+    __slots__ = ("_regex",)
 
     def __init__(self, regex_str, significant=True, name=None):
         AbstractChomper.__init__(self, significant, name)
         self._regex = re.compile(regex_str)
 
     def _chomp(self, state, tracker):
-        match = regex_chomp(self._regex, state, tracker)
+        match = regex_chomp(self, self._regex, state, tracker)
         if match is None:
-            return None
+            return FAIL
         state.advance_to(match.end())
-        return Box(match.groups())
+        return match.groups()
+
+    def _failure_message(self):
+        return _expected_message(self._regex.pattern)
+
+    def _first_chars(self):
+        return first_chars(self._regex)
 
 
 class RegexChomper(AbstractChomper):
@@ -23,9 +35,12 @@ class RegexChomper(AbstractChomper):
     # This class is a hotspot, since it is the "base case" for nearly every other
     # type of chomper. For that reason, this class is implemented for efficiency.
 
+    __slots__ = ("_regex", "_match", "_pattern")
+
     def __init__(self, regex_string, significant=True, name=None):
         AbstractChomper.__init__(self, significant, name)
         regex = re.compile(regex_string)
+        self._regex = regex
         self._match = regex.match
         self._pattern = regex.pattern
 
@@ -34,27 +49,321 @@ class RegexChomper(AbstractChomper):
         line = state._curr  # state.current()
         match = self._match(line, col)
         if match is None:
-            msg = "Expected pattern \'{}\'".format(self._pattern)
-            chomp_err = ChompError(msg, state.location(), tracker.current_name())
-            tracker.report_error(chomp_err)
-            return None
+            tracker.report_failure(self, state)
+            return FAIL
         end_index = match.end()
         state.advance_to(end_index)
-        return Box(line[col:end_index])
+        return line[col:end_index]
+
+    def _failure_message(self):
+        return _expected_message(self._pattern)
+
+    def _first_chars(self):
+        return first_chars(self._regex)
+
+
+class FusedRegexChomper(RegexChomper):
+    """
+    A regex chomper standing in for an ordered alternation of several regexes, which
+    it matches with a single regex
+    """
+    __slots__ = ("_patterns",)
+
+    def __init__(self, regexes, significant=True, name=None):
+        fused = "|".join("(?:{})".format(r.pattern) for r in regexes) \
+            if isinstance(regexes[0].pattern, str) \
+            else b"|".join(b"(?:" + r.pattern + b")" for r in regexes)
+        RegexChomper.__init__(self, fused, significant, name)
+        self._patterns = [r.pattern for r in regexes]
+
+    def _reported_failures(self, name):
+        return [(RegexChomper(pattern), name) for pattern in self._patterns]
+
+    def _first_failures(self, name):
+        return self._reported_failures(name if self._name is None else self._name)
+
+
+class Recognizing(object):
+    """
+    Mixin for copies of regex chompers that only recognize input (see ``Parser.matches(..)``), which
+    produce None instead of slicing out the chomped text. Create them with ``recognizing(..)``.
+    """
+    __slots__ = ()
+
+    def _chomp(self, state, tracker):
+        match = self._match(state._curr, state._column)
+        if match is None:
+            tracker.report_failure(self, state)
+            return FAIL
+        state.advance_to(match.end())
+        return None
+
+
+class RecognizingRegexChomper(Recognizing, RegexChomper):
+    __slots__ = ()
+
+
+class RecognizingFusedRegexChomper(Recognizing, FusedRegexChomper):
+    __slots__ = ()
+
+
+def recognizing(chomper):
+    """
+    :return: a recognizing copy of the ``RegexChomper`` (or ``FusedRegexChomper``) ``chomper``, without a func
+    """
+    carbon = copy.copy(chomper)
+    carbon.__class__ = _RECOGNIZING[type(chomper)]
+    carbon._func = None
+    carbon._bind_chomp()
+    return carbon
+
+
+# regex chomper class -> class of its recognizing copies
+_RECOGNIZING = {
+    RegexChomper: RecognizingRegexChomper,
+    FusedRegexChomper: RecognizingFusedRegexChomper,
+}
+
+
+class ConcatenatedRegexChomper(AbstractChomper):
+    """
+    Stands in for a run of insignificant regex chompers of a composition, and usually chomps them with
+    a single regex made of atomic groups, which (like the separate chompers) never backtrack into each
+    other's matches. The separate chompers chomp instead when the single regex fails, so that the failure
+    is reported by the right chomper, and when its match reaches the point where the state would move on
+    to the next chunk. The separate chompers are not children of this chomper, since they only stand in for it.
+    """
+    __slots__ = ("_chompers", "_match")
+
+    def __init__(self, chompers):
+        AbstractChomper.__init__(self, significant=False)
+        self._chompers = list(chompers)
+        patterns = [chomper._pattern for chomper in self._chompers]
+        if isinstance(patterns[0], bytes):
+            concatenated = b"".join(b"(?>" + pattern + b")" for pattern in patterns)
+        else:
+            concatenated = "".join("(?>{})".format(pattern) for pattern in patterns)
+        self._match = re.compile(concatenated).match
+
+    def _chomp(self, state, tracker):
+        match = self._match(state._curr, state._column)
+        if match is not None and match.end() < state._refill_at:
+            state._column = match.end()
+            return None
+        for chomper in self._chompers:
+            if chomper.chomp(state, tracker) is FAIL:
+                return FAIL
+        return None
+
+    def _failure_message(self):
+        return self._chompers[0]._failure_message()
 
+    def _first_failures(self, name):
+        return self._chompers[0]._first_failures(name)
 
-def regex_chomp(regex, state, tracker):
+    def _first_chars(self):
+        return self._chompers[0]._first_chars()
+
+
+def concatenable(chomper):
+    """
+    :return: whether ``chomper`` can be part of a ``ConcatenatedRegexChomper``
     """
+    return ATOMIC_GROUPS and type(chomper) is RegexChomper and not chomper._significant \
+        and chomper._name is None and chomper._func is None and fusable(chomper._regex)
+
+
+#: whether regexes support atomic groups (Python 3.11+)
+ATOMIC_GROUPS = hasattr(sre_parse, "ATOMIC_GROUP")
+
+
+def regex_chomp(chomper, regex, state, tracker):
+    """
+    :param chomper: chomper to blame if the match fails
     :param regex: regex object to match with
     :param state: ChompState
     :param tracker: FroParseErrorTracker
-    :return: Match object of regex match, or throws ChompError
+    :return: Match object of regex match, or None (after reporting the failure)
     """
-    line = state._curr # state.current()
-    index = state._column # state.column()
+    line = state._curr  # state.current()
+    index = state._column  # state.column()
     match = regex.match(line, index)
     if match is None:
-        msg = "Expected pattern \'{}\'".format(regex.pattern)
-        chomp_err = ChompError(msg, state.location(), tracker.current_name())
-        tracker.report_error(chomp_err)
+        tracker.report_failure(chomper, state)
     return match
+
+
+def _expected_message(pattern):
+    return "Expected pattern \'{}\'".format(pattern)
+
+
+def first_chars(regex):
+    """
+    :param regex: compiled regex
+    :return: frozenset of the characters (or, for bytes regexes, byte values) that every match of
+             ``regex`` starts with, or None if this set could not be determined or if ``regex`` can
+             match the empty string
+    """
+    if regex.flags & re.IGNORECASE:
+        return None
+    try:
+        parsed = sre_parse.parse(regex.pattern, regex.flags)
+    except Exception:
+        return None
+    codes, nullable = _first_codes(list(parsed))
+    if codes is None or nullable:
+        return None
+    if isinstance(regex.pattern, bytes):
+        return frozenset(codes)
+    return frozenset(chr(code) for code in codes)
+
+
+def literal_prefix(regex):
+    """
+    :param regex: compiled regex
+    :return: the literal text (or, for bytes regexes, bytes) that every match of ``regex`` starts with,
+             which is empty if there is no such text or if it could not be determined
+    """
+    empty = regex.pattern[:0]
+    if regex.flags & re.IGNORECASE:
+        return empty
+    try:
+        parsed = sre_parse.parse(regex.pattern, regex.flags)
+    except Exception:
+        return empty
+    codes = []
+    for op, av in parsed:
+        if op != sre_parse.LITERAL:
+            break
+        codes.append(av)
+    if isinstance(regex.pattern, bytes):
+        return bytes(bytearray(codes))
+    return "".join(chr(code) for code in codes)
+
+
+def always_matches(regex):
+    """
+    :param regex: compiled regex
+    :return: whether ``regex`` matches (possibly the empty string) at every position of every string
+    """
+    try:
+        parsed = sre_parse.parse(regex.pattern, regex.flags)
+    except Exception:
+        return False
+    return _always_match(list(parsed))
+
+
+def _always_match(items):
+    for op, av in items:
+        if op in _REPEATS:
+            if av[0] != 0:
+                return False
+        elif op == sre_parse.SUBPATTERN:
+            if not _always_match(list(av[-1])):
+                return False
+        elif op == sre_parse.BRANCH:
+            # alternatives are tried in order, so one that always matches is enough
+            if not any(_always_match(list(branch)) for branch in av[1]):
+                return False
+        else:
+            return False
+    return True
+
+
+def fusable(regex):
+    """
+    :param regex: compiled regex
+    :return: whether ``regex`` can be embedded as one branch of a larger regex without changing
+             what it matches, i.e. it has no named groups, backreferences or global flags
+    """
+    if regex.groupindex or regex.flags & ~re.UNICODE:
+        return False
+    try:
+        parsed = sre_parse.parse(regex.pattern, regex.flags)
+    except Exception:
+        return False
+    return not _has_group_refs(list(parsed))
+
+
+def _has_group_refs(items):
+    for op, av in items:
+        if op in _GROUP_REFS:
+            return True
+        for arg in (av if isinstance(av, (tuple, list)) else [av]):
+            if isinstance(arg, sre_parse.SubPattern) and _has_group_refs(list(arg)):
+                return True
+            elif isinstance(arg, list) and any(isinstance(a, sre_parse.SubPattern)
+                                               and _has_group_refs(list(a)) for a in arg):
+                return True
+    return False
+
+
+_GROUP_REFS = (sre_parse.GROUPREF, sre_parse.GROUPREF_EXISTS)
+
+
+# largest number of characters that a first-character set may contain
+_MAX_FIRST_CHARS = 256
+
+
+def _first_codes(items):
+    """
+    :param items: list of (opcode, argument) pairs of a parsed regex
+    :return: tuple (set of possible first character codes or None if unknown,
+             whether the items can match the empty string)
+    """
+    result = set()
+    for op, av in items:
+        codes, nullable = _first_codes_of_item(op, av)
+        if codes is None:
+            return None, False
+        result |= codes
+        if len(result) > _MAX_FIRST_CHARS:
+            return None, False
+        if not nullable:
+            return result, False
+    return result, True
+
+
+def _first_codes_of_item(op, av):
+    if op == sre_parse.LITERAL:
+        return {av}, False
+    elif op == sre_parse.IN:
+        codes = set()
+        for op_, av_ in av:
+            if op_ == sre_parse.LITERAL:
+                codes.add(av_)
+            elif op_ == sre_parse.RANGE and av_[1] - av_[0] < _MAX_FIRST_CHARS:
+                codes.update(range(av_[0], av_[1] + 1))
+            else:
+                return None, False
+        return codes, False
+    elif op == sre_parse.SUBPATTERN:
+        if len(av) == 4 and av[1] & re.IGNORECASE:
+            return None, False
+        return _first_codes(list(av[-1]))
+    elif op == sre_parse.BRANCH:
+        codes = set()
+        nullable = False
+        for branch in av[1]:
+            codes_, nullable_ = _first_codes(list(branch))
+            if codes_ is None:
+                return None, False
+            codes |= codes_
+            nullable = nullable or nullable_
+        return codes, nullable
+    elif op in _REPEATS:
+        codes, nullable = _first_codes(list(av[2]))
+        return codes, nullable or av[0] == 0
+    elif op == getattr(sre_parse, "ATOMIC_GROUP", None):
+        return _first_codes(list(av))
+    elif op in _ZERO_WIDTH:
+        # anchors and lookarounds only restrict where a match may start
+        return set(), True
+    return None, False
+
+
+_REPEATS = tuple(getattr(sre_parse, name) for name in
+                 ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+                 if hasattr(sre_parse, name))
+
+_ZERO_WIDTH = (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT)
@@ -0,0 +1,152 @@
+"""
+Searching for the matches of a chomper anywhere in the input (see ``Parser.scan(..)``)
+"""
+
+import re
+
+from fro._implementation import parse_error
+from fro._implementation.chompers import alternation, compiler, composition, nested, regex, util
+from fro._implementation.chompers.abstract import FAIL, FAILED_LOOKAHEAD_MESSAGE, QuietErrorTracker
+
+
+def scan(chomper, state):
+    """
+    Yields a (value, Location) pair for each of the non-overlapping successful chomps of ``chomper``
+    in the input of ``state``, from left to right. Positions are only tried if the prefilter of
+    ``chomper`` finds them (see ``prefilter(..)``), and positions after an empty chomp are tried
+    from the next character on. A chomp that fails after moving on to a later chunk (which would be
+    a failed lookahead in a parse) cannot return to its chunk, so the search resumes where it failed.
+
+    :param chomper: chomper to search with
+    :param state: ChompState over the input
+    :return: iterator over pairs of produced value and location of the start of the chomp
+    """
+    find = prefilter(chomper)
+    tracker = QuietErrorTracker()
+    while True:
+        has_next = state._lines.has_next()
+        refill_at = state._refill_at
+        column = state._column
+        start = column if find is None else find(state._curr, column)
+        if start < 0 or (start >= refill_at and has_next):
+            # a candidate near the end of the chunk (or buffer) may continue in the chunks after it
+            if not has_next:
+                return
+            state.advance_to(max(refill_at, column))
+            continue
+        line = state._line
+        state.reset_to(start)
+        location = state.location()
+        try:
+            value = chomper.chomp(state, tracker)
+        except parse_error.FroParseError as e:
+            if e.messages()[0].content() != FAILED_LOOKAHEAD_MESSAGE:
+                raise
+            del tracker._names[:]  # of the chompers that the error interrupted
+            continue  # a child could not return to its chunk, so neither can the search
+        if value is not FAIL:
+            yield value, location
+            if state._line != line or state._column != start:
+                continue
+        elif state._line != line:
+            if not state.rollback(line, start):
+                continue  # the rest of the candidate's chunk is gone, so resume where the chomp failed
+            start = state._column
+        if start >= state._len_curr:
+            return  # only reachable at the end of the input
+        state.reset_to(start + 1)
+
+
+def prefilter(chomper):
+    """
+    :return: function from a chunk and a column to the first column at or after the given column at
+             which ``chomper`` may succeed (or -1 if there is none), or None if it may succeed anywhere
+    """
+    leading = _leading_regex(chomper, set())
+    if leading is None:
+        chars = chomper._first_chars()
+        if chars is None:
+            return None
+        leading = _char_class(sorted(chars))
+    prefix = regex.literal_prefix(leading)
+    if len(prefix) > 0:
+        return _Find(prefix)
+    return _Search(leading.search)
+
+
+class _Find(object):
+    """
+    Prefilter for chompers whose chomps start with a literal
+    """
+    __slots__ = ("_literal",)
+
+    def __init__(self, literal):
+        self._literal = literal
+
+    def __call__(self, text, column):
+        return text.find(self._literal, column)
+
+
+class _Search(object):
+    """
+    Prefilter for chompers whose chomps start with a match of a regex
+    """
+    __slots__ = ("_search",)
+
+    def __init__(self, search):
+        self._search = search
+
+    def __call__(self, text, column):
+        match = self._search(text, column)
+        return -1 if match is None else match.start()
+
+
+def _leading_regex(chomper, seen):
+    """
+    :param seen: ids of the chompers that are being inspected, to stop at left recursion
+    :return: compiled regex that matches wherever a chomp of ``chomper`` can succeed, or None if
+             there is no such regex
+    """
+    if id(chomper) in seen:
+        return None
+    seen.add(id(chomper))
+    kind = type(chomper)
+    result = None
+    if isinstance(chomper, (regex.RegexChomper, regex.GroupRegexChomper)):
+        result = chomper._regex
+    elif kind is nested.NestedChomper:
+        result = chomper._open_regex
+    elif kind in (composition.CompositionChomper, regex.ConcatenatedRegexChomper):
+        if len(chomper._chompers) > 0:
+            result = _leading_regex(chomper._chompers[0], seen)
+    elif kind is util.StubChomper:
+        if chomper._delegate is not None:
+            result = _leading_regex(chomper._delegate, seen)
+    elif kind is compiler.CompiledChomper:
+        result = _leading_regex(chomper._source, seen)
+    elif kind is alternation.AlternationChomper:
+        result = _alternative_regexes([_leading_regex(branch, seen) for branch in chomper._chompers])
+    seen.discard(id(chomper))
+    return result
+
+
+def _alternative_regexes(regexes):
+    """
+    :return: compiled regex matching wherever one of ``regexes`` matches, or None if there is none
+    """
+    if len(regexes) == 0 or any(r is None or not regex.fusable(r) for r in regexes) \
+            or len(set(type(r.pattern) for r in regexes)) > 1:
+        return None
+    if isinstance(regexes[0].pattern, bytes):
+        return re.compile(b"|".join(b"(?:" + r.pattern + b")" for r in regexes))
+    return re.compile("|".join("(?:{})".format(r.pattern) for r in regexes))
+
+
+def _char_class(chars):
+    """
+    :param chars: characters (or, for bytes, byte values) from ``AbstractChomper._first_chars()``
+    :return: compiled regex matching any one of ``chars``
+    """
+    if isinstance(chars[0], int):
+        return re.compile(b"[" + b"".join(re.escape(bytes(bytearray([c]))) for c in chars) + b"]")
+    return re.compile("[" + "".join(re.escape(c) for c in chars) + "]")
@@ -1,8 +1,8 @@
 from fro._implementation import iters
 from fro._implementation.chompers import abstract
-from fro._implementation.chompers.box import Box
 
 class SequenceChomper(abstract.AbstractChomper):
+    __slots__ = ("_element", "_reducer", "_separator")
 
     def __init__(self, element, reducer, separator=None,
                  significant=True, name=None):
@@ -16,10 +16,22 @@ class SequenceChomper(abstract.AbstractChomper):
         iterator = iter(iterable)
         value = self._reducer(iterator)
         iters.close(iterator)
-        return Box(value)
+        return value
+
+    def _children(self):
+        if self._separator is None:
+            return [self._element]
+        return [self._element, self._separator]
+
+    def _set_children(self, children):
+        self._element = children[0]
+        if self._separator is not None:
+            self._separator = children[1]
 
 
 class SequenceIterable(object):
+    __slots__ = ("_state", "_element", "_sep", "_tracker", "_failed_lookahead")
+
     def __init__(self, chomper, state, tracker):
         self._state = state
         self._element = chomper._element
@@ -38,20 +50,21 @@ class SequenceIterable(object):
         rollback_line = state._line  # state.line()
         rollback_col = state._column  # state.column()
         while True:
-            box = element.chomp(state, tracker)
-            if box is None:
-                if state.line() != rollback_line:
+            value = element.chomp(state, tracker)
+            if value is abstract.FAIL:
+                if state.line() == rollback_line:
+                    state.reset_to(rollback_col)
+                elif not state.rollback(rollback_line, rollback_col):
                     self._failed_lookahead(state, tracker)
-                state.reset_to(rollback_col)
                 return
-            yield box.value
+            yield value
             rollback_line = state._line  # state.line()
             rollback_col = state._column  # state.column()
 
             if sep is not None:
-                box_ = sep.chomp(state, tracker)
-                if box_ is None:
-                    if state.line() != rollback_line:
+                if sep.chomp(state, tracker) is abstract.FAIL:
+                    if state.line() == rollback_line:
+                        state.reset_to(rollback_col)
+                    elif not state.rollback(rollback_line, rollback_col):
                         self._failed_lookahead(state, tracker)
-                    state.reset_to(rollback_col)
                     return
@@ -6,19 +6,27 @@ class ChompState(object):
     """
     Represents a position during parsing/chomping
     """
-    def __init__(self, lines, column=0):
+    __slots__ = ("_lines", "_column", "_line", "_memo", "_frame", "_offset", "_curr", "_len_curr", "_refill_at")
+
+    def __init__(self, lines, column=0, memo=None, empty=""):
         """
         :param lines: iterable<str>
         :param column: index at which to start
+        :param memo: MemoTable consulted by memoizing chompers, or None
+        :param empty: chunk that stands in for empty input, of the type of the chompers' regexes
         """
         self._lines = CheckableIterator(lines)
         self._column = column
         self._line = -1
+        self._memo = memo
+        self._frame = None  # maps columns to locations, for states whose chunks are not lines
+        self._offset = 0  # number of characters before the current chunk
 
-        if self._lines.has_next():
-            self._curr = next(self._lines)
-            self._len_curr = len(self._curr)
-            self._line += 1
+        # empty input is treated like a single empty chunk
+        self._curr = next(self._lines) if self._lines.has_next() else empty
+        self._len_curr = len(self._curr)
+        self._refill_at = self._len_curr
+        self._line += 1
 
     def advance_to(self, column):
         #self._assert_valid_col(column)
@@ -26,8 +34,10 @@ class ChompState(object):
         #    msg = "Cannot advance column from {0} to {1}".format(self._column, column)
         #    raise ValueError(msg)
         while column == self._len_curr and self._lines.has_next():
+            self._offset += self._len_curr
             self._curr = next(self._lines)
             self._len_curr = len(self._curr)
+            self._refill_at = self._len_curr
             self._line += 1
             column = 0  # "recurse" onto start of next line
         self._column = column
@@ -45,8 +55,18 @@ class ChompState(object):
         return self._line
 
     def location(self):
+        if self._frame is not None:
+            return self._frame.location(self._column)
         return Location(self._line, self._column, self._curr)
 
+    def rollback(self, line, column):
+        """
+        Returns to ``column`` of ``line``, which the state has moved on from. Positions of previous
+        lines cannot be returned to, except by a BufferedChompState (see ``BufferedChompState.rollback(..)``)
+        :return: whether the state returned to the position
+        """
+        return False
+
     def reset_to(self, column):
         #self._assert_valid_col(column)
         #if column > self._column:
@@ -61,3 +81,216 @@ class ChompState(object):
     #         msg = "column ({0}) is greater than line length ({1})".format(
     #             column, len(self._lines.current()))
     #         raise ValueError(msg)
+
+
+class BufferedChompState(ChompState):
+    """
+    A ChompState that presents the current chunk and the chunks after it as a single buffer, so
+    that regexes can match across chunk boundaries. Whenever fewer than ``window`` characters
+    remain in the buffer, the consumed part of the buffer is dropped (except for the last ``window``
+    characters of it) and the following chunks are appended to it. Each refill starts a new "line",
+    but chompers can still backtrack to the kept part of the previous buffers with ``rollback(..)``,
+    so backtracking by at most ``window`` characters never fails, regardless of the chunks.
+
+    Locations are computed from the newlines in the input, instead of from chunk boundaries.
+    """
+    __slots__ = ("_window", "_newline", "_spans")
+
+    def __init__(self, lines, window, column=0, memo=None, empty=""):
+        """
+        :param lines: iterable<str>
+        :param window: minimum number of characters that are available after the current position
+        :param column: index at which to start
+        :param memo: MemoTable consulted by memoizing chompers, or None
+        :param empty: chunk that stands in for empty input, of the type of the chompers' regexes
+        """
+        if window <= 0:
+            raise ValueError("window ({0}) must be positive".format(window))
+        self._lines = CheckableIterator(lines)
+        self._column = column
+        self._line = -1
+        self._memo = memo
+        self._window = window
+        self._frame = None
+        self._offset = 0
+        self._spans = {}  # maps the lines of previous buffers to the offsets of their starts and ends
+
+        first = next(self._lines) if self._lines.has_next() else empty
+        self._newline = b"\n" if isinstance(first, bytes) else "\n"
+        self._fill([first], len(first), 0, first[:0])
+
+    def advance_to(self, column):
+        if column < self._refill_at:
+            self._column = column
+            return
+        buffer = self._curr
+        newline = self._newline
+        drop = max(column - self._window, 0)  # the rest of the buffer is kept for rollbacks
+        count = buffer.count(newline, 0, drop)
+        if count == 0:
+            head = self._frame._head + buffer[:drop]
+        else:
+            head = buffer[buffer.rfind(newline, 0, drop) + 1:drop]
+        self._spans[self._line] = (self._offset, self._offset + self._len_curr)
+        self._offset += drop
+        self._column = column - drop
+        self._fill([buffer[drop:]], self._len_curr - drop,
+                   self._frame._newlines + count, head)
+
+    def rollback(self, line, column):
+        """
+        Returns to ``column`` of the buffer of ``line``, if the current buffer still holds that position.
+        Each refill keeps the last ``window`` consumed characters, so this succeeds for any position
+        at most ``window`` characters before the farthest position reached since.
+        """
+        span = self._spans.get(line)
+        if span is None or span[0] + column < self._offset:
+            return False
+        self.reset_to(span[0] + column - self._offset)
+        return True
+
+    # internals
+
+    def _fill(self, pieces, size, newlines, head):
+        """
+        Starts a new buffer, made of ``pieces`` followed by enough chunks to hold twice the window
+        after the current column
+        :param pieces: list of the initial contents of the buffer
+        :param size: total length of pieces
+        :param newlines: number of newlines before the buffer
+        :param head: the text between the last newline before the buffer and the buffer
+        """
+        lines = self._lines
+        while size < self._column + 2 * self._window and lines.has_next():
+            chunk = next(lines)
+            pieces.append(chunk)
+            size += len(chunk)
+        self._curr = head[:0].join(pieces)
+        self._len_curr = size
+        self._line += 1
+        if lines.has_next():
+            self._refill_at = max(size - self._window + 1, 0)
+        else:
+            self._refill_at = size + 1  # nothing left to refill with
+        self._frame = _BufferFrame(self._curr, newlines, head, self._newline)
+        spans = self._spans
+        for line in [line for line, span in spans.items() if span[1] < self._offset]:
+            del spans[line]  # nothing of the buffer of line is left
+
+
+class ListChompState(ChompState):
+    """
+    A ChompState over a list of chunks, which can jump forward to any chunk, for incremental parses
+    (see ``SpanMemoChomper``). Each chunk has an id, which identifies its contents across the
+    versions of an edited input.
+    """
+    __slots__ = ("_chunks", "_ids")
+
+    def __init__(self, chunks, ids, memo=None):
+        """
+        :param chunks: non-empty list of chunks
+        :param ids: list of the ids of the chunks
+        :param memo: SpanMemoTable consulted by memoizing chompers, or None
+        """
+        self._chunks = chunks
+        self._ids = ids
+        self._lines = None  # chunks are read from self._chunks instead
+        self._column = 0
+        self._line = 0
+        self._memo = memo
+        self._frame = None
+        self._offset = 0
+        self._curr = chunks[0]
+        self._len_curr = len(self._curr)
+        self._refill_at = self._len_curr
+
+    def advance_to(self, column):
+        while column == self._len_curr and self._line + 1 < len(self._chunks):
+            self._offset += self._len_curr
+            self._line += 1
+            self._curr = self._chunks[self._line]
+            self._len_curr = len(self._curr)
+            self._refill_at = self._len_curr
+            column = 0  # "recurse" onto start of next line
+        self._column = column
+
+    def at_end(self):
+        return self._column == self._len_curr and self._line + 1 == len(self._chunks)
+
+    # internals
+
+    def _jump(self, line, column):
+        """
+        Moves to ``column`` of the chunk at index ``line``, which is not before the current chunk
+        """
+        if line != self._line:
+            chunks = self._chunks
+            self._offset += sum(map(len, chunks[self._line:line]))
+            self._line = line
+            self._curr = chunks[line]
+            self._len_curr = len(self._curr)
+            self._refill_at = self._len_curr
+        self._column = column
+
+
+class MappedChompState(ChompState):
+    """
+    A ChompState over a single memory-mapped (or other bytes-like) chunk. Locations are computed
+    from the newlines in the mapped bytes, and only the text of the reported line is copied.
+    """
+    __slots__ = ()
+
+    def __init__(self, mapped, memo=None):
+        """
+        :param mapped: mmap.mmap (or bytes) to chomp
+        :param memo: MemoTable consulted by memoizing chompers, or None
+        """
+        ChompState.__init__(self, [mapped], memo=memo)
+        self._frame = _MappedFrame(mapped)
+
+
+class _BufferFrame(object):
+    """
+    Maps the columns of a BufferedChompState's buffer to locations in the input
+    """
+    __slots__ = ("_buffer", "_newlines", "_head", "_newline")
+
+    def __init__(self, buffer, newlines, head, newline):
+        self._buffer = buffer
+        self._newlines = newlines
+        self._head = head
+        self._newline = newline
+
+    def location(self, column):
+        buffer = self._buffer
+        newline = self._newline
+        end = buffer.find(newline, column)
+        end = len(buffer) if end < 0 else end + 1
+        count = buffer.count(newline, 0, column)
+        if count == 0:
+            return Location(self._newlines, len(self._head) + column,
+                            self._head + buffer[:end])
+        start = buffer.rfind(newline, 0, column) + 1
+        return Location(self._newlines + count, column - start, buffer[start:end])
+
+
+class _MappedFrame(object):
+    """
+    Maps the columns of a MappedChompState's chunk to locations in the input
+    """
+    __slots__ = ("_mapped",)
+
+    _BLOCK_SIZE = 1 << 20
+
+    def __init__(self, mapped):
+        self._mapped = mapped
+
+    def location(self, column):
+        mapped = self._mapped
+        start = mapped.rfind(b"\n", 0, column) + 1
+        end = mapped.find(b"\n", column)
+        end = len(mapped) if end < 0 else end + 1
+        newlines = 0
+        for offset in range(0, start, self._BLOCK_SIZE):
+            newlines += mapped[offset:min(offset + self._BLOCK_SIZE, start)].count(b"\n")
+        return Location(newlines, column - start, mapped[start:end])
@@ -2,10 +2,11 @@ import re
 
 from fro._implementation import iters
 from fro._implementation.chompers.abstract import AbstractChomper
-from fro._implementation.chompers.box import Box
 
 
 class UntilChomper(AbstractChomper):
+    __slots__ = ("_regex", "_reducer")
+
     def __init__(self, regex_str, reducer, significant=True, name=None):
         AbstractChomper.__init__(self, significant=significant, name=name)
         self._regex = re.compile(regex_str)
@@ -16,10 +17,19 @@ class UntilChomper(AbstractChomper):
         iterator = iter(iterable)
         value = self._reducer(iterator)
         iters.close(iterator)
-        return Box(value)
+        return value
+
+
+def discard(chunks):
+    """
+    The default reducer of ``UntilChomper``, which ignores the consumed chunks and produces None
+    """
+    return None
 
 
 class UntilIterable(object):
+    __slots__ = ("_regex", "_state", "_tracker")
+
     def __init__(self, regex, state, tracker):
         self._regex = regex
         self._state = state
@@ -43,4 +53,4 @@ class UntilIterable(object):
                 return
             yield curr[start_index:]
             state.advance_to(len(curr))
-            start_index = 0
+            start_index = state._column  # past the characters that a refill kept
@@ -1,21 +1,42 @@
+import collections
+
 from fro._implementation.chompers import abstract
-from fro._implementation.chompers.box import Box
 
 
 class ChainChomper(abstract.AbstractChomper):
-    def __init__(self, func, significant=True, name=None):
+    """
+    Generates its level of the chain the first time it chomps, and keeps it for later chomps, unless
+    the level is deeper than ``max_depth``. Deeper levels are generated for each chomp, so that the
+    number of levels kept alive does not grow with the deepest input ever parsed.
+    """
+    __slots__ = ("_generation_func", "_chomper", "_max_depth", "_depth")
+
+    def __init__(self, func, significant=True, name=None, max_depth=None, depth=0):
         abstract.AbstractChomper.__init__(self, significant=significant, name=name)
         self._generation_func = func
         self._chomper = None
+        self._max_depth = max_depth
+        self._depth = depth
 
     def _chomp(self, state, tracker):
-        if self._chomper is None:
-            lazier = ChainChomper(self._generation_func, significant=self._significant, name=self._name)
-            self._chomper = self._generation_func(lazier)
-        return self._chomper.chomp(state, tracker)
+        chomper = self._chomper
+        if chomper is None:
+            lazier = ChainChomper(self._generation_func, significant=self._significant, name=self._name,
+                                  max_depth=self._max_depth, depth=self._depth + 1)
+            chomper = self._generation_func(lazier)
+            if self._max_depth is None or self._depth < self._max_depth:
+                self._chomper = chomper
+        return chomper.chomp(state, tracker)
+
+    def __getstate__(self):
+        state = abstract.AbstractChomper.__getstate__(self)
+        state["_chomper"] = None  # regenerated lazily
+        return state
 
 
 class OptionalChomper(abstract.AbstractChomper):
+    __slots__ = ("_child", "_default")
+
     def __init__(self, child, default=None, significant=True, name=None):
         abstract.AbstractChomper.__init__(self, significant, name)
         self._child = child
@@ -24,16 +45,25 @@ class OptionalChomper(abstract.AbstractChomper):
     def _chomp(self, state, tracker):
         line = state.line()
         col = state.column()
-        box = self._child.chomp(state, tracker)
-        if box is not None:
-            return box
-        elif state.line() != line:
+        value = self._child.chomp(state, tracker)
+        if value is not abstract.FAIL:
+            return value
+        elif state.line() == line:
+            state.reset_to(col)
+        elif not state.rollback(line, col):
             self._failed_lookahead(state, tracker)
-        state.reset_to(col)
-        return Box(self._default)
+        return self._default
+
+    def _children(self):
+        return [self._child]
+
+    def _set_children(self, children):
+        self._child, = children
 
 
 class StubChomper(abstract.AbstractChomper):
+    __slots__ = ("_delegate",)
+
     def __init__(self, significant=True, name=None):
         abstract.AbstractChomper.__init__(self, significant, name)
         self._delegate = None
@@ -48,8 +78,71 @@ class StubChomper(abstract.AbstractChomper):
             raise ValueError("Stub chomper has no delegate")
         return self._delegate.chomp(state, tracker)
 
+    def _children(self):
+        return [] if self._delegate is None else [self._delegate]
+
+    def _set_children(self, children):
+        if len(children) > 0:
+            self._delegate, = children
+
+
+class ThunkCache(object):
+    """
+    A least-recently-used cache of the parsers built from the values produced by the function of a
+    ``thunk(..)``, so that a value that is produced repeatedly (e.g. the same regular expression) is only
+    turned into a parser once.
+    """
+    def __init__(self, max_entries=128):
+        """
+        :param int max_entries: maximum number of cached parsers
+        """
+        self._max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def hits(self):
+        """
+        Return the number of values whose parser was found in the cache
+
+        :return: number of cache hits
+        :rtype: int
+        """
+        return self._hits
+
+    def misses(self):
+        """
+        Return the number of values whose parser had to be built
+
+        :return: number of cache misses
+        :rtype: int
+        """
+        return self._misses
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_entries"] = collections.OrderedDict()  # rebuilt lazily
+        return state
+
+    # internals
+
+    def _get(self, key, build):
+        entries = self._entries
+        chomper = entries.pop(key, None)
+        if chomper is not None:
+            self._hits += 1
+        else:
+            self._misses += 1
+            chomper = build(key)
+            if len(entries) >= self._max_entries:
+                entries.popitem(last=False)
+        entries[key] = chomper
+        return chomper
+
 
 class ThunkChomper(abstract.AbstractChomper):
+    __slots__ = ("_thunk",)
+
     def __init__(self, thunk, significant=True, name=None):
         abstract.AbstractChomper.__init__(self, significant=significant, name=name)
         self._thunk = thunk
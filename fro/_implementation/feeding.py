@@ -0,0 +1,107 @@
+"""
+Parsing input that is pushed to the parser as it arrives (see ``Parser.feeder(..)``)
+"""
+
+import queue
+import threading
+
+# kinds of events sent to a feeder's sink
+VALUE = 0  # a value was produced
+ERROR = 1  # parsing raised an error, and produces no more events
+DONE = 2  # parsing finished, and produces no more events
+
+_CLOSED = object()  # marks the end of the fed chunks
+
+
+class Feeder(object):
+    """
+    A parse of chunks that are fed one at a time, as they arrive. The parse runs in a background thread, which
+    chomps each chunk as soon as it is fed, and waits for the next one whenever a parser needs more input
+    (including to check whether the input has ended). Create one with ``Parser.feeder(..)``.
+    """
+    def __init__(self, parse, sink=None):
+        """
+        :param parse: function from an iterable of chunks to an iterator of the produced values
+        :param sink: function that is called from the background thread with each (kind, payload) event,
+                     or None to keep the events for ``close()``
+        """
+        self._parse = parse
+        self._chunks = queue.Queue()
+        self._events = queue.Queue() if sink is None else None
+        self._sink = self._events.put if sink is None else sink
+        self._thread = None
+        self._closed = False
+
+    def feed(self, chunk):
+        """
+        Passes the next chunk of the input to the parse. Does not wait for the chunk to be chomped.
+
+        :param str chunk: next chunk
+        """
+        if self._closed:
+            raise ValueError("cannot feed a closed feeder")
+        if self._thread is None:
+            self._start()
+        elif not self._thread.is_alive():
+            return  # the parse already failed, so the chunk would never be read
+        self._chunks.put(chunk)
+
+    def close(self):
+        """
+        Signals that all chunks have been fed, and waits for the parse to finish. Returns the produced value,
+        or throws a ``FroParseError`` explaining why the parse failed (or returns ``None`` if the feeder is not
+        loud). Must be called once all chunks have been fed, since the parse waits for more chunks until then.
+
+        :return: value produced by the parse
+        """
+        if self._events is None:
+            raise ValueError("the events of this feeder are sent to its sink")
+        elif self._closed:
+            raise ValueError("feeder is already closed")
+        self._finish()
+        value = None
+        while True:
+            kind, payload = self._events.get()
+            if kind == VALUE:
+                value = payload
+            elif kind == ERROR:
+                raise payload
+            else:
+                return value
+
+    # internals
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True  # so that abandoned feeders do not keep the process alive
+        self._thread.start()
+
+    def _finish(self):
+        if self._thread is None:
+            self._start()
+        if not self._closed:
+            self._closed = True
+            self._chunks.put(_CLOSED)
+
+    def _run(self):
+        try:
+            for value in self._parse(self._fed_chunks()):
+                self._sink((VALUE, value))
+        except Exception as e:
+            self._sink((ERROR, e))
+            return
+        self._sink((DONE, None))
+
+    def _fed_chunks(self):
+        while True:
+            chunk = self._chunks.get()
+            if chunk is _CLOSED:
+                return
+            yield chunk
+
+
+def parse_values(parser, loud, window, chunks):
+    """
+    Parse of a ``Feeder`` (after binding its first arguments) that produces the value of ``Parser.parse(..)``
+    """
+    yield parser.parse(chunks, loud=loud, window=window)
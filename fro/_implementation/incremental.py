@@ -0,0 +1,125 @@
+"""
+Reparsing edited inputs, reusing the outcomes of the previous parse (see ``Parser.parse_incremental(..)``)
+"""
+
+from fro._implementation import parse_error
+from fro._implementation.chompers import graph, memo, state
+from fro._implementation.chompers.abstract import FAIL, FroParseErrorTracker
+
+
+class IncrementalParse(object):
+    """
+    The outcome of an incremental parse of a list of chunks, which can be passed to
+    ``Parser.parse_incremental(..)`` to parse an edited version of the chunks. Create one with
+    ``Parser.parse_incremental(..)``.
+    """
+    def __init__(self, parser, lines, ids, table, value, error, hits, misses):
+        self._parser = parser
+        self._lines = lines
+        self._ids = ids  # id of each chunk, see SpanMemoTable
+        self._table = table
+        self._value = value
+        self._error = error
+        self._hits = hits
+        self._misses = misses
+
+    def value(self):
+        """
+        Returns the value produced by the parse, or throws the ``FroParseError`` explaining why the parse failed
+
+        :return: value produced by the parse
+        """
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    def error(self):
+        """
+        Returns the ``FroParseError`` explaining why the parse failed, or ``None`` if it succeeded
+
+        :return: error of the parse
+        :rtype: FroParseError
+        """
+        return self._error
+
+    def lines(self):
+        """
+        Returns the chunks that were parsed, with all edits applied
+
+        :return: parsed chunks
+        :rtype: List[str]
+        """
+        return list(self._lines)
+
+    def hits(self):
+        """
+        Return the number of chomps that were reused from previous parses
+
+        :return: number of cache hits
+        :rtype: int
+        """
+        return self._hits
+
+    def misses(self):
+        """
+        Return the number of chomps that had to be performed because they could not be reused
+
+        :return: number of cache misses
+        :rtype: int
+        """
+        return self._misses
+
+
+def parse_incremental(parser, previous, edits):
+    """
+    :param parser: Parser to parse with
+    :param IncrementalParse previous: outcome of the previous parse, or None
+    :param edits: (start, end, new_lines) triples
+    :return: IncrementalParse of the edited chunks
+    """
+    if previous is None:
+        table = memo.SpanMemoTable(graph.transform(parser._chomper, memo.SpanMemoChomper))
+        lines = []
+        ids = []
+    elif previous._parser is not parser:
+        raise ValueError("previous parse was performed by a different parser")
+    else:
+        table = previous._table
+        lines = list(previous._lines)
+        ids = list(previous._ids)
+        if table._head is not previous:
+            # the chunks have been edited since, so ids of removed chunks may have been forgotten
+            table = memo.SpanMemoTable(table._chomper)
+            ids = table._new_ids(len(lines))
+    for start, end, new_lines in edits:
+        if not 0 <= start <= end <= len(lines):
+            raise ValueError("cannot replace chunks [{}, {}) of {} chunks".format(start, end, len(lines)))
+        new_lines = list(new_lines)
+        removed = ids[start:end]
+        lines[start:end] = new_lines
+        ids[start:end] = table._new_ids(len(new_lines))
+        table._forget(removed)
+    return _parse(parser, lines, ids, table)
+
+
+def _parse(parser, lines, ids, table):
+    table._epoch = table._next_id
+    hits = table._hits
+    misses = table._misses
+    chomp_state = state.ListChompState(lines or [parser._empty_chunk()], ids or [-1], table)
+    tracker = FroParseErrorTracker()
+    value = None
+    error = None
+    try:
+        value = table._chomper.chomp(chomp_state, tracker)
+        if value is FAIL:
+            parser._failed_parse(chomp_state, tracker, False, True)
+        elif not chomp_state.at_end():
+            parser._failed_parse(chomp_state, tracker, True, True)
+    except parse_error.FroParseError as e:
+        value = None
+        error = e
+    result = IncrementalParse(parser, lines, ids, table, value, error,
+                              table._hits - hits, table._misses - misses)
+    table._head = result
+    return result
@@ -2,6 +2,8 @@ from builtins import object
 
 
 class CheckableIterator(object):
+    __slots__ = ("_iterator", "_current_value", "_peeked_value", "_peeked_value_valid", "_at_end")
+
     def __init__(self, container):
         self._iterator = iter(container)
 
@@ -1,6 +1,8 @@
 
 
 class Location(object):
+    __slots__ = ("_line", "_column", "_text")
+
     def __init__(self, line, column, text):
         self._line = line
         self._column = column
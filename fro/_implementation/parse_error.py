@@ -1,4 +1,5 @@
 from fro._implementation import pretty_printing
+from fro._implementation.location import Location
 
 
 class FroParseError(Exception):
@@ -95,6 +96,22 @@ class FroParseError(Exception):
 
         return result
 
+    def _relocate(self, line_offset, head):
+        """
+        Moves the error from a part of the input to the whole input, where the part starts after
+        ``line_offset`` lines and ``head`` (the start of the line that the part starts in)
+
+        :param int line_offset: number of lines before the part
+        :param str head: text between the start of the line and the start of the part
+        """
+        location = self._location
+        if location.line() == 0:
+            self._location = Location(line_offset, len(head) + location.column(),
+                                      head + location.text())
+        else:
+            self._location = Location(line_offset + location.line(), location.column(),
+                                      location.text())
+
     class Message(object):
         """
         Represents an error message describing a reason for failure
@@ -1,8 +1,13 @@
+import contextlib
+import functools
 import io
+import mmap
+import os
+import re
 
 from builtins import bytes, str
 
-from fro._implementation import chompers
+from fro._implementation import checkpoints, chompers, feeding, incremental, parse_error, profiling, serialization
 
 
 class Parser(object):
@@ -12,28 +17,40 @@ class Parser(object):
 
     def __init__(self, chomper):
         self._chomper = chomper
+        self._memo_chomper = None  # memoizing copy of self._chomper, built lazily
+        self._recognizer = None  # recognizing copy of self._chomper, built lazily
+        self._empty = None  # empty chunk of the type of the regexes of self._chomper, found lazily
 
     # public interface
 
-    def parse(self, lines, loud=True):
+    def parse(self, lines, loud=True, memo=False, window=None):
         """
         Parse an iterable collection of chunks. Returns the produced value, or throws a ``FroParseError``
         explaining why the parse failed (or returns ``None`` if ``loud`` is ``False``).
 
+        If ``memo`` is truthy, the parse is performed in packrat mode: the outcome of every sub-parser at every
+        position is cached, so no sub-parser ever chomps the same position twice. This avoids repeated work
+        when alternatives share prefixes, at the cost of some bookkeeping. Passing a ``MemoTable`` allows the
+        caller to inspect hit/miss counts afterwards. Packrat mode assumes that parsers do not depend on external
+        state (see ``thunk(..)``).
+
+        By default, every chunk is chomped separately, so a regular expression can never match across two chunks.
+        If ``window`` is given, chunks are instead treated as consecutive pieces of a single string, and every
+        chomp can see at least ``window`` characters past the current position, regardless of chunk boundaries.
+        The buffer of upcoming characters is refilled at most once every ``window`` characters, and parsers can
+        backtrack by up to ``window`` characters (instead of only within the current chunk, as by default), so the
+        result does not depend on how the input is split into chunks.
+        Line and column numbers of errors are counted from the newlines in the input instead of from chunks.
+
         :param Iterable[str] lines:
         :param bool loud: if parsing failures should result in an exception
+        :param Union[bool,MemoTable] memo: whether to memoize, or the memo table to use
+        :param int window: number of characters that parsers can look ahead, or ``None`` to chomp chunk by chunk
         :return: Value produced by parse
         """
-        tracker = chompers.abstract.FroParseErrorTracker()
-        state = chompers.state.ChompState(lines)
-        box = self._chomper.chomp(state, tracker)
-        if box is None:
-            return self._failed_parse(state, tracker, False, loud)
-        elif not state.at_end():
-            return self._failed_parse(state, tracker, True, loud)
-        return box.value
+        return self._parse_state(self._state(lines, window, self._memo_table(memo)), loud)
 
-    def parse_str(self, string_to_parse, loud=True):
+    def parse_str(self, string_to_parse, loud=True, memo=False):
         """
         Attempts to parse ``string_to_parse``. Treats the entire string ``string_to_parse`` as a single
         chunk. Returns the produced value, or throws a ``FroParseError`` explaining why
@@ -41,23 +58,456 @@ class Parser(object):
 
         :param str string_to_parse: string to parse
         :param loud: if parsing failures should result in an exception
+        :param memo: whether to memoize, or the memo table to use (see ``parse(..)``)
         :return: value produced by parse
         """
-        return self.parse([string_to_parse], loud)
+        return self.parse([string_to_parse], loud, memo)
 
-    def parse_file(self, filename, encoding="utf-8", loud=True):
+    def parse_file(self, filename, encoding="utf-8", loud=True, memo=False, window=None, mode="text",
+                   checkpoint=None, resume_from=None, checkpoint_interval=5.0, fold=None):
         """
         Parse the contents of a file with the given filename, treating each line as a separate chunk.
         Returns the produced value, or throws a ``FroParseError`` explaining why
         the parse failed (or returns ``None`` if ``loud`` is ``False``).
 
+        If ``mode`` is ``"mmap"``, the file is instead memory-mapped and parsed as a single ``bytes`` chunk, so the
+        parser must be built from ``bytes`` regular expressions. The file is never decoded or split into lines, and
+        only the parts of the file that chompers produce are copied, as ``bytes`` (so decoding is left to the
+        functions that the parser applies to them). ``encoding`` and ``window`` are not used in this mode.
+
+        Long parses with a parser created by ``seq(..)`` can take checkpoints, from which a parse that was
+        interrupted (e.g. by a crash) can be resumed. If ``checkpoint`` is given, it is called with a ``Checkpoint``
+        after the first element of the sequence that ends at least ``checkpoint_interval`` seconds after the start
+        of the parse (or after the previous checkpoint). Passing a checkpoint as ``resume_from`` continues the parse
+        from that checkpoint, in the same file (or a version of it that has only been appended to), and produces the
+        same value as a parse from the start would. Checkpoints keep the values of all elements so far, which are
+        reduced by the sequence's reducer at the end of the parse. Alternatively, the values can be folded as they
+        are produced: if ``fold`` is an ``(initial, func)`` pair, the sequence's reducer is replaced by repeatedly
+        applying ``func(accumulated, value)``, starting from ``initial``, and checkpoints keep the accumulated value.
+        Checkpoints cannot be combined with ``window``.
+
         :param filename: filename of file to parse
         :param encoding: encoding of filename to parse
         :param loud: if parsing failures should result in an exception
+        :param memo: whether to memoize, or the memo table to use (see ``parse(..)``)
+        :param window: number of characters that parsers can look ahead, or ``None`` to chomp line by line
+                       (see ``parse(..)``)
+        :param str mode: ``"text"`` to read the file as text, or ``"mmap"`` to memory-map it
+        :param checkpoint: function called with each ``Checkpoint``, or ``None`` to take no checkpoints
+        :param Checkpoint resume_from: checkpoint to resume the parse from, or ``None`` to parse from the start
+        :param float checkpoint_interval: minimum number of seconds between checkpoints
+        :param fold: ``(initial, func)`` pair to fold the values of elements with, or ``None`` to reduce them
         :return: value produced by parse
         """
+        if mode not in ("text", "mmap"):
+            raise ValueError("mode must be \"text\" or \"mmap\", not {}".format(repr(mode)))
+        elif checkpoint is not None or resume_from is not None or fold is not None:
+            if not isinstance(self._chomper, chompers.sequence.SequenceChomper):
+                raise ValueError("checkpoints require a parser created by seq(..)")
+            elif window is not None:
+                raise ValueError("checkpoints cannot be combined with window")
+            return checkpoints.parse_file(self, filename, encoding, loud, memo, mode,
+                                          checkpoint, checkpoint_interval, resume_from, fold)
+        elif mode == "mmap":
+            return self._parse_mapped_file(filename, loud, memo)
         with io.open(filename, encoding=encoding) as file_to_parse:
-            return self.parse(file_to_parse, loud=loud)
+            if window is not None:
+                # chunk boundaries do not matter, so read blocks instead of lines
+                file_to_parse = _blocks(file_to_parse, window)
+            return self.parse(file_to_parse, loud=loud, memo=memo, window=window)
+
+    def iterparse(self, lines, loud=True, window=None):
+        """
+        Parse an iterable collection of chunks with a parser created by ``seq(..)``, returning an iterator
+        over the values produced by the sequence's elements. Each value is yielded as soon as it has been
+        chomped, and the sequence's reducer is not called, so long inputs can be processed in constant memory.
+        If the input cannot be parsed, a ``FroParseError`` is raised once iteration reaches the point of failure
+        (or iteration simply stops if ``loud`` is ``False``).
+
+        :param Iterable[str] lines:
+        :param bool loud: if parsing failures should result in an exception
+        :param int window: number of characters that parsers can look ahead (see ``parse(..)``)
+        :return: iterator over the values of the sequence's elements
+        :rtype: Iterator
+
+        Example::
+
+            parser = fro.seq(fro.intp, sep=r",")
+            for n in parser.iterparse(["1,2", ",3"]):
+                print(n)  # prints 1, then 2, then 3
+        """
+        if not isinstance(self._chomper, chompers.sequence.SequenceChomper):
+            raise ValueError("iterparse(..) requires a parser created by seq(..)")
+        return self._iterparse(lines, loud, window)
+
+    def iterparse_file(self, filename, encoding="utf-8", loud=True, window=None):
+        """
+        Like ``iterparse(..)``, but parses the contents of a file with the given filename, treating each line
+        as a separate chunk. The file is closed once iteration finishes.
+
+        :param filename: filename of file to parse
+        :param encoding: encoding of filename to parse
+        :param loud: if parsing failures should result in an exception
+        :param window: number of characters that parsers can look ahead (see ``parse(..)``)
+        :return: iterator over the values of the sequence's elements
+        :rtype: Iterator
+        """
+        if not isinstance(self._chomper, chompers.sequence.SequenceChomper):
+            raise ValueError("iterparse_file(..) requires a parser created by seq(..)")
+        return self._iterparse_file(filename, encoding, loud, window)
+
+    def feeder(self, loud=True, window=None):
+        """
+        Returns a ``Feeder``, which parses chunks that are pushed to it one at a time with ``feed(chunk)``, for
+        input that arrives over time (e.g. from a socket). Chunks are chomped in a background thread as soon as they
+        are fed, and whenever a parser needs more input than has been fed, the parse waits for the next chunk
+        instead of treating the input as ended. Once all chunks have been fed, ``close()`` returns the produced
+        value, or throws a ``FroParseError`` explaining why the parse failed (or returns ``None`` if ``loud`` is
+        ``False``), like ``parse(..)``.
+
+        :param bool loud: if parsing failures should result in an exception
+        :param int window: number of characters that parsers can look ahead (see ``parse(..)``)
+        :return: feeder for a parse with ``self``
+        :rtype: Feeder
+
+        Example::
+
+            feeder = fro.seq(fro.intp, sep=r",").feeder()
+            feeder.feed("1,2")
+            feeder.feed(",3")
+            feeder.close()  # evaluates to [1, 2, 3]
+        """
+        return feeding.Feeder(functools.partial(feeding.parse_values, self, loud, window))
+
+    def parse_async(self, chunks, loud=True, window=None):
+        """
+        Like ``parse(..)``, but parses the chunks of an async iterable (e.g. an ``asyncio.StreamReader``, whose
+        chunks are lines of bytes), and returns a coroutine. Chunks are chomped by a ``Feeder`` (see ``feeder(..)``)
+        as they arrive, so parsing overlaps with waiting for the rest of the input. Requires Python 3.6 or later.
+
+        :param AsyncIterable[str] chunks:
+        :param bool loud: if parsing failures should result in an exception
+        :param int window: number of characters that parsers can look ahead (see ``parse(..)``)
+        :return: coroutine producing the value produced by the parse
+
+        Example::
+
+            value = await fro.seq(fro.intp, sep=r",").parse_async(reader)
+        """
+        from fro._implementation import aio
+        return aio.parse_async(self, chunks, loud, window)
+
+    def iterparse_async(self, chunks, loud=True, window=None):
+        """
+        Like ``iterparse(..)``, but parses the chunks of an async iterable (see ``parse_async(..)``), and returns an
+        async iterator, which produces the value of each element of the sequence as soon as its chunks have
+        arrived. Requires Python 3.6 or later.
+
+        :param AsyncIterable[str] chunks:
+        :param bool loud: if parsing failures should result in an exception
+        :param int window: number of characters that parsers can look ahead (see ``parse(..)``)
+        :return: async iterator over the values of the sequence's elements
+        :rtype: AsyncIterator
+
+        Example::
+
+            async for n in fro.seq(fro.intp, sep=r",").iterparse_async(reader):
+                print(n)
+        """
+        if not isinstance(self._chomper, chompers.sequence.SequenceChomper):
+            raise ValueError("iterparse_async(..) requires a parser created by seq(..)")
+        from fro._implementation import aio
+        return aio.iterparse_async(self, chunks, loud, window)
+
+    def scan(self, lines, window=None):
+        """
+        Searches an iterable collection of chunks for the non-overlapping places where ``self`` succeeds, from left
+        to right, and returns an iterator over ``(value, location)`` pairs, where ``location`` is the ``Location``
+        of the start of the match (with ``line()`` and ``column()`` counted from 0). Unlike ``parse(..)``, the
+        input in between matches is skipped, and the parse never fails. After a match of the empty string, the
+        search resumes at the next character. A candidate that fails after reaching into a later chunk cannot
+        return to its own chunk (see ``window`` in ``parse(..)``), so the search resumes where it failed instead.
+
+        Positions at which ``self`` cannot succeed are skipped without running ``self``: if the matches of
+        ``self`` must start with a literal string (e.g. ``fro.comp([r"~<", ...])``), candidates are found with
+        ``str.find``, and otherwise with a search for the regular expression (or characters) that matches of
+        ``self`` must start with, if there is one.
+
+        :param Iterable[str] lines:
+        :param int window: number of characters that parsers can look ahead (see ``parse(..)``)
+        :return: iterator over the values and locations of matches
+        :rtype: Iterator[Tuple[T, Location]]
+
+        Example::
+
+            parser = fro.comp([r"~\$", fro.intp]).get()
+            for value, location in parser.scan(["costs $12 or $3", "$45"]):
+                print(value, location.line(), location.column())  # prints 12 0 6, then 3 0 13, then 45 1 0
+        """
+        return self._scan(lines, window)
+
+    def matches(self, lines, window=None):
+        """
+        Returns whether ``self`` can parse an iterable collection of chunks, without producing a value. This
+        is faster than ``parse(..)``, since sub-parsers do not build their values: regular expressions do not
+        copy the text they chomp, and reducers and funcs (e.g. ``int`` for ``intp``) are not called. Funcs
+        that other parts of the parse depend on, such as funcs that update a ``BoxedValue`` read by a
+        ``thunk(..)``, must be marked with ``stateful()``, so that they are called as usual.
+
+        Since funcs are not called, inputs that only fail because a func raises an error are matched. Errors
+        that ``parse(..)`` raises even when ``loud`` is ``False`` (e.g. a failed lookahead) are not matched.
+
+        :param Iterable[str] lines:
+        :param int window: number of characters that parsers can look ahead (see ``parse(..)``)
+        :return: whether the chunks can be parsed
+        :rtype: bool
+
+        Example::
+
+            parser = fro.seq(fro.intp, sep=r",")
+            parser.matches(["1,2", ",3"])  # evaluates to True
+            parser.matches(["1,2,"])  # evaluates to False
+        """
+        return self._recognize_state(self._state(lines, window), False)
+
+    def validate_file(self, filename, encoding="utf-8", loud=True, window=None, mode="text"):
+        """
+        Checks that ``self`` can parse the contents of a file with the given filename, like ``parse_file(..)``
+        would, but without producing a value (see ``matches(..)``). Returns ``True`` if the file can be
+        parsed, and otherwise throws a ``FroParseError`` explaining why the parse failed (or returns ``False``
+        if ``loud`` is ``False``).
+
+        :param filename: filename of file to validate
+        :param encoding: encoding of filename to validate
+        :param loud: if parsing failures should result in an exception
+        :param window: number of characters that parsers can look ahead, or ``None`` to chomp line by line
+                       (see ``parse(..)``)
+        :param str mode: ``"text"`` to read the file as text, or ``"mmap"`` to memory-map it
+                         (see ``parse_file(..)``)
+        :return: whether the file can be parsed
+        :rtype: bool
+        """
+        if mode == "mmap":
+            with self._mapped_state(filename, None) as state:
+                return self._recognize_state(state, loud)
+        elif mode != "text":
+            raise ValueError("mode must be \"text\" or \"mmap\", not {}".format(repr(mode)))
+        with io.open(filename, encoding=encoding) as file_to_validate:
+            if window is not None:
+                file_to_validate = _blocks(file_to_validate, window)
+            return self._recognize_state(self._state(file_to_validate, window), loud)
+
+    def parse_incremental(self, previous, edits):
+        """
+        Parses a list of chunks that is edited over time, such as the lines of a document open in an editor,
+        reusing the work of the previous parse. ``edits`` is a list of ``(start, end, new_lines)`` triples, each
+        of which replaces the chunks at indices ``start`` (inclusive) to ``end`` (exclusive) with the chunks in
+        ``new_lines``. The edits are applied one after the other, to the chunks of ``previous``, which is the
+        ``IncrementalParse`` returned by the previous call (or ``None`` for the first parse, whose chunks are
+        initially empty). Returns an ``IncrementalParse``, whose ``value()`` is the value produced by the parse.
+        Parse failures are not raised, but kept in the ``IncrementalParse``.
+
+        Sub-parsers that start at the beginning of a chunk, or span several chunks, keep their outcomes, which
+        are reused by later parses as long as the chunks they span were not edited. Only the sub-parsers whose
+        input contains an edit are run again, so after a small edit the parse takes time proportional to the
+        size of the edit and the depth of the parser, rather than to the size of the input. Like packrat mode,
+        this assumes that parsers do not depend on external state (see ``parse(..)``), and values that are
+        reused are shared between parses, so they should not be mutated.
+
+        Passing an ``IncrementalParse`` that is not the most recent one of its parser chain (e.g. to parse two
+        different edits of the same version) is allowed, but nothing is reused by that parse.
+
+        :param IncrementalParse previous: outcome of the previous parse, or ``None``
+        :param Iterable[Tuple[int,int,List[str]]] edits: edits to apply to the chunks of ``previous``
+        :return: outcome of the parse
+        :rtype: IncrementalParse
+
+        Example::
+
+            parser = fro.seq(fro.comp([fro.intp, r"~;?"]).get())
+            result = parser.parse_incremental(None, [(0, 0, ["1;", "2;", "3"])])
+            result.value()  # evaluates to [1, 2, 3]
+            result = parser.parse_incremental(result, [(1, 2, ["4;", "5;"])])
+            result.value()  # evaluates to [1, 4, 5, 3]
+        """
+        return incremental.parse_incremental(self, previous, edits)
+
+    def parse_files(self, filenames, workers=None, ordered=True, encoding="utf-8", mode="text"):
+        """
+        Parses each of the files with the given filenames (see ``parse_file(..)``) in a pool of worker processes,
+        and returns an iterator over ``(filename, result)`` pairs, where ``result`` is either the value produced by
+        parsing the file or the ``FroParseError`` explaining why parsing it failed.
+
+        The parser is sent to the workers with ``dumps()``, so it must be serializable. Produced values must be
+        picklable.
+
+        :param Iterable[str] filenames: filenames of files to parse
+        :param int workers: number of worker processes, or ``None`` for one per processor
+        :param bool ordered: if results should be produced in the order of ``filenames``, instead of as soon as
+                             they are available
+        :param encoding: encoding of the files to parse
+        :param mode: ``"text"`` or ``"mmap"`` (see ``parse_file(..)``)
+        :return: iterator over pairs of filename and produced value or error
+        :rtype: Iterator[Tuple[str, Any]]
+        """
+        import concurrent.futures  # only needed here, and requires a backport on Python 2
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(self.dumps(),))
+        return self._parse_files(executor, filenames, ordered, encoding, mode)
+
+    def parse_file_parallel(self, filename, boundary, workers=None, encoding="utf-8", loud=True):
+        """
+        Parses a large file with a parser created by ``seq(..)``, by splitting the file into shards and parsing
+        the shards in a pool of worker processes. Returns the produced value, or throws a ``FroParseError``
+        explaining why the parse failed (or returns ``None`` if ``loud`` is ``False``).
+
+        The file is split at matches of the regular expression ``boundary``, which must match exactly at the
+        start of elements of the sequence (and nowhere else). For instance, for a file of one record per line,
+        ``boundary`` could be ``r"(?m)^"``. Each shard is parsed like ``parse_file(..)`` would parse it, with
+        every shard but the last ending in a separator if the sequence has one. The values of the elements of all
+        shards are then reduced by the sequence's reducer. Line and column numbers of errors are relative to the
+        whole file.
+
+        The parser is sent to the workers with ``dumps()``, so it must be serializable, and the values of elements
+        must be picklable.
+
+        :param filename: filename of file to parse
+        :param boundary: regular expression matching the start of elements
+        :param int workers: number of worker processes, or ``None`` for one per processor
+        :param encoding: encoding of filename to parse
+        :param loud: if parsing failures should result in an exception
+        :return: value produced by parse
+        """
+        sequence = self._chomper
+        if not isinstance(sequence, chompers.sequence.SequenceChomper):
+            raise ValueError("parse_file_parallel(..) requires a parser created by seq(..)")
+        import concurrent.futures  # only needed here, and requires a backport on Python 2
+        workers = workers if workers is not None else (os.cpu_count() or 1)
+        offsets = _shard_offsets(filename, boundary, workers * _SHARDS_PER_WORKER, encoding)
+        if len(offsets) <= 2:
+            return self.parse_file(filename, encoding=encoding, loud=loud)
+
+        elements = chompers.sequence.SequenceChomper(
+            sequence._element, list, sequence._separator, name=sequence._name)
+        if sequence._separator is None:
+            middle = Parser(elements)
+        else:
+            middle = comp([Parser(elements), Parser(sequence._separator.clone(significant=False))]).get()
+        data = serialization.dumps((middle, Parser(elements)))
+
+        values = []
+        line_offset = 0
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_shard_worker, initargs=(data,)) as executor:
+            futures = [executor.submit(_parse_shard_in_worker, filename, start, end,
+                                       end == offsets[-1], encoding)
+                       for start, end in zip(offsets, offsets[1:])]
+            try:
+                for future in futures:
+                    shard_values, lines, head, error = future.result()
+                    if error is not None:
+                        error._relocate(line_offset, head)
+                        return self._raise(error, loud)
+                    values.extend(shard_values)
+                    line_offset += lines
+            finally:
+                for future in futures:
+                    future.cancel()
+        value = sequence._reducer(iter(values))
+        if sequence._func is not None:
+            value = sequence._func(value)
+        return value
+
+    def dumps(self):
+        """
+        Returns a serialized representation of ``self``, from which ``fro.loads(..)`` recreates an equivalent
+        parser (possibly in another process). The functions used by the parser must be picklable, i.e.
+        defined at the top level of a module, or registered with ``fro.register_func(..)``.
+
+        :return: serialized parser
+        :rtype: bytes
+
+        Example::
+
+            square = fro.register_func(lambda x: x * x, name="square")
+            data = (fro.intp | square).dumps()
+            fro.loads(data).parse_str("4")  # evaluates to 16
+        """
+        return serialization.dumps(self)
+
+    def profile(self):
+        """
+        Returns a ``Profiler``, which parses like ``self`` but records, for each sub-parser, how often it chomped,
+        how often it succeeded and failed, how many characters it consumed, and how much time it took. Profiling
+        uses an instrumented copy of ``self``, so it does not slow down ``self``.
+
+        :return: a profiler for ``self``
+        :rtype: Profiler
+
+        Example::
+
+            profiler = parser.profile()
+            profiler.parse_file("input.txt")
+            print(profiler.table(limit=20))
+            with open("stacks.txt", "w") as f:
+                f.write(profiler.collapsed_stacks())  # e.g. for flamegraph.pl
+        """
+        return profiling.Profiler(self)
+
+    def compile(self):
+        """
+        Returns a parser that is equivalent to ``self``, but that parses by running Python code generated
+        specifically for the structure of ``self`` instead of interpreting it. The returned parser produces
+        the same values and raises the same errors as ``self``, and is usually several times faster.
+
+        Parsers created by ``chain(..)`` and ``thunk(..)`` only exist once parsing starts, so they are not
+        compiled (but they still work inside compiled parsers).
+
+        :return: a compiled parser equivalent to ``self``
+        :rtype: Parser
+        """
+        return Parser(chompers.compiler.CompiledChomper(self._chomper))
+
+    def optimize(self, pure_funcs=True):
+        """
+        Returns a parser that is equivalent to ``self``, but whose structure has been simplified so that it
+        parses faster. The returned parser produces the same values and reports errors at the same positions
+        as ``self``. The rewrites include:
+
+        - splicing the parsers of nested compositions (e.g. made by ``append(..)`` or ``strip()``) into
+          the enclosing composition
+        - chomping runs of insignificant regexes of a composition with a single regex (Python 3.11+)
+        - replacing the placeholder parsers of ``tie(..)`` by the parsers they stand for
+        - dropping the funcs of parsers whose values are discarded (e.g. insignificant parsers of a
+          composition), if ``pure_funcs`` is ``True``
+        - removing ``maybe(..)`` around parsers that never fail, e.g. ``fro.rgx(r"a*").maybe()``
+
+        Funcs that are dropped are not called, so pass ``pure_funcs=False`` if the funcs of insignificant
+        parsers have side effects (e.g. updating a ``BoxedValue``), or mark those parsers with ``stateful()``.
+        Parsers created by ``chain(..)`` are optimized as they are generated. Optimize a parser before
+        compiling it.
+
+        :param bool pure_funcs: if funcs whose values are discarded may be dropped
+        :return: an optimized parser equivalent to ``self``
+        :rtype: Parser
+
+        Example::
+
+            parser = fro.comp([r"~\(", fro.intp.strip(), r"~\)"]).get()
+            parser.node_count()  # evaluates to 8
+            parser.optimize().node_count()  # evaluates to 4 on Python 3.11+
+        """
+        return Parser(chompers.optimizer.optimize(self._chomper, pure_funcs))
+
+    def node_count(self):
+        """
+        Returns the number of sub-parsers of ``self`` (including ``self``), e.g. to measure the
+        effect of ``optimize()``. Parsers created by ``chain(..)`` and ``thunk(..)`` are not counted.
+
+        :return: number of sub-parsers
+        :rtype: int
+        """
+        return chompers.optimizer.node_count(self._chomper)
 
     def name(self, name):
         """
@@ -312,7 +762,26 @@ class Parser(object):
             parser = fro.comp(r"~\(", fro.intp, r"~\)").get()
             parser.parse_str("(-3)")  # evaluates to -3
         """
-        return self >> (lambda x: x)
+        return Parser(self._chomper.clone(func=chompers.pipeline.GETTING))
+
+    def stateful(self):
+        """
+        Returns a parser that is equivalent to ``self``, but whose func has side effects that other parsers
+        depend on, e.g. updating a ``BoxedValue`` that is read by a ``thunk(..)``. Such funcs are still called
+        by ``matches(..)`` and ``validate_file(..)``, and are never dropped by ``optimize()``.
+
+        :return: a stateful copy of the called parser
+        :rtype: Parser
+
+        Example::
+
+            box = fro.BoxedValue(None)
+            openp = (fro.rgx(r"<[a-z]+>") | box.update_and_get).stateful()
+            closep = fro.thunk(lambda: box.get().replace("<", "</"))
+            parser = fro.comp([openp, r"[a-z]*", closep])
+            parser.matches(["<b>bold</b>"])  # evaluates to True
+        """
+        return Parser(self._chomper.clone(stateful=True))
 
     def __invert__(self):
         """
@@ -371,17 +840,140 @@ class Parser(object):
             parser = fro.comp([fro.intp, r"~,", fro.intp]) >> (lambda x, y: x + y)
             parser.parse_str("4,5")  # evaluates to 9
         """
-        return Parser(self._chomper.clone(func=lambda x: func(*x)))
+        return Parser(self._chomper.clone(func=chompers.pipeline.unpacking(func)))
 
     # internals
 
+    def __getstate__(self):
+        return {"_chomper": self._chomper}  # the memoizing and recognizing copies are rebuilt on demand
+
+    def __setstate__(self, state):
+        self._chomper = state["_chomper"]
+        self._memo_chomper = None
+        self._recognizer = None
+        self._empty = None
+
+    def _empty_chunk(self):
+        """
+        :return: chunk that stands in for empty inputs, which is ``b""`` if ``self`` is built from bytes regexes
+        """
+        if self._empty is None:
+            self._empty = chompers.graph.empty_chunk(self._chomper)
+        return self._empty
+
+    def _memoized_chomper(self):
+        if self._memo_chomper is None:
+            self._memo_chomper = chompers.graph.transform(
+                self._chomper, chompers.memo.MemoChomper)
+        return self._memo_chomper
+
+    @staticmethod
+    def _memo_table(memo):
+        if not memo:
+            return None
+        return memo if isinstance(memo, chompers.memo.MemoTable) else chompers.memo.MemoTable()
+
+    def _state(self, lines, window, memo=None):
+        if window is None:
+            return chompers.state.ChompState(lines, memo=memo, empty=self._empty_chunk())
+        return chompers.state.BufferedChompState(lines, window, memo=memo, empty=self._empty_chunk())
+
+    @staticmethod
+    def _tracker(loud):
+        if loud:
+            return chompers.abstract.FroParseErrorTracker()
+        return chompers.abstract.QuietErrorTracker()
+
+    def _parse_state(self, state, loud):
+        tracker = self._tracker(loud)
+        chomper = self._chomper if state._memo is None else self._memoized_chomper()
+        value = chomper.chomp(state, tracker)
+        if value is chompers.abstract.FAIL:
+            return self._failed_parse(state, tracker, False, loud)
+        elif not state.at_end():
+            return self._failed_parse(state, tracker, True, loud)
+        return value
+
+    def _recognize_state(self, state, loud):
+        if self._recognizer is None:
+            self._recognizer = chompers.recognizer.recognizer(self._chomper)
+        tracker = self._tracker(loud)
+        try:
+            value = self._recognizer.chomp(state, tracker)
+        except parse_error.FroParseError:
+            if loud:
+                raise
+            return False  # e.g. a failed lookahead, which is raised even by quiet parses
+        if value is chompers.abstract.FAIL:
+            self._failed_parse(state, tracker, False, loud)
+            return False
+        elif not state.at_end():
+            self._failed_parse(state, tracker, True, loud)
+            return False
+        return True
+
+    def _parse_mapped_file(self, filename, loud, memo):
+        with self._mapped_state(filename, self._memo_table(memo)) as state:
+            return self._parse_state(state, loud)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _mapped_state(filename, memo):
+        with io.open(filename, "rb") as file_to_parse:
+            if os.fstat(file_to_parse.fileno()).st_size == 0:
+                yield chompers.state.ChompState([b""], memo=memo)  # empty files cannot be mapped
+                return
+            mapped = mmap.mmap(file_to_parse.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield chompers.state.MappedChompState(mapped, memo=memo)
+            finally:
+                mapped.close()
+
+    def _iterparse(self, lines, loud, window):
+        sequence = self._chomper
+        tracker = self._tracker(loud)
+        state = self._state(lines, window)
+        if sequence.name() is not None:
+            tracker.offer_name(sequence.name())
+        for value in chompers.sequence.SequenceIterable(sequence, state, tracker):
+            yield value
+        if not state.at_end():
+            self._failed_parse(state, tracker, True, loud)
+
+    def _scan(self, lines, window):
+        for match in chompers.scanner.scan(self._chomper, self._state(lines, window)):
+            yield match
+
+    def _iterparse_file(self, filename, encoding, loud, window):
+        with io.open(filename, encoding=encoding) as file_to_parse:
+            if window is not None:
+                file_to_parse = _blocks(file_to_parse, window)
+            for value in self._iterparse(file_to_parse, loud, window):
+                yield value
+
+    @staticmethod
+    def _parse_files(executor, filenames, ordered, encoding, mode):
+        import concurrent.futures
+        futures = []
+        try:
+            futures = [executor.submit(_parse_file_in_worker, filename, encoding, mode)
+                       for filename in filenames]
+            completed = futures if ordered else concurrent.futures.as_completed(futures)
+            for future in completed:
+                yield future.result()
+        finally:
+            # if iteration stopped early, do not wait for files whose results will never be used
+            for future in futures:
+                future.cancel()
+            executor.shutdown()
+
     def _failed_parse(self, state, tracker, valid_value, loud):
         if valid_value:
             curr = state.current()
             col = state.column()
-            msg = "Unexpected character {}".format(curr[col])
+            msg = "Unexpected character {}".format(curr[col:col + 1])
             chomp_err = chompers.chomp_error.ChompError(msg, state.location())
-            tracker.report_error(chomp_err)
+            tracker.report_error(chomp_err, state)
         return self._raise(tracker.retrieve_error(), loud)
 
     def _raise(self, err, loud):
@@ -395,6 +987,16 @@ class Parser(object):
 # --------------------------------------------------------------------
 # internals (put first to avoid use before def'n issues)
 
+_BLOCK_SIZE = 1 << 16
+
+
+def _blocks(file_to_read, window):
+    """
+    :return: iterator over consecutive blocks of the file, of at least ``window`` characters each
+    """
+    return iter(functools.partial(file_to_read.read, max(window, _BLOCK_SIZE)), "")
+
+
 def _extract(value):
     if value is None:
         return None
@@ -409,13 +1011,165 @@ def _extract(value):
         raise ValueError(msg)
 
 
+_worker_parser = None  # parser of a parse_files(..) worker process
+
+
+def _init_worker(data):
+    global _worker_parser
+    _worker_parser = serialization.loads(data)
+
+
+def _parse_file_in_worker(filename, encoding, mode):
+    try:
+        return filename, _worker_parser.parse_file(filename, encoding=encoding, mode=mode)
+    except parse_error.FroParseError as e:
+        return filename, e
+
+
+_worker_shard_parsers = None  # parsers of a parse_file_parallel(..) worker process, for middle and last shards
+
+_SHARDS_PER_WORKER = 4
+_MIN_SHARD_SIZE = 1 << 16
+
+
+def _init_shard_worker(data):
+    global _worker_shard_parsers
+    _worker_shard_parsers = serialization.loads(data)
+
+
+def _parse_shard_in_worker(filename, start, end, last, encoding):
+    """
+    :return: tuple of (values of elements, number of lines in shard, head of first line, FroParseError or None)
+    """
+    parser = _worker_shard_parsers[1 if last else 0]
+    with io.open(filename, "rb") as raw:
+        raw.seek(start)
+        reader = io.TextIOWrapper(io.BufferedReader(_ShardReader(raw, end - start)), encoding=encoding)
+        lines = _LineCounter(reader)
+        try:
+            return parser.parse(lines), lines.count, None, None
+        except parse_error.FroParseError as e:
+            return None, None, _line_head(raw, start, encoding), e
+
+
+def _shard_offsets(filename, boundary, shards, encoding):
+    """
+    :return: increasing byte offsets of the starts of shards, followed by the size of the file
+    """
+    if not isinstance(boundary, bytes):
+        boundary = boundary.encode(encoding)
+    regex = re.compile(boundary)
+    with io.open(filename, "rb") as raw:
+        size = os.fstat(raw.fileno()).st_size
+        if size == 0:
+            return [0]
+        shards = max(1, min(shards, size // _MIN_SHARD_SIZE))
+        mapped = mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            offsets = [0]
+            for index in range(1, shards):
+                match = regex.search(mapped, max(size * index // shards, offsets[-1] + 1))
+                if match is None:
+                    break
+                if match.start() > offsets[-1]:
+                    offsets.append(match.start())
+        finally:
+            mapped.close()
+    offsets.append(size)
+    return offsets
+
+
+def _line_head(raw, start, encoding):
+    """
+    :return: the text between the start of the line containing byte offset ``start`` and ``start``
+    """
+    end = start
+    pieces = []
+    while end > 0:
+        begin = max(0, end - _BLOCK_SIZE)
+        raw.seek(begin)
+        block = raw.read(end - begin)
+        newline = block.rfind(b"\n")
+        if newline >= 0:
+            pieces.append(block[newline + 1:])
+            break
+        pieces.append(block)
+        end = begin
+    return b"".join(reversed(pieces)).decode(encoding)
+
+
+class _ShardReader(io.RawIOBase):
+    """
+    A raw binary stream over the next ``size`` bytes of another binary stream
+    """
+    def __init__(self, raw, size):
+        io.RawIOBase.__init__(self)
+        self._raw = raw
+        self._remaining = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        data = self._raw.read(min(len(buf), self._remaining))
+        buf[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+class _LineCounter(object):
+    """
+    Iterates over lines, counting the ones that end in a newline
+    """
+    def __init__(self, lines):
+        self._lines = lines
+        self.count = 0
+
+    def __iter__(self):
+        for line in self._lines:
+            if line.endswith("\n"):
+                self.count += 1
+            yield line
+
+
+class _ChainGeneration(object):
+    """
+    The generation function of the chomper created by ``chain(func)``
+    """
+    def __init__(self, func):
+        self._func = func
+
+    def __call__(self, chomper):
+        return _extract(self._func(Parser(chomper)))
+
+
+class _ExtractingThunk(object):
+    """
+    The thunk of the chomper created by ``thunk(func)``. Parsers built from regular expressions are
+    cached by ``cache`` (if not ``None``), keyed by the regular expression.
+    """
+    def __init__(self, func, cache=None):
+        self._func = func
+        self._cache = cache
+
+    def __call__(self):
+        value = self._func()
+        if self._cache is None or not isinstance(value, (str, bytes)):
+            return _extract(value)
+        return self._cache._get(value, _extract)
+
+
 def _parse_rgx(regex_string):
     """
     :return: a tuple of (modified regex_string, whether significant)
     """
-    if regex_string[0:1] == r"~":
+    if isinstance(regex_string, bytes):
+        tilde, escaped_tilde = br"~", br"\~"
+    else:
+        tilde, escaped_tilde = r"~", r"\~"
+    if regex_string[0:1] == tilde:
         return regex_string[1:], False
-    elif regex_string[0:2] == r"\~":
+    elif regex_string[0:2] == escaped_tilde:
         return regex_string[1:], True
     return regex_string, True
 
@@ -457,7 +1211,7 @@ def alt(parser_values, name=None):
         chompers_, name=name))
 
 
-def chain(func, name=None):
+def chain(func, name=None, max_depth=None):
     """
     Given a function ``func`` which maps one parser to another, returns a parser value that is equivalent
     to a large number of successive calls to ``func``.
@@ -469,8 +1223,14 @@ def chain(func, name=None):
     In general the parser ``func(parser)`` should consume input before delegating
     parsing to the ``parser`` argument.
 
+    Generated levels are kept for later parses, so by default the returned parser holds on to as many
+    levels as the deepest input it has parsed. If ``max_depth`` is not ``None``, only the first ``max_depth``
+    levels are kept, and deeper levels are generated again each time they are needed, which bounds memory
+    use at the cost of calling ``func`` more often.
+
     :param Callable[[Parser],Union[Parser,str]] func: function from ``Parser`` to parser value
     :param name: name for created parser
+    :param int max_depth: maximum number of generated levels to keep, or ``None`` for no limit
     :return: lazily-evaluated infinite parser
     :rtype: Parser
 
@@ -487,9 +1247,7 @@ def chain(func, name=None):
         parser.parse_str("aeiiea")  # evaluates to 3
         parser.parse_str("aeiie")  # fails
     """
-    def func_(chomper):
-        return _extract(func(Parser(chomper)))
-    return Parser(chompers.util.ChainChomper(func_, name=name))
+    return Parser(chompers.util.ChainChomper(_ChainGeneration(func), name=name, max_depth=max_depth))
 
 
 def comp(parser_values, sep=None, name=None):
@@ -625,14 +1383,21 @@ def seq(parser_value, reducer=list, sep=None, name=None):
         _extract(parser_value), reducer, _extract(sep), name=name))
 
 
-def thunk(func, name=None):
+def thunk(func, name=None, cache=128):
     """
     Given a function ``func``, which takes no argument and produces a parser value, returns a parser
     that when chomping, calls ``func()`` and chomps with the resulting parser. This function is primarily
-    intended for creating parsers whose behavior is dependent on some sort of external state.
+    intended for creating parsers whose behavior is dependent on some sort of external state. Parsers whose
+    funcs update that state should be marked with ``Parser.stateful()``.
+
+    The parsers built from the regular expressions produced by ``func`` are kept in a least-recently-used
+    cache, so a regular expression that ``func`` produces repeatedly is only turned into a parser once.
+    ``cache`` is the maximum number of cached parsers, or ``None`` to disable caching. To inspect the
+    effectiveness of the cache, pass a ``ThunkCache`` instead.
 
     :param Callable[[],Parser] func:
     :param str name: name for the parser
+    :param Union[int,ThunkCache] cache: size of the cache of parsers, or the cache itself
     :return: a parser that parses with the parsers generated by ``func``
     :rtype: Parser
 
@@ -646,8 +1411,9 @@ def thunk(func, name=None):
         parser.parse_str("cdddd")  # evaluates to "cdddd"
         parser.parse_str("abb")  # fails
     """
-    return Parser(chompers.util.ThunkChomper(
-        lambda: _extract(func()), name=name))
+    if cache is not None and not isinstance(cache, chompers.util.ThunkCache):
+        cache = chompers.util.ThunkCache(cache) if cache > 0 else None
+    return Parser(chompers.util.ThunkChomper(_ExtractingThunk(func, cache), name=name))
 
 
 def tie(func, name=None):
@@ -695,7 +1461,7 @@ def tie(func, name=None):
     return result
 
 
-def until(regex_str, reducer=lambda _: None, name=None):
+def until(regex_str, reducer=chompers.until.discard, name=None):
     """
     Returns a parser that consumes all input until it encounters a match to the given regular expression,
     or the end of the input.
@@ -0,0 +1,359 @@
+"""
+Per-chomper profiling of parsers (see ``Parser.profile()``)
+"""
+
+import io
+import time
+
+from fro._implementation import parse_error
+from fro._implementation.chompers import alternation, composition, graph, nested, regex, \
+    sequence, state, until, util
+from fro._implementation.chompers.abstract import FAIL, FAILED_LOOKAHEAD_MESSAGE, AbstractChomper
+
+_clock = getattr(time, "perf_counter", time.time)
+
+_KINDS = {
+    regex.RegexChomper: "rgx",
+    regex.FusedRegexChomper: "rgx",
+    regex.GroupRegexChomper: "group_rgx",
+    composition.CompositionChomper: "comp",
+    sequence.SequenceChomper: "seq",
+    alternation.AlternationChomper: "alt",
+    util.OptionalChomper: "maybe",
+    util.StubChomper: "tie",
+    util.ChainChomper: "chain",
+    util.ThunkChomper: "thunk",
+    nested.NestedChomper: "nested",
+    until.UntilChomper: "until",
+}
+
+
+class Profiler(object):
+    """
+    Parses with an instrumented copy of a parser, and accumulates statistics about each of the
+    parser's sub-parsers over all parses. Create one with ``Parser.profile()``.
+
+    Sub-parsers are labelled by their name, or by their path from the closest named ancestor (or from
+    the root), e.g. ``comp[2].alt[1]`` for the second alternative of the third parser of a composition.
+    Sub-parsers generated during parsing by ``chain(..)`` and ``thunk(..)`` are labelled by their path
+    from the parser that generated them, so their statistics are combined across generations.
+
+    The profiler also records backtracking: every time a sub-parser (an ``alt(..)``, a ``maybe(..)``, or a
+    ``seq(..)`` ending its sequence) rolls back input that its failed child had consumed, and every "Failed
+    lookahead" error, which means that a parser would have had to roll back into a previous chunk.
+    """
+    def __init__(self, parser):
+        self._parser = type(parser)(graph.transform(parser._chomper, self._instrument))
+        self._stats = {}  # label -> NodeStats
+        self._stacks = {}  # tuple of names -> self time
+        self._active = []  # [wrapper, time spent in children] of each running wrapper
+        self._last_failure = None  # NodeStats of the wrapper that most recently failed
+        self._sites = {}  # (label, label of failed child) -> BacktrackSite
+        self._lookahead_failures = []
+
+    def parse(self, lines, loud=True, window=None):
+        """
+        Like ``Parser.parse(..)``, but records statistics
+        """
+        del self._active[:]  # in case the previous parse raised an exception
+        self._last_failure = None
+        empty = self._parser._empty_chunk()
+        if window is None:
+            recording_state = _RecordingChompState(lines, empty=empty)
+        else:
+            recording_state = _RecordingBufferedChompState(lines, window, empty=empty)
+        recording_state._profiler = self
+        try:
+            return self._parser._parse_state(recording_state, loud)
+        except parse_error.FroParseError as e:
+            if len(self._active) > 0 and e.messages()[0].content() == FAILED_LOOKAHEAD_MESSAGE:
+                self._lookahead_failures.append((self._active[-1][0]._stats.label, e))
+            raise
+
+    def parse_str(self, string_to_parse, loud=True):
+        """
+        Like ``Parser.parse_str(..)``, but records statistics
+        """
+        return self.parse([string_to_parse], loud=loud)
+
+    def parse_file(self, filename, encoding="utf-8", loud=True, window=None):
+        """
+        Like ``Parser.parse_file(..)``, but records statistics
+        """
+        with io.open(filename, encoding=encoding) as file_to_parse:
+            return self.parse(file_to_parse, loud=loud, window=window)
+
+    def stats(self):
+        """
+        Returns the statistics of every sub-parser that has been used, sorted by decreasing self time
+
+        :return: statistics of sub-parsers
+        :rtype: List[NodeStats]
+        """
+        return sorted(self._stats.values(), key=lambda s: s.self_time, reverse=True)
+
+    def table(self, limit=None):
+        """
+        Returns the statistics of sub-parsers as a human-readable table, sorted by decreasing self time
+
+        :param int limit: maximum number of rows, or ``None`` for no limit
+        :return: table of statistics
+        :rtype: str
+        """
+        rows = ["{:<48} {:>10} {:>10} {:>10} {:>12} {:>12} {:>12}".format(
+            "parser", "calls", "successes", "failures", "consumed", "total ms", "self ms")]
+        for s in self.stats()[:limit]:
+            rows.append("{:<48} {:>10} {:>10} {:>10} {:>12} {:>12.3f} {:>12.3f}".format(
+                s.label, s.calls, s.successes, s.failures, s.consumed,
+                s.total_time * 1e3, s.self_time * 1e3))
+        return "\n".join(rows)
+
+    def collapsed_stacks(self):
+        """
+        Returns the self time spent under each stack of parser names, in the "collapsed stack" format
+        read by flamegraph tools: one line per stack, with the names separated by semicolons, followed
+        by the time in microseconds. Time spent outside of any named parser is attributed to ``<root>``.
+
+        :return: collapsed stacks
+        :rtype: str
+        """
+        merged = {}
+        for names, seconds in self._stacks.items():
+            # a parser and its clones (e.g. by strips()) share names, so repeated names are one frame
+            frames = ["<root>"]
+            for name in names:
+                if name != frames[-1]:
+                    frames.append(name)
+            key = ";".join(frame.replace(";", ",") for frame in frames)
+            merged[key] = merged.get(key, 0.0) + seconds
+        return "".join("{} {}\n".format(key, int(round(seconds * 1e6)))
+                       for key, seconds in sorted(merged.items()))
+
+    def backtracking(self):
+        """
+        Returns the places where input was rolled back, sorted by decreasing number of characters rolled back
+
+        :return: sites of backtracking
+        :rtype: List[BacktrackSite]
+        """
+        return sorted(self._sites.values(), key=lambda s: (s.wasted, s.rollbacks), reverse=True)
+
+    def lookahead_failures(self):
+        """
+        Returns the "Failed lookahead" errors that aborted parses, with the label of the sub-parser that
+        tried to roll back into a previous chunk
+
+        :return: pairs of label and error
+        :rtype: List[Tuple[str, FroParseError]]
+        """
+        return list(self._lookahead_failures)
+
+    def backtracking_report(self, limit=20):
+        """
+        Returns a human-readable report of the sites that rolled back the most input, and of the
+        "Failed lookahead" errors
+
+        :param int limit: maximum number of sites to include, or ``None`` for no limit
+        :return: report of backtracking
+        :rtype: str
+        """
+        rows = ["{:<36} {:<36} {:>10} {:>12} {:>8}  {}".format(
+            "parser", "failed child", "rollbacks", "wasted", "max", "max at")]
+        for site in self.backtracking()[:limit]:
+            location = site.max_location
+            rows.append("{:<36} {:<36} {:>10} {:>12} {:>8}  {}".format(
+                site.label, site.failed, site.rollbacks, site.wasted, site.max_wasted,
+                "-" if location is None else "line {}, column {}".format(
+                    location.line() + 1, location.column() + 1)))
+        for label, error in self._lookahead_failures:
+            rows.append("Failed lookahead in {} at line {}, column {}".format(
+                label, error.line(), error.column()))
+        return "\n".join(rows)
+
+    def reset(self):
+        """
+        Discards all recorded statistics
+        """
+        self._stats.clear()
+        self._stacks.clear()
+        self._sites.clear()
+        del self._lookahead_failures[:]
+
+    # internals
+
+    def _instrument(self, chomper):
+        return ProfilingChomper(chomper, self)
+
+    def _stats_for(self, label, kind, prefix):
+        stats = self._stats.get(label)
+        if stats is None:
+            stats = self._stats[label] = NodeStats(label, kind, prefix)
+        return stats
+
+
+class NodeStats(object):
+    """
+    Statistics of a sub-parser. Times are in seconds; the total time of a recursive sub-parser only
+    counts its outermost chomps.
+
+    :ivar str label: name or path of the sub-parser
+    :ivar str kind: kind of sub-parser (e.g. ``"comp"``)
+    :ivar int calls: number of chomps
+    :ivar int successes: number of successful chomps
+    :ivar int failures: number of failed chomps
+    :ivar int consumed: number of characters consumed by successful chomps
+    :ivar float total_time: time spent in the sub-parser, including its children
+    :ivar float self_time: time spent in the sub-parser, excluding its children
+    """
+    def __init__(self, label, kind, prefix):
+        self.label = label
+        self.kind = kind
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.consumed = 0
+        self.total_time = 0.0
+        self.self_time = 0.0
+        self._depth = 0  # number of running chomps
+        self._prefix = prefix  # of the labels of children
+
+
+class BacktrackSite(object):
+    """
+    Statistics of the rollbacks made by a sub-parser after one of its children failed
+
+    :ivar str label: label of the sub-parser that rolled back
+    :ivar str failed: label of the child that failed
+    :ivar int rollbacks: number of rollbacks
+    :ivar int wasted: number of characters that were consumed and then rolled back
+    :ivar int max_wasted: largest number of characters rolled back at once
+    :ivar Location max_location: where the largest rollback returned to
+    """
+    def __init__(self, label, failed):
+        self.label = label
+        self.failed = failed
+        self.rollbacks = 0
+        self.wasted = 0
+        self.max_wasted = 0
+        self.max_location = None
+
+
+class _RollbackRecording(object):
+    """
+    Mixin for ChompStates that records their rollbacks in the Profiler ``self._profiler``
+    """
+    __slots__ = ()
+
+    def reset_to(self, column):
+        profiler = self._profiler
+        wasted = self._column - column
+        self._column = column
+        if len(profiler._active) == 0:
+            return
+        label = profiler._active[-1][0]._stats.label
+        failed = profiler._last_failure
+        key = (label, None if failed is None else failed.label)
+        site = profiler._sites.get(key)
+        if site is None:
+            site = profiler._sites[key] = BacktrackSite(*key)
+        site.rollbacks += 1
+        site.wasted += wasted
+        if wasted > site.max_wasted:
+            site.max_wasted = wasted
+            site.max_location = self.location()
+
+
+class _RecordingChompState(_RollbackRecording, state.ChompState):
+    __slots__ = ("_profiler",)
+
+
+class _RecordingBufferedChompState(_RollbackRecording, state.BufferedChompState):
+    __slots__ = ("_profiler",)
+
+
+class ProfilingChomper(AbstractChomper):
+    """
+    Wraps a chomper, recording statistics about its chomps in a Profiler. A wrapper is labelled
+    when it first chomps, based on the wrapper that is running it.
+    """
+    __slots__ = ("_child", "_profiler", "_stats")
+
+    def __init__(self, child, profiler):
+        AbstractChomper.__init__(self, child.significant(), None)
+        self._child = child
+        self._profiler = profiler
+        self._stats = None
+
+    def _chomp(self, state, tracker):
+        profiler = self._profiler
+        active = profiler._active
+        stats = self._stats
+        if stats is None:
+            stats = self._stats = self._label(active)
+        stats.calls += 1
+        stats._depth += 1
+        start_position = state._offset + state._column
+        frame = [self, 0.0]
+        active.append(frame)
+        start = _clock()
+        value = self._child.chomp(state, tracker)
+        elapsed = _clock() - start
+        active.pop()
+        if active:
+            active[-1][1] += elapsed
+        stats._depth -= 1
+        if stats._depth == 0:
+            stats.total_time += elapsed
+        self_time = elapsed - frame[1]
+        stats.self_time += self_time
+        if value is FAIL:
+            stats.failures += 1
+            profiler._last_failure = stats
+        else:
+            stats.successes += 1
+            stats.consumed += state._offset + state._column - start_position
+
+        names = tuple(tracker._names)
+        if self._child._name is not None:
+            names += (self._child._name,)
+        stacks = profiler._stacks
+        stacks[names] = stacks.get(names, 0.0) + self_time
+        return value
+
+    def _first_chars(self):
+        return self._child._first_chars()
+
+    def _failure_message(self):
+        return self._child._failure_message()
+
+    def _first_failures(self, name):
+        return self._child._first_failures(name)
+
+    def _children(self):
+        return [self._child]
+
+    def _set_children(self, children):
+        self._child, = children
+
+    def _label(self, active):
+        child = self._child
+        kind = _KINDS.get(type(child), type(child).__name__)
+        if isinstance(child, util.ChainChomper):
+            # the lazier chains of a chain are the same node, one generation down
+            for wrapper, _ in active:
+                if isinstance(wrapper._child, util.ChainChomper) and \
+                        wrapper._child._generation_func is child._generation_func:
+                    return wrapper._stats
+        if child._name is not None:
+            label = child._name
+            prefix = label + "."
+        elif len(active) == 0:
+            label = kind
+            prefix = ""  # paths from the root leave out the root
+        else:
+            parent = active[-1][0]
+            siblings = parent._child._children()
+            index = next((i for i, sibling in enumerate(siblings) if sibling is self), 0)
+            label = "{}{}[{}]".format(parent._stats._prefix, parent._stats.kind, index)
+            prefix = label + "."
+        return self._profiler._stats_for(label, kind, prefix)
@@ -0,0 +1,72 @@
+"""
+Serialization of parsers, for sending them to other processes.
+
+Parsers are pickled. Functions that cannot be pickled by reference (e.g. lambdas and closures) can be
+registered under a name with ``register_func(..)``; registered functions are serialized as their name,
+and looked up in the registry of the process that deserializes them.
+"""
+
+import io
+import pickle
+
+_funcs_by_name = {}
+_names_by_id = {}  # id of registered function -> name
+
+
+def register_func(func, name=None):
+    """
+    Registers ``func`` under the given name, so that parsers that use ``func`` can be serialized
+    (see ``Parser.dumps()``) even if ``func`` cannot be pickled, e.g. because it is a lambda.
+    ``func`` must also be registered, under the same name, in every process that deserializes
+    such a parser. Returns ``func``, so that this function can be used as a decorator.
+
+    :param func: function to register
+    :param str name: name to register ``func`` under; defaults to the qualified name of ``func``
+    :return: ``func``
+    """
+    if name is None:
+        qualname = getattr(func, "__qualname__", func.__name__)
+        name = "{}.{}".format(func.__module__, qualname)
+    registered = _funcs_by_name.get(name)
+    if registered is not None and registered is not func:
+        raise ValueError("A different function is already registered as {}".format(repr(name)))
+    _funcs_by_name[name] = func
+    _names_by_id[id(func)] = name
+    return func
+
+
+def dumps(value):
+    """
+    :return: bytes serializing ``value``, in which registered functions are replaced by their names
+    """
+    buf = io.BytesIO()
+    _Pickler(buf, pickle.HIGHEST_PROTOCOL).dump(value)
+    return buf.getvalue()
+
+
+def loads(data):
+    """
+    Deserializes a parser that was serialized with ``Parser.dumps()``. All named functions that the
+    parser uses must be registered (see ``register_func(..)``) in this process.
+
+    :param bytes data: serialized parser
+    :return: the deserialized parser
+    :rtype: Parser
+    """
+    return _Unpickler(io.BytesIO(data)).load()
+
+
+class _Pickler(pickle.Pickler):
+    def persistent_id(self, obj):
+        name = _names_by_id.get(id(obj))
+        if name is not None and _funcs_by_name[name] is obj:
+            return name
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    def persistent_load(self, pid):
+        func = _funcs_by_name.get(pid)
+        if func is None:
+            raise pickle.UnpicklingError("No function is registered as {}".format(repr(pid)))
+        return func
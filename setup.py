@@ -26,6 +26,6 @@ setup(
         'Programming Language :: Python :: 3.4'
     ],
     keywords="fro parsing object representations",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks"]),
     install_requires=["future"]
 )
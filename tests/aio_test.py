@@ -0,0 +1,56 @@
+import asyncio
+import unittest
+
+import fro
+
+
+class _Chunks(object):
+    """
+    Async iterable over chunks, which yields to the event loop before each chunk
+    """
+    def __init__(self, chunks, error=None):
+        self._chunks = list(chunks)
+        self._error = error
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(0)
+        if len(self._chunks) == 0:
+            if self._error is not None:
+                raise self._error
+            raise StopAsyncIteration
+        return self._chunks.pop(0)
+
+
+async def _collect(async_iterable, limit=None):
+    values = []
+    async for value in async_iterable:
+        values.append(value)
+        if len(values) == limit:
+            break
+    return values
+
+
+class AsyncTest(unittest.TestCase):
+
+    def test_parse_async1(self):
+        parser = fro.seq(fro.comp([r"~\s*", fro.intp]).get(), sep=r"~,")
+        self.assertEqual(asyncio.run(parser.parse_async(_Chunks(["1,", " 23", ",4"]))), [1, 23, 4])
+        self.assertEqual(asyncio.run(parser.parse_async(_Chunks([]))), [])
+        self.assertEqual(asyncio.run(parser.parse_async(_Chunks(["1,", "2", "3"]), window=4)), [1, 23])
+        with self.assertRaises(fro.FroParseError):
+            asyncio.run(parser.parse_async(_Chunks(["1,", "x"])))
+        self.assertIsNone(asyncio.run(parser.parse_async(_Chunks(["1,x"]), loud=False)))
+        with self.assertRaises(IOError):
+            asyncio.run(parser.parse_async(_Chunks(["1,"], IOError("closed"))))
+
+    def test_iterparse_async1(self):
+        parser = fro.seq(fro.comp([r"~\s*", fro.intp]).get(), sep=r"~,")
+        chunks = ["1,", " 23", ",4"]
+        self.assertEqual(asyncio.run(_collect(parser.iterparse_async(_Chunks(chunks)))), [1, 23, 4])
+        self.assertEqual(asyncio.run(_collect(parser.iterparse_async(_Chunks(chunks)), limit=1)), [1])
+        with self.assertRaises(fro.FroParseError):
+            asyncio.run(_collect(parser.iterparse_async(_Chunks(["1,", "x"]))))
+        self.assertRaises(ValueError, fro.intp.iterparse_async, _Chunks(chunks))
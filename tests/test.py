@@ -1,5 +1,9 @@
 # coding=utf-8
+import os
+import pickle
 import random
+import shutil
+import tempfile
 import unittest
 
 import fro
@@ -27,6 +31,33 @@ class FroTests(unittest.TestCase):
         self.assertEqual(parse("9876"), None)
         self.assertEqual(parse("234t"), None)
 
+    def test_alt3(self):
+        parser = fro.alt([r"ab", r"(?i)q", fro.intp, r"a", r"[xy]z", r"x?y", r"\w+"])
+        self.assertEqual(parser.parse_str("ab"), "ab")
+        self.assertEqual(parser.parse_str("a"), "a")
+        self.assertEqual(parser.parse_str("Q"), "Q")
+        self.assertEqual(parser.parse_str("-12"), -12)
+        self.assertEqual(parser.parse_str("xz"), "xz")
+        self.assertEqual(parser.parse_str("y"), "y")
+        self.assertEqual(parser.parse_str("xy"), "xy")
+        self.assertEqual(parser.parse_str("zzz"), "zzz")
+        self.assertRaises(fro.FroParseError, parser.parse_str, "")
+        self.assertRaises(fro.FroParseError, fro.alt([r"a", r"b"]).parse_str, "")
+        self.assertRaises(fro.FroParseError, fro.alt([r"a", r"b"]).parse_str, "c")
+
+    def test_alt4(self):
+        parser = fro.alt([r"a", r"ab", fro.intp, r"(b)\1", r"b", r"[0-9]+x", r"c"])
+        self.assertEqual(parser.parse_str("a"), "a")
+        self.assertRaises(fro.FroParseError, parser.parse_str, "ab")
+        self.assertEqual(parser.parse_str("12"), 12)
+        self.assertRaises(fro.FroParseError, parser.parse_str, "12x")
+        self.assertEqual(parser.parse_str("bb"), "bb")
+        self.assertEqual(parser.parse_str("b"), "b")
+        self.assertEqual(parser.parse_str("c"), "c")
+        bytes_parser = fro.alt([fro.rgx(b"x+"), fro.rgx(b"y")])
+        self.assertEqual(bytes_parser.parse([b"xx"]), b"xx")
+        self.assertEqual(bytes_parser.parse([b"y"]), b"y")
+
     def test_chain1(self):
         def func(parser):
             return fro.comp([r"~a", fro.seq(parser), r"~b"]) >> (lambda x: 1 + sum(x))
@@ -67,6 +98,41 @@ class FroTests(unittest.TestCase):
         parser = fro.comp(rgxs)
         self.assertRaises(fro.FroParseError, parser.parse_str, "abbb")
 
+    def test_compile1(self):
+        def _func(p):
+            return fro.comp([r"~\(", fro.seq(p, sep=r"~,"), r"~\)"]).get() | len
+        parsers = [
+            fro.seq(fro.alt([r"ab", fro.intp, r"a", fro.rgx(r"[xy]+").maybe("m")]).strip(), sep=r";"),
+            fro.comp([fro.group_rgx(r"(a)(b*)"), ~fro.until(r"c"), fro.until(r"d", reducer="".join)]),
+            fro.comp([fro.nested(r"\(", r"\)"), r"~=", fro.floatp], name="assignment"),
+            fro.tie(_func, name="tuple"),
+            fro.chain(_func),
+            fro.seq(fro.thunk(lambda: r"[a-z]"), reducer="".join).lstrips()]
+        inputs = ["ab;12 ; a; xy;", "ab;-3;", "abbbxyzcsdd", "abbcd", "(()x)=3.5", "(()=3",
+                  "((),(),((),()))", "(,)", "  ab", "", "xyz"]
+        for parser in parsers:
+            compiled = parser.compile()
+            for s in inputs:
+                for chunks in [[s], list(s) or [""], s.split(",")]:
+                    try:
+                        expected = parser.parse(chunks)
+                    except fro.FroParseError as e:
+                        try:
+                            compiled.parse(chunks)
+                            self.fail("No error was thrown")
+                        except fro.FroParseError as e_:
+                            self.assertEqual(str(e), str(e_))
+                        continue
+                    self.assertEqual(compiled.parse(chunks), expected)
+
+    def test_compile2(self):
+        # compiled parsers as branches of a dispatching alternation
+        parser = fro.alt([fro.comp([r"a", r"b"]).compile(), r"x"])
+        self.assertEqual(parser.parse_str("x"), "x")
+        with self.assertRaises(fro.FroParseError) as ctx:
+            parser.parse_str("q")
+        self.assertIn("Expected pattern 'a'", str(ctx.exception))
+
     def test_group_rgx1(self):
         parser = fro.group_rgx(r"(a)(b+).*")
         self.assertEqual(parser.parse_str("abbbcde"), ("a", "bbb"))
@@ -79,6 +145,424 @@ class FroTests(unittest.TestCase):
         parser = fro.group_rgx("(a)(b)")
         self.assertRaises(fro.FroParseError, parser.parse_str, "acdf")
 
+    def test_iterparse1(self):
+        parser = fro.seq(fro.intp, sep=r",")
+        iterator = parser.iterparse(["1,2", ",3"])
+        self.assertEqual(next(iterator), 1)
+        self.assertEqual(list(iterator), [2, 3])
+        iterator = parser.iterparse(["1,2,", "x"])
+        self.assertEqual(next(iterator), 1)
+        self.assertEqual(next(iterator), 2)
+        self.assertRaises(fro.FroParseError, next, iterator)
+        self.assertEqual(list(parser.iterparse(["1,2,x"], loud=False)), [1, 2])
+        self.assertRaises(ValueError, fro.intp.iterparse, ["1"])
+
+    def test_scan1(self):
+        def scan(parser, chunks, window=None):
+            return [(value, location.line(), location.column())
+                    for value, location in parser.scan(chunks, window)]
+        pricep = fro.comp([r"~\$", fro.intp]).get()
+        chunks = ["costs $12 or $3", "$45, not $x"]
+        expected = [(12, 0, 6), (3, 0, 13), (45, 1, 0)]
+        self.assertEqual(scan(pricep, chunks), expected)
+        self.assertEqual(scan(pricep.compile(), chunks), expected)
+        self.assertEqual([value for value, _ in pricep.scan(chunks, window=4)], [12, 3, 45])
+        # prefiltered by regexes instead of literals
+        self.assertEqual(scan(fro.alt([r"b+", fro.intp]), ["ab12bb"]), [("b", 0, 1), (12, 0, 2), ("bb", 0, 4)])
+        bracketsp = fro.tie(lambda p: fro.alt([fro.comp([r"~\[", p, r"~\]"]).get(), r"b"]))
+        self.assertEqual(scan(bracketsp, ["[b] [[b]", "] [x]"]), [("b", 0, 0), ("b", 0, 4)])
+        self.assertEqual(scan(fro.rgx(r"a*"), ["baa"]), [("", 0, 0), ("aa", 0, 1), ("", 0, 3)])
+        self.assertEqual(scan(pricep, []), [])
+
+    def test_scan2(self):
+        # candidates that fail after reaching into a later chunk
+        wordp = fro.rgx(r"[a-z]+").lstrips()
+        chunks = ["ab  ", "  ", "1 cd"]
+        for parser in [wordp, wordp.compile()]:
+            self.assertEqual([value for value, _ in parser.scan(chunks)], ["ab", "cd"])
+            self.assertEqual([value for value, _ in parser.scan(chunks, window=2)], ["ab", "cd"])
+        pairp = fro.comp([fro.alt([fro.comp([r"~ +", r"a"]).get(), r"x"]), r"~b"]).get()
+        self.assertEqual([value for value, _ in pairp.scan(["x  ", " ac ab"])], ["a"])
+
+    def test_feeder1(self):
+        parser = fro.seq(fro.comp([r"~\s*", fro.intp]).get(), sep=r"~,")
+        feeder = parser.feeder()
+        for chunk in ["1,", " 23", ",4", ""]:
+            feeder.feed(chunk)
+        self.assertEqual(feeder.close(), [1, 23, 4])
+        self.assertRaises(ValueError, feeder.feed, "5")
+        self.assertRaises(ValueError, feeder.close)
+        self.assertEqual(parser.feeder(window=2).close(), [])
+        feeder = parser.feeder(window=2)
+        for chunk in ["1,", " 2", "3,4"]:
+            feeder.feed(chunk)
+        self.assertEqual(feeder.close(), [1, 23, 4])
+        feeder = parser.feeder()
+        feeder.feed("1,x")
+        self.assertRaises(fro.FroParseError, feeder.close)
+        feeder = parser.feeder(loud=False)
+        feeder.feed("1,")
+        self.assertIsNone(feeder.close())
+
+    def test_parse_incremental1(self):
+        parser = fro.seq(fro.comp([r"~\(", fro.seq(fro.intp, sep=r"~\s*"), r"~\)"]).get(), sep=r"~\s*")
+        result = parser.parse_incremental(None, [(0, 0, ["(1 2", ")", "(3)", "(4", "5)"])])
+        self.assertEqual(result.value(), [[1, 2], [3], [4, 5]])
+        self.assertEqual(result.hits(), 0)
+        result = parser.parse_incremental(result, [(2, 3, ["(6)", "(7 8)"]), (0, 0, ["()"])])
+        self.assertEqual(result.lines(), ["()", "(1 2", ")", "(6)", "(7 8)", "(4", "5)"])
+        self.assertEqual(result.value(), [[], [1, 2], [6], [7, 8], [4, 5]])
+        self.assertGreater(result.hits(), 0)
+        failed = parser.parse_incremental(result, [(4, 5, ["(x)"])])
+        with self.assertRaises(fro.FroParseError) as ctx:
+            parser.parse(failed.lines())
+        self.assertEqual(str(failed.error()), str(ctx.exception))
+        self.assertRaises(fro.FroParseError, failed.value)
+        # parsing an edit of an older version reuses nothing, but is still correct
+        forked = parser.parse_incremental(result, [(5, 7, [])])
+        self.assertEqual(forked.value(), [[], [1, 2], [6], [7, 8]])
+        self.assertEqual(forked.hits(), 0)
+        self.assertEqual(parser.parse_incremental(forked, [(0, 5, [])]).value(), [])
+        self.assertRaises(ValueError, parser.parse_incremental, result, [(3, 2, [])])
+        self.assertRaises(ValueError, parser.parse_incremental, result, [(0, 8, [])])
+        self.assertRaises(ValueError, fro.intp.parse_incremental, result, [])
+
+    def test_parse_incremental2(self):
+        # compiled parsers, including until(..) reaching the end of a chunk
+        for parser in [fro.comp([r"~a", fro.until(r";", reducer="".join), r"~;?"]),
+                       fro.comp([r"~a", fro.until(r";"), r"~;?"])]:
+            compiled = parser.compile()
+            for edits in [[(0, 0, ["a"])], [(0, 0, ["ab", "c", ";"])], [(0, 0, ["ab", "c"])]]:
+                expected = parser.parse_incremental(None, edits)
+                result = compiled.parse_incremental(None, edits)
+                self.assertEqual(result.value(), expected.value())
+                self.assertEqual(compiled.parse_incremental(result, [(0, 1, ["ax"])]).value(),
+                                 parser.parse_incremental(expected, [(0, 1, ["ax"])]).value())
+
+    def test_window1(self):
+        parser = fro.seq(fro.comp([r"~\s*", fro.intp, r"~\s*"]).get(), sep=r",") | sum
+        chunks = ["1, 2", "3 ,4", "", "56 "]
+        self.assertRaises(fro.FroParseError, parser.parse, chunks)
+        for window in [2, 3, 10]:
+            self.assertEqual(parser.parse(chunks, window=window), 1 + 23 + 456)
+            self.assertEqual(parser.compile().parse(chunks, window=window), 1 + 23 + 456)
+        word = fro.rgx(r"hello world")
+        self.assertEqual(word.parse(["hel", "lo wo", "rld"], window=16), "hello world")
+        self.assertEqual(fro.rgx(br"hello world").parse([b"hel", b"lo wo", b"rld"], window=16),
+                         b"hello world")
+        self.assertRaises(ValueError, parser.parse, chunks, window=0)
+
+    def test_empty_bytes1(self):
+        parser = fro.comp([fro.rgx(br"a*"), fro.rgx(br"b*")])
+        for window in [None, 4]:
+            self.assertEqual(parser.parse([], window=window), (b"", b""))
+            self.assertEqual(parser.compile().parse([], window=window), (b"", b""))
+            self.assertRaises(fro.FroParseError, fro.rgx(br"a").parse, [], window=window)
+        self.assertEqual(parser.parse_incremental(None, []).value(), (b"", b""))
+
+    def test_window2(self):
+        # backtracking by less than the window must not depend on the chunks
+        parser = fro.seq(fro.alt([fro.comp([r"a", r"b"]), fro.comp([r"a", r"~c", fro.rgx(r"d").maybe()])]))
+        text = "ac" * 20 + "acd" * 20 + "ab" * 20
+        expected = parser.parse_str(text)
+        for size in [1, 2, 3, 5, 7]:
+            chunks = [text[i:i + size] for i in range(0, len(text), size)]
+            for window in [2, 3, 4, 8]:
+                self.assertEqual(parser.parse(chunks, window=window), expected)
+                self.assertEqual(parser.compile().parse(chunks, window=window), expected)
+
+    def test_window3(self):
+        # until(..) and nested(..) must not repeat the characters that a refill keeps
+        untilp = fro.comp([fro.until(r";", reducer="".join), r"~;"]).get()
+        nestedp = fro.nested(r"\(", r"\)")
+        for parser, text in [(untilp, "abcdef\nghij;"), (nestedp, "(ab(cd)ef(g(h)i)jk\nlm(no)pq(r)st)")]:
+            expected = parser.parse_str(text)
+            for size in [1, 2, 3, 5]:
+                chunks = [text[i:i + size] for i in range(0, len(text), size)]
+                for window in [1, 2, 4, 8]:
+                    self.assertEqual(parser.parse(chunks, window=window), expected)
+                    self.assertEqual(parser.compile().parse(chunks, window=window), expected)
+
+    def test_mmap1(self):
+        record = fro.comp([br"~\s*", fro.rgx(br"[a-z]+") | (lambda b: b.decode("ascii")),
+                           br"~=", fro.rgx(br"[0-9]+") | int])
+        parser = fro.seq(record, sep=br"~;") | dict
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, "input")
+            with open(filename, "wb") as f:
+                f.write(b"a=1;\nbb=22;\n cc=3")
+            self.assertEqual(parser.parse_file(filename, mode="mmap"), {"a": 1, "bb": 22, "cc": 3})
+            with open(filename, "wb") as f:
+                f.write(b"a=1;\nbb=22;\n cc=x")
+            try:
+                parser.parse_file(filename, mode="mmap")
+                self.fail("No error was thrown")
+            except fro.FroParseError as e:
+                self.assertEqual(e.line(index_from=0), 2)
+                self.assertEqual(e.column(index_from=0), 4)
+            with open(filename, "wb"):
+                pass
+            self.assertEqual(fro.seq(br"a").parse_file(filename, mode="mmap"), [])
+            self.assertRaises(ValueError, parser.parse_file, filename, mode="binary")
+        finally:
+            shutil.rmtree(directory)
+
+    def test_checkpoint1(self):
+        parser = fro.seq(fro.comp([r"~\s*", fro.intp, r"~\s*"]).get(), sep=r"~,")
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, "input")
+            with open(filename, "w") as f:
+                f.write("1, 2,\n3\n,4\n")
+            bytes_parser = fro.seq(fro.comp([br"~\s*", fro.rgx(br"[0-9]+") | int, br"~\s*"]).get(), sep=br"~,")
+            for p, mode in [(parser, "text"), (bytes_parser, "mmap")]:
+                expected = [1, 2, 3, 4]
+                checkpoints = []
+                self.assertEqual(p.parse_file(filename, mode=mode, checkpoint=checkpoints.append,
+                                              checkpoint_interval=0), expected)
+                self.assertGreater(len(checkpoints), 0)
+                self.assertEqual(len({id(checkpoint._values) for checkpoint in checkpoints}), 1)
+                for checkpoint in checkpoints:
+                    self.assertEqual(checkpoint.value(), expected[:len(checkpoint.value())])
+                    for resumed in [checkpoint, checkpoint, pickle.loads(pickle.dumps(checkpoint))]:
+                        self.assertEqual(p.parse_file(filename, mode=mode, resume_from=resumed), expected)
+            checkpoints = []
+            fold = (0, lambda total, n: total + n)
+            self.assertEqual(bytes_parser.parse_file(filename, mode="mmap", checkpoint=checkpoints.append,
+                                                     checkpoint_interval=0, fold=fold), 10)
+            self.assertEqual([checkpoint.value() for checkpoint in checkpoints], [1, 3, 6, 10])
+            self.assertEqual(bytes_parser.parse_file(filename, mode="mmap", resume_from=checkpoints[1], fold=fold), 10)
+            with open(filename, "a") as f:
+                f.write(", x")
+            with self.assertRaises(fro.FroParseError) as ctx:
+                bytes_parser.parse_file(filename, mode="mmap", resume_from=checkpoints[-1], fold=fold)
+            self.assertEqual(ctx.exception.line(index_from=0), 3)
+            self.assertRaises(ValueError, fro.intp.parse_file, filename, checkpoint=checkpoints.append)
+            self.assertRaises(ValueError, parser.parse_file, filename, resume_from=checkpoints[0])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_matches1(self):
+        def _func(parser):
+            box = fro.BoxedValue(None)
+            openp = (fro.rgx(r"[a-z]+") | box.update_and_get).stateful()
+            closep = fro.thunk(lambda: box.get().upper())
+            return fro.comp([openp, fro.seq(parser), closep]) | self.fail
+        parser = fro.chain(_func)
+        for p in (parser, parser.compile(), parser.optimize()):
+            self.assertTrue(p.matches(["abc", "efg", "EFG", "q", "Q", "ABC"]))
+            self.assertFalse(p.matches(["abc", "def", "DEF", "DEF"]))
+            self.assertFalse(p.matches(["abc", "def", "ABC"]))
+        seqp = fro.seq(fro.intp, sep=r",") | sum
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, "input")
+            with open(filename, "w") as f:
+                f.write("1,2,34,x")
+            self.assertFalse(seqp.validate_file(filename, loud=False))
+            try:
+                seqp.validate_file(filename, window=4)
+                self.fail("No error was thrown")
+            except fro.FroParseError as e:
+                self.assertEqual((e.line(index_from=0), e.column(index_from=0)), (0, 7))
+            with open(filename, "w") as f:
+                f.write("1,2,3")
+            self.assertTrue(seqp.validate_file(filename))
+            self.assertTrue(fro.seq(br"[0-9],?").validate_file(filename, mode="mmap"))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_serialization1(self):
+        seqp = fro.seq(fro.intp, sep=r"~,") | sum
+        cases = [(fro.tie(_parenthesized), "(((())))"),
+                 (fro.chain(_parenthesized), "(((())))"),
+                 (fro.tie(_parenthesized).compile(), "(((())))"),
+                 (seqp, "1,2,3")]
+        for parser, s in cases:
+            copy = fro.loads(parser.dumps())
+            self.assertEqual(copy.parse_str(s), parser.parse_str(s))
+            self.assertIsNone(copy.parse_str(s + ")", loud=False))
+        square = lambda x: x * x
+        self.assertRaises(Exception, (fro.intp | square).dumps)
+        fro.register_func(square, name="test_serialization1.square")
+        self.assertEqual(fro.loads((fro.intp | square).dumps()).parse_str("4"), 16)
+
+    def test_parse_files1(self):
+        parser = fro.seq(fro.intp, sep=r"~,") | sum
+        directory = tempfile.mkdtemp()
+        try:
+            filenames = []
+            for i in range(8):
+                filename = os.path.join(directory, str(i))
+                with open(filename, "w") as f:
+                    f.write(",".join(str(n) for n in range(i)) if i != 3 else "1,x")
+                filenames.append(filename)
+            results = list(parser.parse_files(filenames, workers=2))
+            self.assertEqual([filename for filename, _ in results], filenames)
+            for i, (_, result) in enumerate(results):
+                if i == 3:
+                    self.assertIsInstance(result, fro.FroParseError)
+                    self.assertEqual(result.column(index_from=0), 2)
+                else:
+                    self.assertEqual(result, sum(range(i)))
+            unordered = parser.parse_files(filenames, workers=2, ordered=False)
+            self.assertEqual(sorted(filename for filename, _ in unordered), sorted(filenames))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_parse_file_parallel1(self):
+        record = fro.comp([r"[a-z]+", r"~=", fro.intp])
+        parser = fro.seq(record, sep=r"~;\n") | len
+        records = ["ab={}".format(i) for i in range(40000)]
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, "input")
+            with open(filename, "w") as f:
+                f.write(";\n".join(records))
+            self.assertEqual(parser.parse_file_parallel(filename, r"(?m)^", workers=2), len(records))
+            records[30000] = "ab=1=2"
+            with open(filename, "w") as f:
+                f.write(";\n".join(records))
+            try:
+                parser.parse_file_parallel(filename, r"(?m)^", workers=2)
+                self.fail("No error was thrown")
+            except fro.FroParseError as e:
+                self.assertEqual(e.line(), 30001)
+                self.assertEqual(e.column(), 5)
+            self.assertIsNone(parser.parse_file_parallel(filename, r"(?m)^", workers=2, loud=False))
+            self.assertRaises(ValueError, record.parse_file_parallel, filename, r"(?m)^")
+        finally:
+            shutil.rmtree(directory)
+
+    def test_profile1(self):
+        parser = fro.comp([r"a", fro.seq(r"b", name="bs"), fro.alt([r"c", fro.comp([r"d", r"e"])])])
+        profiler = parser.profile()
+        self.assertEqual(profiler.parse_str("abbde"), parser.parse_str("abbde"))
+        self.assertIsNone(profiler.parse_str("abbdf", loud=False))
+        stats = dict((s.label, s) for s in profiler.stats())
+        # comp[2].alt[0] never chomps, since alt(..) dispatches on the first character
+        self.assertEqual(set(stats), {"comp", "comp[0]", "bs", "bs.seq[0]", "comp[2]", "comp[2].alt[1]",
+                                      "comp[2].alt[1].comp[0]", "comp[2].alt[1].comp[1]"})
+        self.assertEqual((stats["comp"].calls, stats["comp"].successes, stats["comp"].failures), (2, 1, 1))
+        self.assertEqual((stats["bs.seq[0]"].calls, stats["bs.seq[0]"].consumed), (6, 4))
+        self.assertEqual(stats["comp"].consumed, 5)
+        for s in stats.values():
+            self.assertTrue(0 <= s.self_time <= s.total_time)
+        stacks = profiler.collapsed_stacks().splitlines()
+        self.assertEqual(sorted(line.split()[0] for line in stacks), ["<root>", "<root>;bs"])
+        profiler.reset()
+        self.assertEqual(profiler.stats(), [])
+
+    def test_profile2(self):
+        branches = [fro.comp([r"a", r"a", r"b"]), fro.comp([r"a", r"a", r"c"])]
+        profiler = fro.seq(fro.alt(branches), sep=r"~,").profile()
+        self.assertEqual(len(profiler.parse_str("aab,aac,aac")), 3)
+        sites = profiler.backtracking()
+        self.assertEqual((sites[0].label, sites[0].failed), ("seq[0]", "seq[0].alt[0]"))
+        self.assertEqual((sites[0].rollbacks, sites[0].wasted, sites[0].max_wasted), (2, 4, 2))
+        self.assertEqual(sites[0].max_location.column(), 4)
+        self.assertEqual(profiler.lookahead_failures(), [])
+
+        profiler = fro.alt([fro.comp([r"a", r"b"]), r"ac"]).profile()
+        self.assertRaises(fro.FroParseError, profiler.parse, ["a", "c"])
+        (label, error), = profiler.lookahead_failures()
+        self.assertEqual((label, error.line()), ("alt", 2))
+        self.assertIn("Failed lookahead", profiler.backtracking_report())
+        profiler.reset()
+        self.assertEqual(profiler.lookahead_failures(), [])
+
+    def test_pipeline1(self):
+        pairp = fro.comp([fro.intp, r"~,", fro.intp])
+        parser = (pairp >> (lambda x, y: (x + y,))).get() | str
+        parenp = fro.comp([r"~\(", parser, r"~\)"]).get().name("paren") | (lambda s: s + "!")
+        for p in (parenp, parenp.compile()):
+            self.assertEqual(p.parse_str("(1,2)"), "3!")
+        self.assertEqual(fro.comp([r"a"]).get().get().parse_str("a"), "a")
+        self.assertRaises(ValueError, fro.comp([r"ab"]).get().get().parse_str, "ab")
+        self.assertRaises(ValueError, fro.comp([r"a", r"b"]).get().parse_str, "ab")
+
+    def test_none_values1(self):
+        nonep = fro.rgx(r"a") | (lambda _: None)
+        parser = fro.seq(fro.alt([nonep, fro.rgx(r"b").maybe()]), sep=r"~,")
+        for p in (parser, parser.compile()):
+            self.assertEqual(p.parse_str("a,a,b"), [None, None, "b"])
+            self.assertEqual(p.parse_str("a,,a", memo=True), [None, None, None])
+            self.assertIsNone(p.parse_str("a,c", loud=False))
+
+    def test_chain_max_depth1(self):
+        calls = [0]
+
+        def _func(parser):
+            calls[0] += 1
+            return _parenthesized(parser)
+
+        # after the first parse, only levels deeper than max_depth are generated again
+        for max_depth, generated in [(None, [21, 0]), (3, [21, 3])]:
+            parser = fro.chain(_func, max_depth=max_depth)
+            calls[0] = 0
+            self.assertEqual(parser.parse_str("(" * 20 + ")" * 20), 20)
+            self.assertEqual(calls[0], generated[0])
+            calls[0] = 0
+            self.assertEqual(parser.parse_str("(" * 5 + ")" * 5), 5)
+            self.assertEqual(calls[0], generated[1])
+
+    def test_thunk_cache1(self):
+        box = fro.BoxedValue(r"a")
+        cache = fro.ThunkCache(max_entries=2)
+        parser = fro.seq(fro.thunk(box.get, cache=cache) | box.update_and_get, sep=r"~,")
+        self.assertEqual(parser.parse_str("a,a,a"), ["a", "a", "a"])
+        self.assertEqual((cache.hits(), cache.misses()), (2, 1))
+        box.update(r"b")
+        self.assertEqual(parser.parse_str("b,b"), ["b", "b"])
+        self.assertEqual((cache.hits(), cache.misses()), (3, 2))
+        # the profiled parser reuses the instrumented copies of cached parsers
+        profiler = parser.profile()
+        profiler.parse_str("b,b,b")
+        self.assertEqual(len(set(s.label for s in profiler.stats())), len(profiler.stats()))
+        self.assertEqual(fro.thunk(box.get, cache=None).parse_str("b"), "b")
+
+    def test_optimize1(self):
+        parser = fro.comp([r"~\(", fro.intp.strip(), r"~\)"]).get()
+        optimized = parser.optimize()
+        self.assertTrue(optimized.node_count() < parser.node_count())
+        for p in (optimized, optimized.compile()):
+            self.assertEqual(p.parse_str("( 3 )"), 3)
+            self.assertEqual(p.parse(["(", " 3", " )"]), 3)
+        for s in ["( x )", "( 3 ]", "(3"]:
+            with self.assertRaises(fro.FroParseError) as expected:
+                parser.parse_str(s)
+            with self.assertRaises(fro.FroParseError) as actual:
+                optimized.parse_str(s)
+            self.assertEqual(str(actual.exception), str(expected.exception))
+        tied = fro.tie(_parenthesized)
+        self.assertTrue(tied.optimize().node_count() < tied.node_count())
+        self.assertEqual(tied.optimize().parse_str("((()))"), 3)
+
+    def test_memo1(self):
+        wordp = fro.rgx(r"[a-z]+")
+        commandp = fro.comp([r"~\\", wordp, r"~\{", wordp, r"~\}"]).strips()
+        elementp = fro.alt([commandp, fro.comp([r"~\\", wordp]).strips(), wordp.strips()])
+        parser = fro.seq(elementp)
+        s = "\\emph{a} b \\c \\d{e}  f"
+        table = fro.MemoTable()
+        expected = parser.parse_str(s)
+        self.assertEqual(parser.parse_str(s, memo=table), expected)
+        self.assertTrue(table.hits() > 0)
+        self.assertTrue(table.misses() > 0)
+
+    def test_memo2(self):
+        def _func(p):
+            return fro.alt([fro.comp([r"~\(", p, r"~\)"]).get() | (lambda x: x + 1),
+                            fro.comp([r"~\(", p, r"~\]"]).get() | (lambda x: x + 1),
+                            fro.rgx(r"x") | (lambda _: 0)])
+        parser = fro.tie(_func)
+        s = "(" * 12 + "x" + ")" * 12
+        self.assertEqual(parser.parse_str(s, memo=True), 12)
+        self.assertIsNone(parser.parse_str(s + ")", loud=False, memo=True))
+        table = fro.MemoTable(max_entries=4)
+        self.assertEqual(parser.parse_str(s, memo=table), 12)
+
     def test_nested1(self):
         inside = "(())()(())()"
         nested_parser = fro.nested(r"\(", r"\)").name("nested parens")
@@ -108,6 +592,23 @@ class FroTests(unittest.TestCase):
         nested_parser = fro.nested(r"\(", r"\)")
         self.assertRaises(fro.FroParseError, nested_parser.parse_str, s)
 
+    def test_nested5(self):
+        # delimiters found by a combined scanner, by separate searches, and by separate searches for
+        # regexes that cannot be combined
+        for open_regex_str, close_regex_str in [(r"[(\[]", r"[)\]]"), (r"\(", r"\)"), (r"(?i)\(", r"\)")]:
+            nested_parser = fro.comp([fro.nested(open_regex_str, close_regex_str), r"~,"]).get()
+            self.assertEqual(nested_parser.parse(["(a(b)", "c),"]), "a(b)c")
+            self.assertEqual(nested_parser.parse(["(a(", "b", "))", ","]), "a(b)")
+            self.assertEqual(nested_parser.parse(["(" * 500 + ")" * 500 + ","]), "(" * 499 + ")" * 499)
+            self.assertRaises(fro.FroParseError, nested_parser.parse, ["(a(b)", "c", ","])
+        self.assertEqual(fro.nested(r"<[a-z]+>", r"</[a-z]+>").parse_str("<a><b></b><c/></a>"), "<b></b><c/>")
+
+    def test_nested6(self):
+        # delimiters with groups of their own, found by a combined scanner
+        self.assertEqual(fro.nested(r"(x)?\{", r"\}").parse_str("{a{b}c}"), "a{b}c")
+        self.assertEqual(fro.nested(r"(x)?\{", r"(y)?\}").parse_str("x{a{by}c}"), "a{by}c")
+        self.assertRaises(fro.FroParseError, fro.nested(r"(x)?\{", r"\}").parse_str, "{a{b}")
+
     def test_seq1(self):
         num = fro.rgx(r"[0-9]+") | int
         num_seq = fro.seq(num, sep=",")
@@ -290,5 +791,13 @@ class FroTests(unittest.TestCase):
 
 
 
+def _parenthesized(parser):
+    return fro.comp([r"~\(", parser.maybe(0), r"~\)"]).get() | _increment
+
+
+def _increment(n):
+    return n + 1
+
+
 if __name__ == "__main__":
     unittest.main()
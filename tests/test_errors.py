@@ -21,6 +21,46 @@ class ErrorTests(unittest.TestCase):
             line=0,
             name="p1")
 
+    def test_alt2(self):
+        parser = fro.alt([r"a{}".format(i) for i in range(1000)], name="wide")
+        try:
+            parser.parse_str("b")
+            self.fail("No error was thrown")
+        except fro.FroParseError as e:
+            self.assertEqual(e.column(index_from=0), 0)
+            self.assertEqual([m.content() for m in e.messages()],
+                             ["Expected pattern 'a{}'".format(i) for i in range(32)])
+            self.assertEqual({m.name() for m in e.messages()}, {"wide"})
+        self.assertIsNone(parser.parse_str("b", loud=False))
+        parser = fro.alt([r"a", r"b", r"c"])
+        expected = ["Expected pattern 'a'", "Expected pattern 'b'", "Expected pattern 'c'"]
+        for p in [parser, parser.compile(), parser.optimize()]:
+            try:
+                p.parse_str("x")
+                self.fail("No error was thrown")
+            except fro.FroParseError as e:
+                self.assertEqual([m.content() for m in e.messages()], expected)
+
+    def test_alt3(self):
+        # dispatching on the first character must not change the errors
+        def undispatched(branches):
+            # thunks hide the first characters of the branches
+            return fro.alt([fro.thunk(lambda b=b: b) for b in branches])
+        cases = [
+            ([fro.rgx(r"a", name="A"), fro.rgx(r"b", name="B")], "q"),
+            ([r"a", fro.intp], "q"),
+            ([fro.comp([fro.rgx(r"a", name="A"), r"b"], name="AB"),
+              fro.alt([fro.rgx(r"c", name="C"), r"d"], name="CD"), fro.floatp], "q"),
+            ([fro.nested(r"\(", r"\)", name="N"), fro.seq(fro.rgx(r"z", name="Z")) | len, r"x"], "q"),
+            ([fro.rgx(r"a", name="A"), fro.intp.compile()], ""),
+        ]
+        for branches, s in cases:
+            for name in [None, "outer"]:
+                expected = self.error_text(fro.comp([undispatched(branches), r"~y"], name=name), s)
+                parser = fro.comp([fro.alt(branches), r"~y"], name=name)
+                self.assertEqual(self.error_text(parser, s), expected)
+                self.assertEqual(self.error_text(parser.compile(), s), expected)
+
     def test_comp1(self):
         p1 = fro.seq(fro.intp, sep=r",").name("p1")
         parser = fro.comp([r"~\[", p1, r"~\]"], name="comp").get() | sum
@@ -54,6 +94,18 @@ class ErrorTests(unittest.TestCase):
             column=0,
             line=0)
 
+    def test_window1(self):
+        parser = fro.seq(fro.comp([r"~\s*", fro.intp, r"~\s*"]), sep=r",")
+        chunks = ["1, 2", "3 ,\n 4", "5\n", "x,7"]
+        for p in [parser, parser.compile()]:
+            try:
+                p.parse(chunks, window=4)
+                self.fail("No error was thrown")
+            except fro.FroParseError as e:
+                self.assertEqual(e.line(index_from=0), 2)
+                self.assertEqual(e.column(index_from=0), 0)
+                self.assertIn("x,7", e.context())
+
     def test_seq1(self):
         floatsp = fro.seq(fro.floatp, sep=r"~,")
         for _ in range(10):
@@ -102,6 +154,16 @@ class ErrorTests(unittest.TestCase):
                 for name in kwargs["names"]:
                     self.assertIn(name, names, message)
 
+    def error_text(self, parser, string):
+        """
+        :return: text of the FroParseError that parser.parse_str(string) raises
+        """
+        try:
+            parser.parse_str(string)
+            self.fail("No error was thrown")
+        except fro.FroParseError as e:
+            return str(e)
+
 
 if __name__ == "__main__":
     unittest.main()